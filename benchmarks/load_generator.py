@@ -0,0 +1,438 @@
+# Multi-process load generator for the bank engine (no Streamlit required).
+#
+# Usage (from the repository root):
+#   python -m benchmarks.load_generator --workers 4 --users 200 --duration 30 --output load.json
+#   python -m benchmarks.load_generator --shards 4 --mix deposit=0.2,withdraw=0.2,transfer=0.6
+#
+# One manager process hosts a single BankEngine with its background processing
+# workers. Each worker process simulates users who register, open Regular and
+# VIP accounts and then deposit, withdraw and transfer through a proxy to that
+# engine, so every operation crosses a process boundary the way concurrent
+# sessions do. A configurable share of the traffic hits a few hot accounts and
+# fraud rings keep moving money around closed loops of accounts; every transfer
+# is followed by the same cycle check the app runs.
+#
+# The report gives overall throughput, per-operation p50/p99 latency (measured
+# by the client, so it includes the proxy round trip), the pending queue depth
+# sampled over time and the engine's own metrics (queue wait, apply latency).
+
+# Import necessary modules
+import argparse  # Command line interface
+import json  # Result output
+import multiprocessing  # Worker processes and shared progress counters
+from multiprocessing.managers import BaseManager  # Hosts the shared engine
+import platform  # Result metadata
+import queue  # Empty result queue
+import random  # Seeded workload distributions
+import sys  # Progress output
+import time  # Timing
+
+from benchmarks.run_benchmarks import git_commit
+from data_structures.engine import BankEngine
+from data_structures.metrics import METRICS
+from data_structures.passwords import PasswordHasher
+from data_structures.priority_queue import TransactionProcessor
+from data_structures.sharded_processor import ShardedTransactionProcessor
+
+OPERATIONS = ('deposit', 'withdraw', 'transfer')
+PASSWORD = "load-test-password"
+SETUP_TIMEOUT = 600  # Seconds workers may spend registering users and opening accounts
+DRAIN_TIMEOUT = 60  # Seconds to wait for the queue to empty after the traffic stops
+
+
+# Engine wrapper hosted in the manager process. Methods take account numbers
+# rather than account objects so each call's arguments and result are small.
+class LoadTarget:
+    def __init__(self, shards=1, data_directory=None, scrypt_n=2 ** 14, max_batch_size=500, max_linger=0.005):
+        METRICS.enabled = True
+        processor = ShardedTransactionProcessor(shards) if shards > 1 else TransactionProcessor()
+        self.engine = BankEngine(data_directory, processor, PasswordHasher(scrypt_n=scrypt_n))
+        if hasattr(processor, 'start_batch_processing'):
+            processor.start_batch_processing(max_batch_size, max_linger)
+        else:
+            processor.start_processing(max_batch_size, max_linger)
+
+    def register(self, username):
+        return self.engine.create_user(username, PASSWORD)
+
+    def open_account(self, account_number, owner_username, account_type="Regular", initial_deposit=0):
+        return self.engine.open_account(account_number, owner_username, account_type, initial_deposit) is not None
+
+    def deposit(self, account_number, amount):
+        account = self.engine.find_account(account_number)
+        if account is None:
+            return False
+        self.engine.deposit(account, amount, "Load test deposit")
+        return True
+
+    def withdraw(self, account_number, amount):
+        account = self.engine.find_account(account_number)
+        if account is None:
+            return False
+        self.engine.withdraw(account, amount, "Load test withdrawal")  # Overdrafts are rejected when applied
+        return True
+
+    def transfer(self, from_account_number, to_account_number, amount):
+        """Transfer and run the app's cycle check; returns (transferred, cycle detected)"""
+        from_account = self.engine.find_account(from_account_number)
+        to_account = self.engine.find_account(to_account_number)
+        if from_account is None or to_account is None:
+            return False, False
+        if not self.engine.transfer(from_account, to_account, amount, "Load test transfer"):
+            return False, False
+        return True, bool(self.engine.detect_cycle_for_edge(from_account_number, to_account_number))
+
+    def queue_depth(self):
+        return self.engine.transaction_processor.pending_count()
+
+    def metrics_summary(self):
+        return METRICS.summary()
+
+    def close(self):
+        self.engine.close()
+
+
+class EngineManager(BaseManager):
+    pass
+
+
+EngineManager.register('LoadTarget', LoadTarget)
+
+
+# Workload
+def account_number(worker, user, index):
+    return f"LW{worker:03d}U{user:06d}A{index}"
+
+
+def hot_account_number(index):
+    return f"HOT{index:05d}"
+
+
+def ring_account_number(ring, index):
+    return f"RING{ring:04d}N{index:03d}"
+
+
+def parse_mix(value):
+    """Parse 'deposit=0.4,withdraw=0.2,transfer=0.4' into operation weights"""
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation: {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+# Uniform sample of at most `capacity` observations (reservoir sampling), plus
+# exact count and total, so long runs report percentiles in bounded memory
+class _Reservoir:
+    def __init__(self, capacity, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.samples = []
+        self.count = 0
+        self.total = 0.0
+        self.ok = 0
+
+    def add(self, seconds, ok):
+        self.count += 1
+        self.total += seconds
+        self.ok += bool(ok)
+        if len(self.samples) < self.capacity:
+            self.samples.append(seconds)
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < self.capacity:
+                self.samples[slot] = seconds
+
+    def state(self):
+        return {'count': self.count, 'ok': self.ok, 'total': self.total, 'samples': self.samples}
+
+
+class _Simulation:
+    """One worker's users, accounts, fraud rings and operation mix"""
+    def __init__(self, worker, args):
+        self.worker = worker
+        self.args = args
+        self.rng = random.Random(args.seed * 1000003 + worker)
+        self.own_accounts = [
+            account_number(worker, user, index)
+            for user in range(args.users) for index in range(args.accounts_per_user)
+        ]
+        self.rings = [ring for ring in range(args.fraud_rings) if ring % args.workers == worker]
+        self.ring_positions = {ring: 0 for ring in self.rings}
+        operations = [name for name in OPERATIONS if args.mix.get(name, 0) > 0]
+        self.operations = operations
+        self.weights = [args.mix[name] for name in operations]
+        self.latencies = {}
+
+    def record(self, operation, seconds, ok):
+        reservoir = self.latencies.get(operation)
+        if reservoir is None:
+            reservoir = self.latencies[operation] = _Reservoir(self.args.max_samples, self.rng)
+        reservoir.add(seconds, ok)
+
+    def timed(self, operation, function, *call_args):
+        start = time.perf_counter()
+        result = function(*call_args)
+        self.record(operation, time.perf_counter() - start, result)
+        return result
+
+    def amount(self):
+        """Log-normally distributed amount: mostly small, with a tail of large transfers"""
+        return round(min(self.rng.lognormvariate(0, self.args.amount_sigma) * self.args.amount_median, 1e6), 2)
+
+    def random_account(self):
+        """Any simulated customer account, across all workers"""
+        args = self.args
+        return account_number(self.rng.randrange(args.workers), self.rng.randrange(args.users),
+                              self.rng.randrange(args.accounts_per_user))
+
+    def hot_or(self, account):
+        args = self.args
+        if args.hot_accounts and self.rng.random() < args.hot_share:
+            return hot_account_number(self.rng.randrange(args.hot_accounts))
+        return account
+
+    def setup(self, target):
+        args = self.args
+        for user in range(args.users):
+            username = f"loaduser{self.worker:03d}_{user:06d}"
+            self.timed('register', target.register, username)
+            for index in range(args.accounts_per_user):
+                account_type = "VIP" if self.rng.random() < args.vip_fraction else "Regular"
+                self.timed('open_account', target.open_account, account_number(self.worker, user, index),
+                           username, account_type, self.amount() * 10)
+        for ring in self.rings:
+            owner = f"ring{ring:04d}"
+            target.register(owner)
+            for index in range(args.ring_size):
+                target.open_account(ring_account_number(ring, index), owner, "Regular", args.ring_float)
+
+    def step(self, target):
+        """Run one operation; returns True if it found a transfer cycle"""
+        if self.rings and self.rng.random() < self.args.fraud_share:
+            ring = self.rng.choice(self.rings)
+            position = self.ring_positions[ring]
+            self.ring_positions[ring] = (position + 1) % self.args.ring_size
+            # Amounts just under the reporting threshold, passed round the loop
+            amount = round(self.rng.uniform(900, 999.99), 2)
+            _, cycle = self.timed_transfer('ring_transfer', target, ring_account_number(ring, position),
+                                           ring_account_number(ring, (position + 1) % self.args.ring_size), amount)
+            return cycle
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        account = self.rng.choice(self.own_accounts)
+        if operation == 'deposit':
+            self.timed('deposit', target.deposit, self.hot_or(account), self.amount())
+        elif operation == 'withdraw':
+            self.timed('withdraw', target.withdraw, account, self.amount())
+        else:
+            recipient = self.hot_or(self.random_account())
+            if recipient != account:
+                return self.timed_transfer('transfer', target, account, recipient, self.amount())[1]
+        return False
+
+    def timed_transfer(self, operation, target, from_account_number, to_account_number, amount):
+        start = time.perf_counter()
+        transferred, cycle = target.transfer(from_account_number, to_account_number, amount)
+        self.record(operation, time.perf_counter() - start, transferred)
+        return transferred, cycle
+
+
+def run_worker(worker, target, args, barrier, progress, results):
+    """Worker process: set up this worker's users, then generate traffic for args.duration seconds"""
+    simulation = _Simulation(worker, args)
+    simulation.setup(target)
+    setup_latencies = {name: reservoir.state() for name, reservoir in simulation.latencies.items()}
+    simulation.latencies = {}
+    barrier.wait(SETUP_TIMEOUT)
+
+    cycles = 0
+    start = time.perf_counter()
+    deadline = start + args.duration
+    while time.perf_counter() < deadline:
+        cycles += simulation.step(target)
+        progress[worker] += 1
+    results.put({
+        'worker': worker,
+        'seconds': time.perf_counter() - start,
+        'setup': setup_latencies,
+        'traffic': {name: reservoir.state() for name, reservoir in simulation.latencies.items()},
+        'cycles_detected': cycles,
+    })
+
+
+# Reporting
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(states):
+    """Merge per-worker latency states into one row per operation"""
+    merged = {}
+    for state in states:
+        for name, latency in state.items():
+            row = merged.setdefault(name, {'count': 0, 'ok': 0, 'total': 0.0, 'samples': []})
+            row['count'] += latency['count']
+            row['ok'] += latency['ok']
+            row['total'] += latency['total']
+            row['samples'].extend(latency['samples'])
+    rows = []
+    for name, row in sorted(merged.items()):
+        samples = sorted(row['samples'])
+        rows.append({
+            'operation': name,
+            'count': row['count'],
+            'ok': row['ok'],
+            'rejected': row['count'] - row['ok'],
+            'mean_ms': round(row['total'] / row['count'] * 1000, 4) if row['count'] else None,
+            'p50_ms': _milliseconds(percentile(samples, 0.5)),
+            'p99_ms': _milliseconds(percentile(samples, 0.99)),
+            'max_ms': _milliseconds(samples[-1] if samples else None),
+        })
+    return rows
+
+
+def _milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 4)
+
+
+def metadata(args):
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': multiprocessing.cpu_count(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+    }
+
+
+def run(args):
+    manager = EngineManager()
+    manager.start()
+    try:
+        target = manager.LoadTarget(args.shards, args.data_dir, args.scrypt_n)
+        for index in range(args.hot_accounts):
+            target.open_account(hot_account_number(index), "merchant", "VIP")
+
+        barrier = multiprocessing.Barrier(args.workers + 1)
+        progress = multiprocessing.Array('q', args.workers, lock=False)  # One writer per slot
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(worker, target, args, barrier, progress, results))
+            for worker in range(args.workers)
+        ]
+        setup_start = time.perf_counter()
+        for process in workers:
+            process.start()
+        barrier.wait(SETUP_TIMEOUT)
+        start = time.perf_counter()
+        print(f"setup finished in {start - setup_start:.1f}s; generating traffic...", file=sys.stderr, flush=True)
+
+        # Sample throughput and queue depth until every worker has reported
+        timeline = []
+        reports = []
+        last_time, last_ops = start, 0
+        while len(reports) < args.workers:
+            time.sleep(args.interval)
+            while not results.empty():
+                reports.append(results.get())
+            sampled = time.perf_counter()
+            operations = sum(progress)
+            timeline.append({
+                'seconds': round(sampled - start, 3),
+                'operations': operations,
+                'ops_per_sec': round((operations - last_ops) / (sampled - last_time), 1),
+                'queue_depth': target.queue_depth(),
+            })
+            last_time, last_ops = sampled, operations
+            if not any(process.is_alive() for process in workers):
+                try:
+                    while len(reports) < args.workers:
+                        reports.append(results.get(timeout=5))
+                except queue.Empty:
+                    raise RuntimeError("a worker process exited without reporting") from None
+        traffic_seconds = max(worker_report['seconds'] for worker_report in reports)
+        for process in workers:
+            process.join()
+
+        # Let the processing workers finish whatever is still queued
+        drain_start = time.perf_counter()
+        queue_depth = target.queue_depth()
+        while queue_depth and time.perf_counter() - drain_start < DRAIN_TIMEOUT:
+            time.sleep(0.01)
+            queue_depth = target.queue_depth()
+        drain_seconds = time.perf_counter() - drain_start
+
+        operations = sum(progress)
+        report = {
+            'meta': metadata(args),
+            'summary': {
+                'operations': operations,
+                'seconds': round(traffic_seconds, 3),
+                'ops_per_sec': round(operations / traffic_seconds, 1),
+                'setup_seconds': round(start - setup_start, 3),
+                'drain_seconds': round(drain_seconds, 3),
+                'queue_depth_after_drain': queue_depth,
+                'cycles_detected': sum(worker_report['cycles_detected'] for worker_report in reports),
+            },
+            'operations': summarize(worker_report['traffic'] for worker_report in reports),
+            'setup': summarize(worker_report['setup'] for worker_report in reports),
+            'timeline': timeline,
+            'engine_metrics': target.metrics_summary(),
+        }
+        target.close()
+        return report
+    finally:
+        manager.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate multi-process load against a shared bank engine")
+    parser.add_argument('--workers', type=int, default=4, help="client processes")
+    parser.add_argument('--users', type=int, default=100, help="simulated users per worker")
+    parser.add_argument('--accounts-per-user', type=int, default=2)
+    parser.add_argument('--vip-fraction', type=float, default=0.1, help="share of accounts opened as VIP")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of traffic after setup")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('deposit=0.35,withdraw=0.25,transfer=0.4'),
+                        help="operation weights, e.g. deposit=0.35,withdraw=0.25,transfer=0.4")
+    parser.add_argument('--amount-median', type=float, default=50.0, help="median amount (log-normal)")
+    parser.add_argument('--amount-sigma', type=float, default=1.5, help="log-normal spread of amounts")
+    parser.add_argument('--hot-accounts', type=int, default=10, help="shared merchant accounts")
+    parser.add_argument('--hot-share', type=float, default=0.2,
+                        help="share of deposits and transfer recipients that are hot accounts")
+    parser.add_argument('--fraud-rings', type=int, default=4, help="rings of accounts passing money in a loop")
+    parser.add_argument('--ring-size', type=int, default=5)
+    parser.add_argument('--ring-float', type=float, default=5000.0, help="opening balance of ring accounts")
+    parser.add_argument('--fraud-share', type=float, default=0.05, help="share of operations that are ring transfers")
+    parser.add_argument('--shards', type=int, default=1, help="processor shards (1 = single TransactionProcessor)")
+    parser.add_argument('--data-dir', help="persist to this directory (default: in memory)")
+    parser.add_argument('--scrypt-n', type=int, default=2 ** 14, help="password hashing cost")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between timeline samples")
+    parser.add_argument('--max-samples', type=int, default=200000,
+                        help="latency samples kept per operation and worker")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.ring_size < 2:
+        parser.error("--ring-size must be at least 2")
+
+    report = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    summary = report['summary']
+    print(f"{summary['operations']} operations in {summary['seconds']}s "
+          f"({summary['ops_per_sec']} ops/s), queue drained in {summary['drain_seconds']}s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
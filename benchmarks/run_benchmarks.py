@@ -0,0 +1,329 @@
+# Benchmark harness for the data_structures package (no Streamlit required).
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output results.json
+#   python -m benchmarks.run_benchmarks --compare results.json   # exit 1 on regressions
+#
+# Each benchmark builds a synthetic workload of the requested size from a fixed
+# seed and reports the best of --repeat runs, so results from two commits on the
+# same machine can be compared directly.
+
+# Import necessary modules
+import argparse  # Command line interface
+import gc  # Collections are paused while timing
+import json  # Result output
+import platform  # Result metadata
+import random  # Seeded synthetic workloads
+import subprocess  # Commit id for the result metadata
+import sys  # Exit status for --compare
+import time  # Timing
+
+from data_structures.bst import BankAccount, BankAccountBST
+from data_structures.graph import TransactionGraph
+from data_structures.hashtable import HashTable, OpenAddressingHashTable
+from data_structures.priority_queue import TransactionProcessor
+from data_structures.transaction import Transaction, TransactionType, epoch_seconds
+
+try:  # The CSR benchmarks need NumPy
+    import numpy as np
+except ImportError:
+    np = None
+
+ACCOUNTS_PER_OWNER = 5  # Accounts per synthetic user
+RING_SIZE = 8  # Accounts per transfer ring
+MAX_QUERIES = 100000  # Cap on timed lookups per benchmark (lookups are sampled beyond this)
+MAX_CYCLE_QUERIES = 1000  # Cap on timed cycle/volume queries
+
+
+# Synthetic workloads
+def usernames(n):
+    return [f"user{i:08d}" for i in range(n)]
+
+
+def account_numbers(n, sequential=True, seed=0):
+    """Account numbers in insertion order: strictly increasing (adversarial for an
+    unbalanced tree) or shuffled"""
+    numbers = [f"ACC{i:09d}" for i in range(n)]
+    if not sequential:
+        random.Random(seed).shuffle(numbers)
+    return numbers
+
+
+def make_accounts(numbers):
+    return [
+        BankAccount(number, f"user{i // ACCOUNTS_PER_OWNER:08d}", "VIP" if i % 10 == 0 else "Regular", 1000.0)
+        for i, number in enumerate(numbers)
+    ]
+
+
+def transfer_rings(n, seed=0):
+    """n transfer edges forming dense rings of RING_SIZE accounts: every account sends
+    to the next one in its ring, repeatedly, so every ring contains a recent cycle"""
+    rng = random.Random(seed)
+    num_accounts = max(RING_SIZE, min(n, 1000000) // 4)
+    now = epoch_seconds()
+    edges = []
+    for i in range(n):
+        source = i % num_accounts
+        edges.append((f"ACC{source:09d}", f"ACC{ring_successor(source):09d}", round(rng.uniform(1, 20000), 2),
+                      "transfer", now - (n - i) % 3600))
+    return edges
+
+
+def ring_successor(index):
+    ring_start = index - index % RING_SIZE
+    return ring_start + (index - ring_start + 1) % RING_SIZE
+
+
+# Timing
+def timed(function, repeat):
+    """Best wall time of `repeat` calls to function, with garbage collection paused"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def result(name, size, ops, seconds):
+    return {
+        'benchmark': name,
+        'size': size,
+        'ops': ops,
+        'seconds': round(seconds, 6),
+        'ops_per_sec': round(ops / seconds, 1) if seconds > 0 else None
+    }
+
+
+def sample(values, limit, seed=0):
+    if len(values) <= limit:
+        return values
+    return random.Random(seed).sample(values, limit)
+
+
+# Benchmarks: each yields result dictionaries for one workload size
+def bench_hashtables(n, repeat):
+    keys = usernames(n)
+    pairs = [(key, "x" * 64) for key in keys]
+    queries = sample(keys, MAX_QUERIES)
+    misses = [f"missing{i:08d}" for i in range(len(queries))]
+    for name, table_class in (('hashtable', HashTable), ('open_addressing', OpenAddressingHashTable)):
+        def insert():
+            table = table_class()
+            for key, value in pairs:
+                table.insert(key, value)
+        yield result(f'{name}.insert', n, n, timed(insert, repeat))
+
+        table = table_class()
+        table.insert_many(pairs)
+        yield result(f'{name}.get_hit', n, len(queries), timed(lambda: [table.get(key) for key in queries], repeat))
+        yield result(f'{name}.get_miss', n, len(misses), timed(lambda: [table.get(key) for key in misses], repeat))
+
+
+def bench_accounts(n, repeat):
+    for order, sequential in (('sequential', True), ('shuffled', False)):
+        accounts = make_accounts(account_numbers(n, sequential))
+
+        def insert():
+            tree = BankAccountBST()
+            for account in accounts:
+                tree.insert(account)
+        yield result(f'bst.insert_{order}', n, n, timed(insert, repeat))
+
+    accounts = make_accounts(account_numbers(n))
+    yield result('bst.bulk_load', n, n, timed(lambda: BankAccountBST().bulk_load(accounts), repeat))
+
+    tree = BankAccountBST()
+    tree.bulk_load(accounts)
+    queries = sample([account.account_number for account in accounts], MAX_QUERIES)
+    yield result('bst.find', n, len(queries), timed(lambda: [tree.find_account(number) for number in queries], repeat))
+    owners = sample(sorted({account.owner_username for account in accounts}), MAX_QUERIES)
+    yield result('bst.owner_scan', n, len(owners),
+                 timed(lambda: [tree.get_user_accounts(owner) for owner in owners], repeat))
+    yield result('bst.range_scan', n, n, timed(lambda: sum(1 for _ in tree.range_scan()), repeat))
+
+
+def bench_processor(n, repeat):
+    accounts = make_accounts(account_numbers(max(1, n // 100)))
+    rng = random.Random(0)
+    workload = [
+        (TransactionType.DEPOSIT if rng.random() < 0.6 else TransactionType.WITHDRAW,
+         round(rng.uniform(1, 20000), 2), accounts[i % len(accounts)])
+        for i in range(n)
+    ]
+
+    def fresh_transactions():
+        return [Transaction(type=kind, amount=amount, account=account, account_type=account.account_type)
+                for kind, amount, account in workload]
+
+    enqueue_best = drain_best = None
+    for _ in range(repeat):
+        processor = TransactionProcessor()
+        transactions = fresh_transactions()
+        gc.collect()
+        start = time.perf_counter()
+        for transaction in transactions:
+            processor.add_transaction(transaction)
+        enqueue = time.perf_counter() - start
+
+        # Drain the full queue with the batch worker and wait for the last batch to finish
+        start = time.perf_counter()
+        processor.start_batch_processing()
+        while len(processor.transaction_queue):
+            time.sleep(0.0005)
+        with processor.lock:
+            processor.is_processing = False
+            processor.condition.notify_all()
+        drain = time.perf_counter() - start
+        processor.processing_thread.join()
+
+        enqueue_best = enqueue if enqueue_best is None else min(enqueue_best, enqueue)
+        drain_best = drain if drain_best is None else min(drain_best, drain)
+    yield result('processor.enqueue', n, n, enqueue_best)
+    yield result('processor.drain', n, n, drain_best)
+
+    batch_best = None
+    for _ in range(repeat):
+        processor = TransactionProcessor()
+        transactions = fresh_transactions()
+        gc.collect()
+        start = time.perf_counter()
+        processor.add_transactions(transactions)
+        elapsed = time.perf_counter() - start
+        batch_best = elapsed if batch_best is None else min(batch_best, elapsed)
+    yield result('processor.enqueue_batch', n, n, batch_best)
+
+
+def bench_graph(n, repeat):
+    edges = transfer_rings(n)
+
+    def build():
+        graph = TransactionGraph()
+        graph.add_transactions(edges)
+        return graph
+    yield result('graph.add_edges', n, n, timed(build, repeat))
+
+    def build_retained():
+        graph = TransactionGraph(max_edges_per_account=RING_SIZE * 4)
+        graph.add_transactions(edges)
+    yield result('graph.add_edges_retained', n, n, timed(build_retained, repeat))
+
+    graph = build()
+    sources = sample(sorted({edge[0] for edge in edges}), MAX_CYCLE_QUERIES)
+    ring_pairs = [(source, f"ACC{ring_successor(int(source[3:])):09d}") for source in sources]
+    yield result('graph.detect_cycle_for_edge', n, len(ring_pairs),
+                 timed(lambda: [graph.detect_cycle_for_edge(a, b) for a, b in ring_pairs], repeat))
+    yield result('graph.detect_circular', n, len(sources),
+                 timed(lambda: [graph.detect_circular_transactions(source) for source in sources], repeat))
+    yield result('graph.volume_tracked', n, len(sources),
+                 timed(lambda: [graph.get_transaction_volume(source, 24) for source in sources], repeat))
+    yield result('graph.volume_scan', n, len(sources),
+                 timed(lambda: [graph.get_transaction_volume(source, 12) for source in sources], repeat))
+    if n <= 1000000:  # Whole-graph SCC pass; skipped at the largest sizes
+        yield result('graph.cycle_components', n, 1, timed(graph.find_cycle_components, repeat))
+    if np is not None:
+        yield result('graph.csr_export', n, n, timed(graph.to_csr, repeat))
+        csr = graph.to_csr()
+
+        def analytics():
+            csr.out_degree(), csr.in_degree(), csr.out_flow(), csr.in_flow(), csr.fan_out()
+            csr.k_hop_reachable(sources[:10], 3)
+        yield result('graph.csr_analytics', n, n, timed(analytics, repeat))
+
+
+BENCHMARKS = {
+    'hashtable': bench_hashtables,
+    'bst': bench_accounts,
+    'processor': bench_processor,
+    'graph': bench_graph,
+}
+
+
+def git_commit():
+    """Short id of the checked-out commit (None outside a git checkout)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': epoch_seconds(),
+        'sizes': args.sizes,
+        'repeat': args.repeat,
+    }
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        for name in args.only or BENCHMARKS:
+            print(f"[{size:>9}] {name}...", file=sys.stderr, flush=True)
+            results.extend(BENCHMARKS[name](size, args.repeat))
+    return {'meta': metadata(args), 'results': results}
+
+
+def compare(baseline, current, tolerance):
+    """Print per-benchmark speed ratios; returns the benchmarks slower than the tolerance"""
+    previous = {(r['benchmark'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        old = previous.get((r['benchmark'], r['size']))
+        if old is None or not old['seconds'] or not r['ops']:
+            continue
+        # Normalise by ops in case the sample sizes changed between runs
+        ratio = (r['seconds'] / r['ops']) / (old['seconds'] / old['ops'])
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{r['benchmark']:<32} {r['size']:>9}  {ratio:6.2f}x  {flag}", file=sys.stderr)
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the banking data structures")
+    parser.add_argument('--sizes', type=lambda value: [int(float(size)) for size in value.split(',')],
+                        default=[1000, 10000, 100000],
+                        help="comma-separated workload sizes, e.g. 1e3,1e5,1e7")
+    parser.add_argument('--only', type=lambda value: value.split(','),
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark (best is reported)")
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', help="baseline JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    args = parser.parse_args(argv)
+    for name in args.only or ():
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    current = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
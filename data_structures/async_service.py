@@ -0,0 +1,83 @@
+# Import necessary modules
+import asyncio  # Event-loop based request handling
+import functools  # Binding keyword arguments for executor calls
+
+from data_structures.graph import TransactionGraph
+from data_structures.transaction import Transaction
+
+# Asyncio front end for a TransactionProcessor (or ShardedTransactionProcessor).
+# Each submitted transaction gets a future that resolves to True once it has
+# been applied (False if it was rejected or cancelled). At most max_pending
+# transactions may be in flight; further submitters wait, which applies
+# backpressure to load generators instead of growing the queue without bound.
+# Calls that take the processor's lock run on the loop's default executor, so
+# a worker holding that lock for a whole batch never stalls the event loop.
+class AsyncTransactionService:
+    def __init__(self, transaction_processor, transaction_graph=None, max_pending=1000):
+        self.transaction_processor = transaction_processor
+        self.transaction_graph = transaction_graph  # Needed for transfer()
+        self.max_pending = max_pending
+        self.slots = None  # Semaphore bounding in-flight transactions, created on start()
+        self.in_flight = 0  # Submitted transactions not yet applied
+        self.loop = None
+
+    async def start(self, max_batch_size=500, max_linger=0.005):
+        """Bind to the running loop and make sure the processor's worker is draining the queue"""
+        self.loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.max_pending)
+        if not self.transaction_processor.is_processing:
+            if hasattr(self.transaction_processor, 'start_batch_processing'):
+                self.transaction_processor.start_batch_processing(max_batch_size, max_linger)
+            else:
+                self.transaction_processor.start_processing(max_batch_size, max_linger)
+
+    async def stop(self):
+        self.transaction_processor.stop_processing()
+
+    def _resolver(self, future):
+        """Completion callback (called on a worker thread) that resolves a future on the loop"""
+        def on_complete(transaction_id, applied):
+            self.loop.call_soon_threadsafe(_set_result, future, applied)
+        return on_complete
+
+    async def submit(self, transaction):
+        """Queue a transaction and wait until it has been applied; returns True on success"""
+        if self.loop is None:
+            await self.start()
+        transaction = Transaction.coerce(transaction)
+        await self.slots.acquire()  # Waits here while max_pending transactions are in flight
+        self.in_flight += 1
+        try:
+            future = self.loop.create_future()
+            await self.loop.run_in_executor(None, functools.partial(
+                self.transaction_processor.add_transaction, transaction, on_complete=self._resolver(future)
+            ))
+            return await future
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+    async def submit_many(self, transactions):
+        """Submit several transactions concurrently; returns their results in order"""
+        return await asyncio.gather(*(self.submit(transaction) for transaction in transactions))
+
+    async def transfer(self, from_account, to_account, amount, description=None):
+        """Transfer between two accounts; returns True once both legs have been applied.
+        Both legs and the graph edge are applied atomically in one executor call, so a
+        rejected or cancelled transfer never leaves one leg applied without the other."""
+        if self.loop is None:
+            await self.start()
+        legs = [TransactionGraph.transfer_legs(from_account, to_account, amount, description)]
+        await self.slots.acquire()
+        self.in_flight += 1
+        try:
+            return await self.loop.run_in_executor(
+                None, self.transaction_processor.apply_transfers, legs, self.transaction_graph
+            )
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+def _set_result(future, result):
+    if not future.done():  # The awaiting task may have been cancelled
+        future.set_result(result)
@@ -1,103 +1,321 @@
 from datetime import datetime  # Importing datetime to handle timestamps for accounts and transactions
+from bisect import bisect_left  # Keeps the per-owner account lists sorted by account number
+
+from data_structures.money import DEFAULT_CURRENCY, from_minor, to_minor
+from data_structures.transaction import TransactionType, TransactionStatus
+from data_structures.history import TransactionHistory
 
 # Class representing a bank account
+# The balance is held as integer minor units (balance_minor); `balance` is the
+# major-unit view used for display and by callers working in floats.
 class BankAccount:
-    def __init__(self, account_number, owner_username, account_type="Regular", balance=0):
+    def __init__(self, account_number, owner_username, account_type="Regular", balance=0,
+                 currency=DEFAULT_CURRENCY):
         # Initializing basic account attributes
         self.account_number = account_number  # Unique identifier for the account
         self.owner_username = owner_username  # Username of the account owner
         self.account_type = account_type  # Type of account: "Regular" or "VIP"
-        self.balance = balance  # Initial account balance
-        self.transaction_history = []  # List to store all transactions associated with the account
+        self.currency = currency  # ISO code of the account's currency
+        self.balance_minor = to_minor(balance, currency)  # Initial account balance in minor units
+        self.transaction_history = TransactionHistory(currency=currency)  # Columnar store of all transactions associated with the account
         self.creation_date = datetime.now()  # Timestamp of account creation
         self.pending_transactions = []  # Transactions awaiting processing
 
+    @property
+    def balance(self):
+        """Balance in major units"""
+        return from_minor(self.balance_minor, self.currency)
+
+    @balance.setter
+    def balance(self, value):
+        self.balance_minor = to_minor(value, self.currency)
+
     def add_transaction(self, transaction_type, amount, description):
-        """Add a new transaction to the account's history"""
-        transaction = {
-            'type': transaction_type,  # Type of transaction: deposit or withdraw
-            'amount': amount,  # Amount involved in the transaction
-            'description': description,  # Description of the transaction
-            'timestamp': datetime.now(),  # Timestamp of when the transaction occurred
-            'status': 'completed',  # Status of the transaction
-            'priority': 3 if self.account_type == "Regular" else 1  # Priority based on account type
-        }
-        self.transaction_history.append(transaction)  # Add transaction to history
+        """Add a new transaction (amount in major units) to the account's history"""
+        self.record_transaction(transaction_type, to_minor(amount, self.currency), description)
+
+    def record_transaction(self, transaction_type, amount_minor, description):
+        """Add a new transaction (amount in minor units) to the account's history"""
+        self.transaction_history.append_record(
+            transaction_type,  # Type of transaction: deposit or withdraw
+            amount_minor,  # Amount involved in the transaction
+            description,  # Description of the transaction
+            status=TransactionStatus.COMPLETED,  # Status of the transaction
+            priority=3 if self.account_type == "Regular" else 1  # Priority based on account type
+        )  # Add transaction to history
 
     def update_balance(self, amount, transaction_type):
-        """Update the account balance based on the transaction type"""
-        if transaction_type == "deposit":
-            self.balance += amount  # Increase balance for deposits
-        elif transaction_type == "withdraw":
-            self.balance -= amount  # Decrease balance for withdrawals
+        """Update the account balance based on the transaction type (amount in major units)"""
+        self.adjust_balance(to_minor(amount, self.currency), transaction_type)
 
-        print(f"Updated balance: {self.balance}")  # Debugging: Print updated balance
+    def adjust_balance(self, amount_minor, transaction_type):
+        """Update the account balance based on the transaction type (amount in minor units)"""
+        transaction_type = TransactionType.parse(transaction_type)
+        if transaction_type == TransactionType.DEPOSIT:
+            self.balance_minor += amount_minor  # Increase balance for deposits
+        elif transaction_type == TransactionType.WITHDRAW:
+            self.balance_minor -= amount_minor  # Decrease balance for withdrawals
 
-# Node class for Binary Search Tree (BST)
+# Node class for the self-balancing (AVL) account index
 class BSTNode:
     def __init__(self, account):
         # Initialize a node with a bank account and references to left and right child nodes
         self.account = account  # BankAccount instance
         self.left = None  # Left child node
         self.right = None  # Right child node
+        self.height = 1  # Height of the subtree rooted at this node (leaf = 1)
 
-# Binary Search Tree for managing bank accounts
+# Self-balancing (AVL) Binary Search Tree for managing bank accounts.
+# Account numbers are issued in increasing order, which degrades a plain BST
+# into a linked list; AVL rotations keep every lookup at O(log n). All
+# traversals are iterative so deep trees never hit Python's recursion limit.
 class BankAccountBST:
     def __init__(self):
-        # Initialize an empty BST
+        # Initialize an empty tree
         self.root = None
+        self.size = 0  # Number of accounts stored in the tree
+        # Secondary index: {owner_username: ([account_numbers], [accounts])}, both lists
+        # sorted by account number so a user's accounts come back in O(k)
+        self.owner_index = {}
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Iterate over all accounts in account-number order"""
+        return self.range_scan()
+
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    def _update_height(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+
+    def _rotate_left(self, node):
+        """Rotate the subtree left and return its new root"""
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        """Rotate the subtree right and return its new root"""
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        """Restore the AVL invariant at a node and return the subtree's new root"""
+        self._update_height(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            # Left-heavy: a left-right case needs a preliminary left rotation
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            # Right-heavy: a right-left case needs a preliminary right rotation
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rebalance_path(self, path):
+        """Rebalance every node on a root-to-leaf path, bottom-up"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            subtree_root = self._rebalance(node)
+            if subtree_root is node:
+                continue
+            # Re-link the rotated subtree into its parent (or the root)
+            if i == 0:
+                self.root = subtree_root
+            elif path[i - 1].left is node:
+                path[i - 1].left = subtree_root
+            else:
+                path[i - 1].right = subtree_root
 
     def insert(self, account):
-        """Insert a new account into the BST"""
-        if not self.root:
-            # If tree is empty, set the root to a new node containing the account
-            self.root = BSTNode(account)
-        else:
-            # Otherwise, recursively find the correct position and insert
-            self._insert_recursive(self.root, account)
-
-    def _insert_recursive(self, node, account):
-        """Helper function to insert an account recursively"""
-        if account.account_number < node.account.account_number:
-            # Go left if the account number is less than the current node's account number
-            if node.left is None:
-                node.left = BSTNode(account)  # Create a new node if left child is empty
+        """Insert a new account into the tree (replaces an account with the same number).
+        Returns the indexed account object, which callers should use from then on."""
+        key = account.account_number
+        path = []  # Nodes visited from the root down to the insertion point
+        node = self.root
+        while node:
+            path.append(node)
+            if key < node.account.account_number:
+                node = node.left
+            elif key > node.account.account_number:
+                node = node.right
             else:
-                self._insert_recursive(node.left, account)  # Recurse to the left subtree
+                # Account number already indexed: replace it
+                self._unindex_owner(node.account)
+                node.account = account
+                self._index_owner(account)
+                return account
+
+        new_node = BSTNode(account)
+        self.size += 1
+        self._index_owner(account)
+        if not path:
+            # If tree is empty, set the root to a new node containing the account
+            self.root = new_node
+            return account
+
+        parent = path[-1]
+        if key < parent.account.account_number:
+            parent.left = new_node
         else:
-            # Go right if the account number is greater or equal
-            if node.right is None:
-                node.right = BSTNode(account)  # Create a new node if right child is empty
+            parent.right = new_node
+        self._rebalance_path(path)
+        return account
+
+    def bulk_load(self, accounts):
+        """Build a perfectly balanced tree in one bottom-up pass from accounts sorted by
+        account number (the tree must be empty). O(n), no rotations needed."""
+        if self.root is not None:
+            raise ValueError("bulk_load requires an empty tree")
+        accounts = list(accounts)
+        for previous, current in zip(accounts, accounts[1:]):
+            if not previous.account_number < current.account_number:
+                raise ValueError("bulk_load requires accounts sorted by unique account number")
+
+        nodes = [BSTNode(account) for account in accounts]
+        # Each work item is (low, high, parent, is_left): build the middle node of nodes[low:high]
+        work = [(0, len(nodes), None, False)]
+        while work:
+            low, high, parent, is_left = work.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            node = nodes[middle]
+            node.height = (high - low).bit_length()  # Height of a midpoint-split subtree of this size
+            if parent is None:
+                self.root = node
+            elif is_left:
+                parent.left = node
             else:
-                self._insert_recursive(node.right, account)  # Recurse to the right subtree
+                parent.right = node
+            work.append((low, middle, node, True))
+            work.append((middle + 1, high, node, False))
+
+        self.size = len(accounts)
+        # Accounts arrive in account-number order, so appending keeps each owner's lists sorted
+        for account in accounts:
+            numbers, owned = self.owner_index.setdefault(account.owner_username, ([], []))
+            numbers.append(account.account_number)
+            owned.append(account)
 
     def find_account(self, account_number):
         """Find and return an account by account number"""
-        return self._find_recursive(self.root, account_number)
+        node = self.root
+        while node:
+            if account_number == node.account.account_number:
+                return node.account
+            # Search the left subtree if account number is smaller, the right subtree otherwise
+            node = node.left if account_number < node.account.account_number else node.right
+        return None
+
+    def delete(self, account_number):
+        """Remove an account by account number and return it (None if not found)"""
+        path = []
+        node = self.root
+        while node and node.account.account_number != account_number:
+            path.append(node)
+            node = node.left if account_number < node.account.account_number else node.right
+        if node is None:
+            return None
+
+        removed = node.account
+        path.append(node)
+        if node.left and node.right:
+            # Two children: move the in-order successor's account here, then unlink the successor
+            successor = node.right
+            path.append(successor)
+            while successor.left:
+                successor = successor.left
+                path.append(successor)
+            node.account = successor.account
+
+        # The last node on the path now has at most one child; splice it out
+        target = path.pop()
+        child = target.left or target.right
+        if not path:
+            self.root = child
+        elif path[-1].left is target:
+            path[-1].left = child
+        else:
+            path[-1].right = child
+
+        self.size -= 1
+        self._rebalance_path(path)
+        self._unindex_owner(removed)
+        return removed
+
+    def range_scan(self, low=None, high=None):
+        """Yield accounts with low <= account_number <= high in order (None = unbounded)"""
+        stack = []
+        node = self.root
+        while stack or node:
+            # Descend left, skipping subtrees that lie entirely below the lower bound
+            while node:
+                if low is not None and node.account.account_number < low:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if high is not None and node.account.account_number > high:
+                return  # Everything after this point is above the upper bound
+            yield node.account
+            node = node.right
+
+    def prefix_scan(self, prefix):
+        """Yield accounts whose account number starts with the given prefix, in order"""
+        for account in self.range_scan(low=prefix):
+            if not account.account_number.startswith(prefix):
+                break
+            yield account
+
+    def _index_owner(self, account):
+        """Add an account to its owner's entry in the secondary index"""
+        numbers, accounts = self.owner_index.setdefault(account.owner_username, ([], []))
+        position = bisect_left(numbers, account.account_number)
+        numbers.insert(position, account.account_number)
+        accounts.insert(position, account)
 
-    def _find_recursive(self, node, account_number):
-        """Helper function to search for an account recursively"""
-        if node is None or node.account.account_number == account_number:
-            # Base case: If node is None or account found, return the account
-            return node.account if node else None
+    def _unindex_owner(self, account):
+        """Remove an account from its owner's entry in the secondary index"""
+        entry = self.owner_index.get(account.owner_username)
+        if entry is None:
+            return
+        numbers, accounts = entry
+        position = bisect_left(numbers, account.account_number)
+        if position < len(numbers) and numbers[position] == account.account_number:
+            del numbers[position]
+            del accounts[position]
+        if not numbers:
+            del self.owner_index[account.owner_username]  # Drop owners with no accounts left
 
-        if account_number < node.account.account_number:
-            # Search the left subtree if account number is smaller
-            return self._find_recursive(node.left, account_number)
-        return self._find_recursive(node.right, account_number)  # Search the right subtree otherwise
+    def change_owner(self, account_number, new_owner_username):
+        """Transfer ownership of an account, keeping the owner index in sync"""
+        account = self.find_account(account_number)
+        if account is None:
+            return None
+        self._unindex_owner(account)
+        account.owner_username = new_owner_username
+        self._index_owner(account)
+        return account
 
     def get_user_accounts(self, username):
-        """Get all accounts owned by a specific user"""
-        accounts = []  # List to collect user's accounts
-        self._get_user_accounts_recursive(self.root, username, accounts)  # Recursive helper call
-        return accounts
-
-    def _get_user_accounts_recursive(self, node, username, accounts):
-        """Helper function to find all accounts owned by a user recursively"""
-        if node:
-            if node.account.owner_username == username:
-                # Add account to list if it matches the owner's username
-                accounts.append(node.account)
-            # Recurse into left and right subtrees
-            self._get_user_accounts_recursive(node.left, username, accounts)
-            self._get_user_accounts_recursive(node.right, username, accounts)
\ No newline at end of file
+        """Get all accounts owned by a specific user, sorted by account number"""
+        entry = self.owner_index.get(username)
+        return list(entry[1]) if entry else []
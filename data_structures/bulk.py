@@ -0,0 +1,295 @@
+# Import necessary modules
+from contextlib import ExitStack, nullcontext  # Holding the engine and storage locks together
+from datetime import datetime  # Parsing ISO timestamps and restoring creation dates
+import csv  # CSV input/output
+import itertools  # Batching streamed rows
+import json  # JSON-lines input/output
+
+from data_structures.bst import BankAccount
+from data_structures.money import DEFAULT_CURRENCY, to_decimal, to_minor
+from data_structures.transaction import Transaction, TransactionStatus, TransactionType, epoch_seconds
+
+# Column layout of each file kind (CSV header / JSON-lines keys)
+USER_FIELDS = ('username', 'password_hash')
+ACCOUNT_FIELDS = ('account_number', 'owner_username', 'account_type', 'balance', 'creation_date', 'currency')
+TRANSACTION_FIELDS = ('account_number', 'type', 'amount', 'description', 'timestamp', 'priority')
+TRANSFER_FIELDS = ('from_account', 'to_account', 'amount', 'type', 'timestamp', 'currency')
+
+
+def read_rows(path):
+    """Stream rows as dictionaries from a .csv or .jsonl file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class _RowWriter:
+    """Streaming writer for .csv or .jsonl files"""
+    def __init__(self, path, fields):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.fields = fields
+        self.csv = None
+        if path.endswith('.csv'):
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(fields)
+
+    def write(self, values):
+        if self.csv is not None:
+            self.csv.writerow(values)
+        else:
+            self.file.write(json.dumps(dict(zip(self.fields, values))) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+def _timestamp(value):
+    """Parse epoch seconds or an ISO-8601 string (empty means now)"""
+    if value in (None, ''):
+        return epoch_seconds()
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(float(value))
+    except ValueError:
+        return epoch_seconds(datetime.fromisoformat(value))
+
+
+def _amount(value, currency=DEFAULT_CURRENCY):
+    """Exact decimal string of a minor-unit amount (amounts are written as strings so
+    neither CSV nor JSON round-trips them through a float)"""
+    return str(to_decimal(value, currency))
+
+
+def _batches(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# Streaming bulk import/export of users, accounts, historical transactions and transfers.
+# Accounts sorted by account number are built into the balanced index in a single
+# bottom-up pass; users are inserted with one up-front table resize and transfers
+# are added to the graph in batches under one lock acquisition each. When a
+# StorageEngine is attached the loaded state is persisted with one snapshot per
+# load instead of one log record per row. Loads hold `lock` (the engine's lock
+# for a loader built with from_engine) so they never race live sessions. Rows a
+# load rejects are listed in `errors` as (row number, message) pairs until the
+# next load.
+class BulkLoader:
+    def __init__(self, user_db, account_bst, transaction_graph, storage=None, batch_size=10000,
+                 transaction_processor=None, lock=None):
+        self.user_db = user_db
+        self.account_bst = account_bst
+        self.transaction_graph = transaction_graph
+        self.storage = storage
+        self.batch_size = batch_size
+        self.transaction_processor = transaction_processor
+        self.lock = lock  # Guards user_db, account_bst and the account histories
+        self.errors = []  # (row number, message) of the rows rejected by the last load
+
+    @classmethod
+    def from_engine(cls, engine, batch_size=10000):
+        return cls(engine.user_db, engine.account_bst, engine.transaction_graph, engine.storage, batch_size,
+                   engine.transaction_processor, engine.lock)
+
+    def _write_lock(self):
+        """The loader's lock plus the storage lock (engine -> storage, as in BankEngine)"""
+        stack = ExitStack()
+        if self.lock is not None:
+            stack.enter_context(self.lock)
+        if self.storage is not None:
+            stack.enter_context(self.storage.lock)
+        return stack
+
+    def _persist(self):
+        if self.storage is not None:
+            self.storage.snapshot()
+
+    def load_users(self, path):
+        """Load username/password_hash rows; returns the number of users loaded. Rows whose
+        username already exists (in the table or earlier in the file) are rejected and
+        listed in `errors`; existing password hashes are never replaced."""
+        self.errors = []
+        count = 0
+        with self._write_lock():
+            for batch in _batches(enumerate(read_rows(path), 1), self.batch_size):
+                users = {}  # Earlier batches are already in user_db
+                for row_number, row in batch:
+                    username = row['username']
+                    if username in users or self.user_db.exists(username):
+                        self.errors.append((row_number, f"User {username} already exists"))
+                        continue
+                    users[username] = row['password_hash']
+                self.user_db.insert_many(users.items())
+                count += len(users)
+            self._persist()
+        return count
+
+    def load_accounts(self, path):
+        """Load account rows; returns the number of accounts loaded. Rows whose account
+        number already exists (in the index or earlier in the file) are rejected and
+        listed in `errors`; existing accounts are never replaced."""
+        rows = []
+        for row_number, row in enumerate(read_rows(path), 1):
+            account = BankAccount(
+                account_number=row['account_number'],
+                owner_username=row['owner_username'],
+                account_type=row.get('account_type') or "Regular",
+                balance=row.get('balance') or 0,
+                currency=row.get('currency') or DEFAULT_CURRENCY
+            )
+            if row.get('creation_date'):
+                account.creation_date = datetime.fromtimestamp(_timestamp(row['creation_date']))
+            rows.append((row_number, account))
+
+        self.errors = []
+        with self._write_lock():
+            accounts = []
+            seen = set()
+            for row_number, account in rows:
+                if account.account_number in seen or self.account_bst.find_account(account.account_number):
+                    self.errors.append((row_number, f"Account {account.account_number} already exists"))
+                    continue
+                seen.add(account.account_number)
+                accounts.append(account)
+
+            if len(self.account_bst) == 0:
+                # Partner files are usually sorted already; sorting an already-sorted list is O(n)
+                accounts.sort(key=lambda account: account.account_number)
+                self.account_bst.bulk_load(accounts)
+            else:
+                for account in accounts:
+                    self.account_bst.insert(account)
+            self._persist()
+        return len(accounts)
+
+    def load_transactions(self, path):
+        """Append historical transactions to account histories (balances are not changed);
+        returns the number of rows loaded. Rows for unknown accounts are listed in `errors`."""
+        self.errors = []
+        count = 0
+        with self._write_lock():
+            account = None
+            for row_number, row in enumerate(read_rows(path), 1):
+                # Consecutive rows usually belong to the same account; skip the repeated lookup
+                if account is None or account.account_number != row['account_number']:
+                    account = self.account_bst.find_account(row['account_number'])
+                if account is None:
+                    self.errors.append((row_number, f"Unknown account {row['account_number']}"))
+                    continue
+                account.transaction_history.append_record(
+                    row['type'], to_minor(row['amount'], account.currency), row.get('description') or '',
+                    _timestamp(row.get('timestamp')), TransactionStatus.COMPLETED,
+                    int(row.get('priority') or 3)
+                )
+                count += 1
+            self._persist()
+        return count
+
+    def queue_transactions(self, path):
+        """Queue deposit/withdrawal rows (TRANSACTION_FIELDS; priority is ignored and
+        rescored) for processing. The whole file is scored and queued as one batch.
+        Returns the queued transaction ids; rows for unknown accounts are listed in `errors`."""
+        if self.transaction_processor is None:
+            raise ValueError("No transaction processor attached")
+        self.errors = []
+        transactions = []
+        # Rows are resolved under the loader's lock alone and queued after releasing
+        # it: the processor lock comes before the engine lock in the lock order
+        with self.lock if self.lock is not None else nullcontext():
+            account = None
+            for row_number, row in enumerate(read_rows(path), 1):
+                if account is None or account.account_number != row['account_number']:
+                    account = self.account_bst.find_account(row['account_number'])
+                if account is None:
+                    self.errors.append((row_number, f"Unknown account {row['account_number']}"))
+                    continue
+                transactions.append(Transaction(
+                    type=TransactionType.parse(row['type']),
+                    amount_minor=to_minor(row['amount'], account.currency),
+                    currency=account.currency,
+                    description=row.get('description') or '',
+                    account=account,
+                    account_type=account.account_type
+                ))
+        return self.transaction_processor.add_transactions(transactions)
+
+    def load_transfers(self, path):
+        """Load transfer edges into the graph in batches; returns the number loaded.
+        Amounts are in the row's currency (default: the sender's, if it is a known
+        account). Each batch is added in timestamp order (the graph also places edges
+        older than an account's newest edge in order, at a small extra cost)."""
+        count = 0
+        with self._write_lock():
+            wal, self.transaction_graph.wal = self.transaction_graph.wal, None  # Persisted by the snapshot instead
+            try:
+                for batch in _batches(read_rows(path), self.batch_size):
+                    edges = []
+                    for row in batch:
+                        currency = row.get('currency') or self._account_currency(row['from_account'])
+                        edges.append((row['from_account'], row['to_account'], to_minor(row['amount'], currency),
+                                      row.get('type') or 'transfer', _timestamp(row.get('timestamp')), currency))
+                    edges.sort(key=lambda edge: edge[4])
+                    self.transaction_graph.add_transactions(edges, minor_units=True)
+                    count += len(batch)
+            finally:
+                self.transaction_graph.wal = wal
+            self._persist()
+        return count
+
+    def _account_currency(self, account_number):
+        account = self.account_bst.find_account(account_number)
+        return account.currency if account is not None else DEFAULT_CURRENCY
+
+    def export_users(self, path):
+        writer = _RowWriter(path, USER_FIELDS)
+        try:
+            for username, password_hash in self.user_db.items():
+                writer.write((username, password_hash))
+        finally:
+            writer.close()
+
+    def export_accounts(self, path):
+        """Write accounts in account-number order (ready for a bottom-up reload)"""
+        writer = _RowWriter(path, ACCOUNT_FIELDS)
+        try:
+            for account in self.account_bst:
+                writer.write((account.account_number, account.owner_username, account.account_type,
+                              _amount(account.balance_minor, account.currency), epoch_seconds(account.creation_date),
+                              account.currency))
+        finally:
+            writer.close()
+
+    def export_transactions(self, path):
+        writer = _RowWriter(path, TRANSACTION_FIELDS)
+        try:
+            for account in self.account_bst:
+                for transaction in account.transaction_history:
+                    writer.write((account.account_number, transaction['type'],
+                                  _amount(transaction.amount_minor, transaction.currency),
+                                  transaction.description, transaction.timestamp, transaction.priority))
+        finally:
+            writer.close()
+
+    def export_transfers(self, path):
+        writer = _RowWriter(path, TRANSFER_FIELDS)
+        try:
+            with self.transaction_graph.lock:
+                edges = [
+                    edge for outgoing in self.transaction_graph.out_edges.values() for edge in outgoing
+                    if not edge.compacted
+                ]
+            for edge in edges:
+                transaction = edge.transaction
+                writer.write((edge.source, edge.target, _amount(transaction.amount_minor, transaction.currency),
+                              transaction['type'], transaction.timestamp, transaction.currency))
+        finally:
+            writer.close()
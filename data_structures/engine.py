@@ -0,0 +1,180 @@
+# Import necessary modules
+from contextlib import nullcontext  # No-op lock when running without storage
+import threading  # Serializes access to the shared structures
+
+from data_structures.bst import BankAccount, BankAccountBST
+from data_structures.graph import TransactionGraph
+from data_structures.hashtable import OpenAddressingHashTable
+from data_structures.money import DEFAULT_CURRENCY
+from data_structures.passwords import PasswordHasher
+from data_structures.priority_queue import TransactionProcessor
+from data_structures.storage import StorageEngine
+from data_structures.transaction import Transaction, TransactionType
+
+# Process-wide banking service owning one copy of every data structure.
+# All sessions call into the same engine, so they share one consistent ledger
+# and per-session memory is just the login state. Every public method is
+# thread-safe: reads and writes of the user table and account index happen
+# under `lock`, and mutations are logged to the optional StorageEngine.
+# Without a data directory, account_index may supply another account index
+# (e.g. a ledger-backed LedgerAccountIndex) in place of the in-memory tree.
+class BankEngine:
+    def __init__(self, data_directory=None, transaction_processor=None, password_hasher=None,
+                 transaction_graph=None, account_index=None):
+        if data_directory is not None and account_index is not None:
+            raise ValueError("account_index cannot be combined with a data directory")
+        self.lock = threading.RLock()
+        self.password_hasher = password_hasher or PasswordHasher()
+        if data_directory is not None:
+            self.storage = StorageEngine(data_directory)
+            self.user_db, self.account_bst, self.transaction_graph = self.storage.recover(
+                transaction_graph=transaction_graph
+            )
+        else:
+            self.storage = None
+            self.user_db = OpenAddressingHashTable()
+            self.account_bst = account_index if account_index is not None else BankAccountBST()
+            self.transaction_graph = transaction_graph if transaction_graph is not None else TransactionGraph()
+        self.transaction_processor = transaction_processor or TransactionProcessor()
+        self.transaction_processor.wal = self.storage
+        self.transaction_processor.transaction_graph = self.transaction_graph  # Velocity features for scoring
+
+    def _write_lock(self):
+        """Engine lock plus the storage lock, so a mutation and its log record stay together"""
+        return self.storage.lock if self.storage is not None else nullcontext()
+
+    # User management
+    def register_user(self, username, password_hash):
+        """Store a new user; returns False if the username is taken"""
+        with self.lock, self._write_lock():
+            if self.user_db.exists(username):
+                return False
+            self.user_db.insert(username, password_hash)
+            if self.storage is not None:
+                self.storage.log_user(username, password_hash)
+            return True
+
+    def get_password_hash(self, username):
+        with self.lock:
+            return self.user_db.get(username)
+
+    def create_user(self, username, password):
+        """Hash a password and store a new user; returns False if the username is taken"""
+        if self.get_password_hash(username) is not None:
+            return False  # Skip the KDF work for names that are obviously taken
+        return self.register_user(username, self.password_hasher.hash(password))
+
+    def authenticate(self, username, password):
+        """Check a user's password, upgrading the stored hash if it uses outdated parameters"""
+        stored_hash = self.get_password_hash(username)
+        valid, new_hash = self.password_hasher.verify_and_update(password, stored_hash)
+        if valid and new_hash is not None:
+            with self.lock, self._write_lock():
+                if self.user_db.get(username) == stored_hash:  # Not changed concurrently
+                    self.user_db.insert(username, new_hash)
+                    if self.storage is not None:
+                        self.storage.log_user(username, new_hash)
+        return valid
+
+    # Account management
+    def open_account(self, account_number, owner_username, account_type="Regular", initial_deposit=0,
+                     currency=DEFAULT_CURRENCY):
+        """Open an account (queueing any initial deposit); returns None if the number is taken"""
+        with self.lock, self._write_lock():
+            if self.account_bst.find_account(account_number):
+                return None
+            account = BankAccount(
+                account_number=account_number,
+                owner_username=owner_username,
+                account_type=account_type,
+                balance=0,  # Initialize with 0 balance
+                currency=currency
+            )
+            account = self.account_bst.insert(account)  # The index may store its own (e.g. ledger-backed) object
+            if self.storage is not None:
+                self.storage.log_account(account)
+        if initial_deposit > 0:
+            self.deposit(account, initial_deposit, "Initial deposit")
+        return account
+
+    def find_account(self, account_number):
+        with self.lock:
+            return self.account_bst.find_account(account_number)
+
+    def get_user_accounts(self, username):
+        with self.lock:
+            return self.account_bst.get_user_accounts(username)
+
+    def upgrade_account(self, account):
+        """Upgrade an account to VIP"""
+        with self.lock, self._write_lock():
+            account.account_type = "VIP"
+            if self.storage is not None:
+                self.storage.log_account_update(account)
+
+    # Transactions
+    def deposit(self, account, amount, description=""):
+        """Queue a deposit; returns the pending transaction id"""
+        return self.transaction_processor.add_transaction(Transaction(
+            type=TransactionType.DEPOSIT,
+            amount=amount,
+            description=description,
+            account=account,
+            account_type=account.account_type,
+            currency=account.currency
+        ))
+
+    def withdraw(self, account, amount, description=""):
+        """Queue a withdrawal; returns the pending transaction id"""
+        return self.transaction_processor.add_transaction(Transaction(
+            type=TransactionType.WITHDRAW,
+            amount=amount,
+            description=description,
+            account=account,
+            account_type=account.account_type,
+            currency=account.currency
+        ))
+
+    def enqueue_transactions(self, transactions):
+        """Queue many deposits/withdrawals at once (scored as one batch); returns their ids"""
+        return self.transaction_processor.add_transactions(transactions)
+
+    def transfer(self, from_account, to_account, amount, description=None):
+        """Transfer between two accounts; returns False if the sender has insufficient funds"""
+        return self.transaction_graph.transfer_between_accounts(
+            from_account, to_account, amount, self.transaction_processor, description
+        )
+
+    def transfer_batch(self, transfers, description=None):
+        """Apply many (from_account, to_account, amount) transfers atomically;
+        returns False, applying none of them, if any would overdraw its account"""
+        return self.transaction_graph.transfer_batch(transfers, self.transaction_processor, description)
+
+    def detect_cycle_for_edge(self, from_account_number, to_account_number):
+        return self.transaction_graph.detect_cycle_for_edge(from_account_number, to_account_number)
+
+    @property
+    def pending_transactions(self):
+        return self.transaction_processor.pending_transactions
+
+    def get_pending_transactions(self, username):
+        """Pending transactions on accounts owned by a user, in processing order"""
+        return [
+            pt for pt in self.transaction_processor.pending_transactions
+            if pt.transaction.account.owner_username == username
+        ]
+
+    def get_pending_page(self, username, after=None, limit=20):
+        """One page of a user's pending transactions; returns (items, next_cursor or None)"""
+        return self.transaction_processor.pending_page(
+            after, limit, lambda pt: pt.transaction.account.owner_username == username
+        )
+
+    def process_pending_transaction(self, transaction_id):
+        return self.transaction_processor.process_pending_transaction(transaction_id)
+
+    def close(self):
+        """Stop background work and flush durable state"""
+        self.transaction_processor.stop_processing()
+        if self.storage is not None:
+            self.storage.close()
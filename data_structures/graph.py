@@ -1,124 +1,620 @@
 # Import necessary modules
-from datetime import datetime  # For tracking transaction timestamps
+import time  # For tracking transaction timestamps (integer epoch seconds)
+from contextlib import nullcontext  # No-op lock when no write-ahead log is attached
 import threading  # To handle concurrent operations safely
+import logging  # Reports unexpected transfer errors
+from collections import deque  # Sliding-window event buffers and per-account edge lists
+from heapq import merge  # Interleaving out- and in-edges by time
 
-# Class representing a transaction graph
+from data_structures.graph_csr import CSRGraph
+from data_structures.metrics import METRICS, now
+from data_structures.money import DEFAULT_CURRENCY, from_minor, to_minor
+from data_structures.transaction import Transaction, TransactionType, TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+# Graph metrics (recorded only while METRICS.enabled is set)
+EDGES_ADDED = METRICS.counter("bank_graph_edges_added", "Transfer edges added to the transaction graph")
+EDGES_COMPACTED = METRICS.counter("bank_graph_edges_compacted", "Expired edges folded into pair summaries")
+TRANSFERS_REJECTED = METRICS.counter("bank_transfers_rejected", "Transfers rejected for insufficient funds")
+CYCLES_FOUND = METRICS.counter("bank_cycles_detected", "Circular transfer patterns detected")
+GRAPH_LOCK_SECONDS = METRICS.histogram(
+    "bank_lock_hold_seconds", "Time a lock was held per acquisition", labels={'lock': 'graph'}
+)
+CYCLE_SECONDS = {
+    method: METRICS.histogram("bank_cycle_detection_seconds", "Time spent searching for circular transfers",
+                              labels={'method': method})
+    for method in ('account', 'edge', 'components')
+}
+
+# Default aggregate windows in seconds: 1 hour, 24 hours and 7 days
+DEFAULT_WINDOWS = (3600, 24 * 3600, 7 * 24 * 3600)
+
+def _insert_in_order(items, item, key):
+    """Insert into a deque kept in key order, scanning back from the newest end
+    (late arrivals are rare and usually only slightly out of order)"""
+    position = len(items)
+    item_key = key(item)
+    while position and key(items[position - 1]) > item_key:
+        position -= 1
+    items.insert(position, item)
+
+
+def _edge_time(edge):
+    return edge.transaction.timestamp
+
+
+def _event_time(event):
+    return event[0]
+
+
+# Running aggregates over the transfers of one account inside a sliding time window.
+# Events are expired from the front as time moves forward, so every update and
+# query is amortized O(1); the maximum is tracked with a monotonic deque.
+# Amounts are integer minor units, so the running sums are exact. An event older
+# than the newest one is inserted in time order (rebuilding the maxima), so a
+# late transfer can never be kept alive by newer events in front of it.
+class SlidingWindowAggregate:
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self.events = deque()  # (timestamp, amount_minor, is_incoming) in arrival order
+        self.maxima = deque()  # (timestamp, amount_minor) with strictly decreasing amounts
+        self.count = 0
+        self.sum_in = 0
+        self.sum_out = 0
+
+    def add(self, timestamp, amount, is_incoming):
+        """Record a transfer into (is_incoming=True) or out of the account"""
+        self.count += 1
+        if is_incoming:
+            self.sum_in += amount
+        else:
+            self.sum_out += amount
+        if self.events and self.events[-1][0] > timestamp:
+            _insert_in_order(self.events, (timestamp, amount, is_incoming), _event_time)
+            self.maxima.clear()
+            for event_timestamp, event_amount, _ in self.events:
+                self._push_maximum(event_timestamp, event_amount)
+            return
+        self.events.append((timestamp, amount, is_incoming))
+        self._push_maximum(timestamp, amount)
+
+    def _push_maximum(self, timestamp, amount):
+        # Smaller amounts that arrived earlier can never be the maximum again
+        while self.maxima and self.maxima[-1][1] <= amount:
+            self.maxima.pop()
+        self.maxima.append((timestamp, amount))
+
+    def expire(self, now):
+        """Drop events that have fallen out of the window"""
+        cutoff = now - self.window_seconds
+        events = self.events
+        while events and events[0][0] < cutoff:
+            _, amount, is_incoming = events.popleft()
+            self.count -= 1
+            if is_incoming:
+                self.sum_in -= amount
+            else:
+                self.sum_out -= amount
+        while self.maxima and self.maxima[0][0] < cutoff:
+            self.maxima.popleft()
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_in': self.sum_in,
+            'sum_out': self.sum_out,
+            'max': self.maxima[0][1] if self.maxima else 0
+        }
+
+# One transfer in the graph. The same record is referenced from the sender's
+# out-list and the receiver's in-list, so each edge is stored once. A compacted
+# edge stays in its lists as a tombstone until it reaches the front of them.
+class Edge:
+    __slots__ = ('source', 'target', 'transaction', 'compacted')
+
+    def __init__(self, source, target, transaction):
+        self.source = source  # Sending account number
+        self.target = target  # Receiving account number
+        self.transaction = transaction  # Compact Transaction record (amount, type, timestamp)
+        self.compacted = False  # Folded into its pair summary; readers skip it
+
+
+# Lifetime totals of the compacted (expired) transfers from one account to another
+class PairSummary:
+    __slots__ = ('count', 'total', 'first_seen', 'last_seen')
+
+    def __init__(self, count=0, total=0, first_seen=None, last_seen=None):
+        self.count = count
+        self.total = total  # Minor units
+        self.first_seen = first_seen  # Epoch seconds
+        self.last_seen = last_seen
+
+    def add(self, count, total, first_seen, last_seen):
+        self.count += count
+        self.total += total
+        self.first_seen = first_seen if self.first_seen is None else min(self.first_seen, first_seen)
+        self.last_seen = last_seen if self.last_seen is None else max(self.last_seen, last_seen)
+
+    def snapshot(self):
+        return {'count': self.count, 'total': self.total, 'first_seen': self.first_seen, 'last_seen': self.last_seen}
+
+
+# Class representing a transaction graph.
+# Edges live in directed per-account lists (out_edges by sender, in_edges by
+# receiver) kept in timestamp order. Optional retention policies bound memory in
+# long-running processes: edges older than max_edge_age seconds, and the
+# oldest edges beyond max_edges_per_account in any one list, are folded into
+# per-pair summaries so lifetime totals are never lost. Age-based expiry runs
+# every compaction_interval new edges (or on demand via compact()). Compacted
+# edges are tombstoned rather than removed from the middle of a list: they are
+# popped once they reach its front, and a list is rebuilt when most of it is dead.
 class TransactionGraph:
-    def __init__(self):
-        # Adjacency list to represent the graph: 
-        # {account_number: [(connected_account, transaction_details)]}
-        self.adjacency_list = {}
+    def __init__(self, windows=DEFAULT_WINDOWS, max_edge_age=None, max_edges_per_account=None,
+                 compaction_interval=10000):
+        if max_edges_per_account is not None and max_edges_per_account < 1:
+            raise ValueError("max_edges_per_account must be at least 1")
         self.lock = threading.Lock()  # Ensure thread-safe access
+        self.windows = tuple(windows)  # Aggregate window lengths in seconds
+        # Incremental volume aggregates: {account_number: {window_seconds: SlidingWindowAggregate}}
+        self.window_aggregates = {}
+        # Directed edge lists in timestamp order (late edges are inserted in place): {account_number: deque of Edge}
+        self.out_edges = {}  # Transfers sent by the account (used by cycle detection)
+        self.in_edges = {}  # Transfers received by the account
+        self.out_live = {}  # {account_number: live edges in its out-list}
+        self.in_live = {}  # {account_number: live edges in its in-list}
+        self.edge_count = 0  # Live (not yet compacted) edges
+        # Retention policy
+        self.max_edge_age = max_edge_age  # Seconds; None keeps edges regardless of age
+        self.max_edges_per_account = max_edges_per_account  # Per out/in list; None is unbounded
+        self.compaction_interval = compaction_interval
+        self.edges_since_compaction = 0
+        self.pair_summaries = {}  # {(from_account, to_account): PairSummary} of compacted edges
+        # Currency of every account with edges: an account's aggregates and summaries are
+        # all in its own minor units, so edges in any other currency are rejected
+        self.currencies = {}
+        self.wal = None  # Optional StorageEngine that logs every new edge
 
-    def add_transaction(self, from_account_number, to_account_number, amount, transaction_type):
-        """Add a new transaction to the graph"""
-        with self.lock:  # Lock to ensure thread-safe operations
-            # Initialize adjacency lists for accounts if they don't exist
-            if from_account_number not in self.adjacency_list:
-                self.adjacency_list[from_account_number] = []
-            if to_account_number not in self.adjacency_list:
-                self.adjacency_list[to_account_number] = []
-
-            # Create a transaction detail dictionary
-            transaction_detail = {
-                'amount': amount,
-                'timestamp': datetime.now(),  # Record the current time
-                'type': transaction_type  # Type of transaction (e.g., transfer)
-            }
+    def add_transaction(self, from_account_number, to_account_number, amount, transaction_type, timestamp=None,
+                        currency=DEFAULT_CURRENCY):
+        """Add a new transaction to the graph (timestamp defaults to now).
+        The amount is in major units of currency and stored as exact minor units."""
+        amount_minor = to_minor(amount, currency)
+        wal = self.wal
+        # The edge and its log record are written together under the storage lock
+        with (wal.lock if wal is not None else nullcontext()), self.lock:  # Lock to ensure thread-safe operations
+            acquired = now() if METRICS.enabled else 0.0
+            self._add_edge(from_account_number, to_account_number, amount_minor, transaction_type, timestamp, wal,
+                           currency)
+            if acquired:
+                GRAPH_LOCK_SECONDS.observe(now() - acquired)
+                EDGES_ADDED.inc()
 
-            # Add transaction details to both the sender and receiver's adjacency lists
-            self.adjacency_list[from_account_number].append((to_account_number, transaction_detail))
-            self.adjacency_list[to_account_number].append((from_account_number, transaction_detail))
+    def add_transactions(self, edges, minor_units=False):
+        """Add a batch of (from, to, amount, type, timestamp[, currency]) edges under a single lock
+        acquisition. Amounts are in major units of the edge's currency (default: DEFAULT_CURRENCY),
+        or integer minor units with minor_units=True."""
+        wal = self.wal
+        with (wal.lock if wal is not None else nullcontext()), self.lock:
+            acquired = now() if METRICS.enabled else 0.0
+            count = 0
+            for edge in edges:
+                from_account_number, to_account_number, amount, transaction_type, timestamp = edge[:5]
+                currency = edge[5] if len(edge) > 5 else DEFAULT_CURRENCY
+                self._add_edge(from_account_number, to_account_number,
+                               amount if minor_units else to_minor(amount, currency),
+                               transaction_type, timestamp, wal, currency)
+                count += 1
+            if acquired:
+                GRAPH_LOCK_SECONDS.observe(now() - acquired)
+                EDGES_ADDED.inc(count)
 
-    def transfer_between_accounts(self, from_account, to_account, amount, transaction_processor):
-        """Handle transfer between two accounts"""
-        try:
-            if from_account.balance >= amount:  # Ensure sufficient funds
-                # Create a withdrawal transaction for the sender
-                withdraw_transaction = {
-                    'type': 'withdraw',
-                    'amount': amount,
-                    'description': f"Transfer to {to_account.account_number}",
-                    'account': from_account,
-                    'account_type': from_account.account_type,
-                    'timestamp': datetime.now()
-                }
-                
-                # Create a deposit transaction for the receiver
-                deposit_transaction = {
-                    'type': 'deposit',
-                    'amount': amount,
-                    'description': f"Transfer from {from_account.account_number}",
-                    'account': to_account,
-                    'account_type': to_account.account_type,
-                    'timestamp': datetime.now()
-                }
-
-                # Add both transactions to the transaction processor for handling
-                transaction_processor.add_transaction(withdraw_transaction)
-                transaction_processor.add_transaction(deposit_transaction)
-
-                # Add the transfer details to the transaction graph
-                self.add_transaction(
-                    from_account.account_number,
-                    to_account.account_number,
-                    amount,
-                    "transfer"
-                )
-                return True  # Transfer succeeded
+    def _add_edge(self, from_account_number, to_account_number, amount_minor, transaction_type, timestamp, wal,
+                  currency=DEFAULT_CURRENCY):
+        """Record one edge (caller holds the lock)"""
+        self._check_currencies([(from_account_number, to_account_number, currency)])
+        self.currencies[from_account_number] = self.currencies[to_account_number] = currency
+
+        # Create a compact transaction detail record (timestamped with the current time)
+        transaction_detail = Transaction(
+            type=TransactionType.parse(transaction_type),  # Type of transaction (e.g., transfer)
+            amount_minor=amount_minor,
+            currency=currency,
+            status=TransactionStatus.COMPLETED
+        )
+        if timestamp is not None:
+            transaction_detail.timestamp = timestamp
+
+        # One shared record in the sender's out-list and the receiver's in-list.
+        # Both lists stay in timestamp order: newest-first scans and front expiry rely on it.
+        edge = Edge(from_account_number, to_account_number, transaction_detail)
+        timestamp = transaction_detail.timestamp
+        outgoing = self.out_edges.get(from_account_number)
+        if outgoing is None:
+            outgoing = self.out_edges[from_account_number] = deque()
+        incoming = self.in_edges.get(to_account_number)
+        if incoming is None:
+            incoming = self.in_edges[to_account_number] = deque()
+        for edges in (outgoing, incoming):
+            if edges and edges[-1].transaction.timestamp > timestamp:
+                _insert_in_order(edges, edge, _edge_time)
             else:
-                # Insufficient funds
-                print(f"Insufficient funds. Available balance: {from_account.balance}, Required: {amount}")
-                return False
-        except Exception as e:
+                edges.append(edge)
+        self.out_live[from_account_number] = self.out_live.get(from_account_number, 0) + 1
+        self.in_live[to_account_number] = self.in_live.get(to_account_number, 0) + 1
+        self.edge_count += 1
+
+        # Update the sliding-window aggregates of both accounts
+        for aggregate in self._aggregates_for(from_account_number).values():
+            aggregate.expire(timestamp)
+            aggregate.add(timestamp, amount_minor, False)
+        for aggregate in self._aggregates_for(to_account_number).values():
+            aggregate.expire(timestamp)
+            aggregate.add(timestamp, amount_minor, True)
+
+        if wal is not None:
+            wal.log_edge(from_account_number, to_account_number, transaction_detail)
+
+        # Apply the retention policy
+        if self.max_edges_per_account is not None:
+            # The front of every list is live, and it is the oldest edge
+            for edges, live, account_number in ((self.out_edges, self.out_live, from_account_number),
+                                                (self.in_edges, self.in_live, to_account_number)):
+                while live.get(account_number, 0) > self.max_edges_per_account:
+                    self._compact_edge(edges[account_number][0])
+        if self.max_edge_age is not None:
+            self.edges_since_compaction += 1
+            if self.edges_since_compaction >= self.compaction_interval:
+                self._compact_expired(time.time() - self.max_edge_age)
+
+    def _check_currencies(self, edges):
+        """Raise ValueError if any (from, to, currency) edge would mix currencies on an
+        account, without changing anything (caller holds the lock)"""
+        seen = {}
+        for from_account_number, to_account_number, currency in edges:
+            for account_number in (from_account_number, to_account_number):
+                account_currency = seen.get(account_number) or self.currencies.get(account_number, currency)
+                if account_currency != currency:
+                    raise ValueError(f"Account {account_number} has {account_currency} transfers; "
+                                     f"cannot add a {currency} transfer")
+                seen[account_number] = currency
+
+    def _compact_edge(self, edge):
+        """Tombstone a live edge and fold it into its pair summary (caller holds the lock)"""
+        edge.compacted = True
+        for edges, live, account_number in ((self.out_edges, self.out_live, edge.source),
+                                            (self.in_edges, self.in_live, edge.target)):
+            self._prune(edges, live, account_number)
+        transaction = edge.transaction
+        key = (edge.source, edge.target)
+        summary = self.pair_summaries.get(key)
+        if summary is None:
+            summary = self.pair_summaries[key] = PairSummary()
+        summary.add(1, transaction.amount_minor, transaction.timestamp, transaction.timestamp)
+        self.edge_count -= 1
+        if METRICS.enabled:
+            EDGES_COMPACTED.inc()
+
+    @staticmethod
+    def _prune(edges, live, account_number):
+        """Account for one compacted edge in a list: pop dead edges off its front, and
+        rebuild it once tombstones outnumber live edges (amortized O(1) per edge)"""
+        live[account_number] -= 1
+        if not live[account_number]:
+            del edges[account_number], live[account_number]
+            return
+        account_edges = edges[account_number]
+        while account_edges[0].compacted:
+            account_edges.popleft()
+        if len(account_edges) > 2 * live[account_number]:
+            edges[account_number] = deque(edge for edge in account_edges if not edge.compacted)
+
+    def _compact_expired(self, cutoff):
+        """Compact every edge older than cutoff (caller holds the lock); returns the number compacted"""
+        self.edges_since_compaction = 0
+        compacted = 0
+        for account_number in list(self.out_edges):
+            # Lists are in time order with a live front, so expired edges are at the front.
+            # Look the list up each time: compaction may rebuild or drop it.
+            while True:
+                outgoing = self.out_edges.get(account_number)
+                if not outgoing or outgoing[0].transaction.timestamp >= cutoff:
+                    break
+                self._compact_edge(outgoing[0])
+                compacted += 1
+        return compacted
+
+    def compact(self, max_age=None):
+        """Compact edges older than max_age seconds (default: the max_edge_age policy)
+        into pair summaries now; returns the number of edges compacted"""
+        max_age = self.max_edge_age if max_age is None else max_age
+        if max_age is None:
+            return 0
+        with self.lock:
+            return self._compact_expired(time.time() - max_age)
+
+    def merge_pair_summary(self, from_account_number, to_account_number, count, total, first_seen, last_seen):
+        """Add previously compacted totals (e.g. from a snapshot) to a pair summary"""
+        with self.lock:
+            key = (from_account_number, to_account_number)
+            summary = self.pair_summaries.get(key)
+            if summary is None:
+                summary = self.pair_summaries[key] = PairSummary()
+            summary.add(count, total, first_seen, last_seen)
+
+    def get_pair_summary(self, from_account_number, to_account_number):
+        """Lifetime count, total (minor units), first and last seen of transfers from one
+        account to another, combining compacted summaries with the live edges"""
+        with self.lock:
+            summary = PairSummary()
+            compacted = self.pair_summaries.get((from_account_number, to_account_number))
+            if compacted is not None:
+                summary.add(compacted.count, compacted.total, compacted.first_seen, compacted.last_seen)
+            for edge in self.out_edges.get(from_account_number, ()):
+                if edge.target == to_account_number and not edge.compacted:
+                    timestamp = edge.transaction.timestamp
+                    summary.add(1, edge.transaction.amount_minor, timestamp, timestamp)
+            return summary.snapshot()
+
+    def _aggregates_for(self, account_number):
+        """Return (creating if needed) the window aggregates of an account"""
+        aggregates = self.window_aggregates.get(account_number)
+        if aggregates is None:
+            aggregates = {window: SlidingWindowAggregate(window) for window in self.windows}
+            self.window_aggregates[account_number] = aggregates
+        return aggregates
+
+    def get_window_stats(self, account_number, window_seconds=24 * 3600):
+        """Get count, sum_in, sum_out and max transfer amount (in minor units) for a configured window"""
+        if window_seconds not in self.windows:
+            raise ValueError(f"Window of {window_seconds}s is not tracked; configured windows: {self.windows}")
+        with self.lock:
+            aggregates = self.window_aggregates.get(account_number)
+            if aggregates is None:
+                return {'count': 0, 'sum_in': 0, 'sum_out': 0, 'max': 0}
+            aggregate = aggregates[window_seconds]
+            aggregate.expire(time.time())
+            return aggregate.snapshot()
+
+    def window_stats_many(self, account_numbers, window_seconds=24 * 3600):
+        """get_window_stats for many accounts under a single lock acquisition, in order"""
+        if window_seconds not in self.windows:
+            raise ValueError(f"Window of {window_seconds}s is not tracked; configured windows: {self.windows}")
+        empty = {'count': 0, 'sum_in': 0, 'sum_out': 0, 'max': 0}
+        current_time = time.time()
+        stats = []
+        with self.lock:
+            for account_number in account_numbers:
+                aggregates = self.window_aggregates.get(account_number)
+                if aggregates is None:
+                    stats.append(empty)
+                    continue
+                aggregate = aggregates[window_seconds]
+                aggregate.expire(current_time)
+                stats.append(aggregate.snapshot())
+        return stats
+
+    @staticmethod
+    def transfer_legs(from_account, to_account, amount, description=None):
+        """Build the (withdrawal, deposit) transaction pair of a transfer"""
+        if from_account.currency != to_account.currency:
+            raise ValueError(f"Cannot transfer between {from_account.currency} and {to_account.currency} accounts")
+        suffix = f": {description}" if description else ""  # Optional user-supplied description
+        # Create a withdrawal transaction for the sender
+        withdraw_transaction = Transaction(
+            type=TransactionType.WITHDRAW,
+            amount=amount,
+            description=f"Transfer to {to_account.account_number}{suffix}",
+            account=from_account,
+            account_type=from_account.account_type,
+            currency=from_account.currency
+        )
+        # Create a deposit transaction for the receiver
+        deposit_transaction = Transaction(
+            type=TransactionType.DEPOSIT,
+            amount=amount,
+            description=f"Transfer from {from_account.account_number}{suffix}",
+            account=to_account,
+            account_type=to_account.account_type,
+            currency=to_account.currency
+        )
+        return withdraw_transaction, deposit_transaction
+
+    def transfer_between_accounts(self, from_account, to_account, amount, transaction_processor, description=None):
+        """Handle transfer between two accounts. Both legs and the graph edge are applied
+        atomically (a one-transfer batch), so concurrent transfers can never overdraw the
+        sender or credit a receiver whose withdrawal was rejected."""
+        try:
+            return self.transfer_batch([(from_account, to_account, amount)], transaction_processor, description)
+        except Exception:
             # Handle any errors during the transfer
-            print(f"Error during transfer: {str(e)}")
+            logger.exception("Error during transfer from %s to %s", from_account.account_number,
+                             to_account.account_number)
+            return False
+
+    def transfer_batch(self, transfers, transaction_processor, description=None):
+        """Apply many (from_account, to_account, amount) transfers all-or-nothing.
+        Funds for every leg are reserved up front; the legs, their log records and
+        their graph edges are then applied in one pass under a single acquisition
+        of each lock. Returns False, applying nothing, if any leg would overdraw."""
+        legs = [
+            self.transfer_legs(from_account, to_account, amount, description)
+            for from_account, to_account, amount in transfers
+        ]
+        if not legs:
+            return True
+        if not transaction_processor.apply_transfers(legs, self):
+            TRANSFERS_REJECTED.inc()
             return False
+        return True
 
     def get_account_connections(self, account_number):
-        """Get all connections for an account"""
-        # Retrieve all connected accounts and transaction details for the given account
-        return self.adjacency_list.get(account_number, [])
-
-    def detect_circular_transactions(self, account_number, threshold_hours=24):
-        """Detect if there are circular transactions within the last 24 hours"""
-        visited = set()  # Set to track visited accounts
-        path = []  # Track the current DFS path
-        
-        def dfs(current_account, start_time):
-            # Mark the current account as visited
-            visited.add(current_account)
-            path.append(current_account)
-            
-            # Explore all connected accounts
-            for connected_account, transaction in self.adjacency_list.get(current_account, []):
-                # Check if the transaction is within the time threshold
-                if (datetime.now() - transaction['timestamp']).total_seconds() / 3600 <= threshold_hours:
-                    if connected_account in path:
-                        # Found a cycle: extract and return the cycle
-                        cycle_start = path.index(connected_account)
-                        return path[cycle_start:]
-                    if connected_account not in visited:
-                        # Recursive DFS call for unvisited accounts
-                        result = dfs(connected_account, start_time)
-                        if result:
-                            return result
-            
-            # Backtrack: remove the account from the current path
-            path.pop()
-            return None
-
-        # Start DFS from the given account
-        return dfs(account_number, datetime.now())
+        """Get all live connections for an account as (connected_account, transaction) pairs in time order"""
+        with self.lock:
+            outgoing = [(edge.target, edge.transaction) for edge in self.out_edges.get(account_number, ())
+                        if not edge.compacted]
+            incoming = [(edge.source, edge.transaction) for edge in self.in_edges.get(account_number, ())
+                        if not edge.compacted]
+        return list(merge(outgoing, incoming, key=lambda connection: connection[1].timestamp))
+
+    def _recent_successors(self, account_number, cutoff):
+        """Yield accounts that received a transfer from this account at or after cutoff"""
+        # Out-edges are appended in time order, so walk newest-first and stop at the first old edge
+        for edge in reversed(self.out_edges.get(account_number, ())):
+            if edge.transaction.timestamp < cutoff:
+                break
+            if not edge.compacted:
+                yield edge.target
+
+    def _find_path(self, source, target, cutoff, max_edges, deadline):
+        """Breadth-first search for a directed path source -> ... -> target of at most max_edges edges.
+        Returns the path as a list of accounts, or None if there is none or the deadline passes."""
+        parents = {source: None}
+        frontier = [source]
+        for _ in range(max_edges):
+            next_frontier = []
+            for node in frontier:
+                for connected_account in self._recent_successors(node, cutoff):
+                    if connected_account == target:
+                        # Rebuild the path by walking the parent links back to the source
+                        path = [target]
+                        while node is not None:
+                            path.append(node)
+                            node = parents[node]
+                        return path[::-1]
+                    if connected_account not in parents:
+                        parents[connected_account] = node
+                        next_frontier.append(connected_account)
+                if time.perf_counter() > deadline:
+                    return None  # Time budget exhausted
+            if not next_frontier:
+                return None
+            frontier = next_frontier
+        return None
+
+    def detect_circular_transactions(self, account_number, threshold_hours=24, max_length=6, time_budget=0.05):
+        """Detect a directed cycle of transfers through an account within the last 24 hours.
+        Returns the accounts on the cycle (starting with account_number) or None. The search
+        is limited to cycles of at most max_length transfers and time_budget seconds."""
+        cutoff = time.time() - threshold_hours * 3600
+        start = time.perf_counter()
+        with self.lock:
+            path = self._find_path(account_number, account_number, cutoff, max_length, start + time_budget)
+        self._record_cycle_search('account', start, path)
+        return path[:-1] if path else None
+
+    def detect_cycle_for_edge(self, from_account_number, to_account_number, threshold_hours=24,
+                              max_length=6, time_budget=0.05):
+        """Check incrementally whether a new transfer from -> to closes a directed cycle.
+        Only paths leading from the receiver back to the sender are searched."""
+        if from_account_number == to_account_number:
+            return [from_account_number]
+        cutoff = time.time() - threshold_hours * 3600
+        start = time.perf_counter()
+        with self.lock:
+            path = self._find_path(to_account_number, from_account_number, cutoff, max_length - 1,
+                                   start + time_budget)
+        self._record_cycle_search('edge', start, path)
+        # path runs receiver -> ... -> sender; the new edge closes it
+        return [from_account_number] + path[:-1] if path else None
+
+    def find_cycle_components(self, threshold_hours=None):
+        """Batch AML sweep: return every group of accounts connected by circular transfers.
+        Uses an iterative Tarjan strongly-connected-components pass over the directed graph
+        (optionally restricted to transfers in the last threshold_hours)."""
+        cutoff = float('-inf') if threshold_hours is None else time.time() - threshold_hours * 3600
+        start = time.perf_counter()
+        # Snapshot the successor sets under the lock, then run the sweep without holding it
+        with self.lock:
+            successors = {
+                account: list(dict.fromkeys(self._recent_successors(account, cutoff)))
+                for account in self.out_edges
+            }
+
+        index = {}  # Discovery order of each account
+        lowlink = {}
+        stack = []  # Accounts of the components still being built
+        on_stack = set()
+        components = []
+        for root in successors:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors.get(root, ())))]
+            while work:
+                node, neighbours = work[-1]
+                descended = False
+                for neighbour in neighbours:
+                    if neighbour not in index:
+                        index[neighbour] = lowlink[neighbour] = len(index)
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append((neighbour, iter(successors.get(neighbour, ()))))
+                        descended = True
+                        break
+                    if neighbour in on_stack:
+                        lowlink[node] = min(lowlink[node], index[neighbour])
+                if descended:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    # node is the root of a strongly connected component
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in successors.get(node, ()):
+                        components.append(component[::-1])
+        if METRICS.enabled:
+            CYCLE_SECONDS['components'].observe(time.perf_counter() - start)
+            CYCLES_FOUND.inc(len(components))
+        return components
+
+    def to_csr(self, start=None, end=None):
+        """Freeze the live transfer edges (optionally only those with start <= timestamp < end)
+        into a CSRGraph for batch analytics. Requires NumPy; compacted pair summaries
+        are not included."""
+        # Copy the edge lists under the lock, then build the arrays without holding it
+        with self.lock:
+            rows = [(account, [edge for edge in edges if not edge.compacted])
+                    for account, edges in self.out_edges.items()]
+        return CSRGraph.from_rows(rows, start, end)
+
+    @staticmethod
+    def _record_cycle_search(method, start, path):
+        if METRICS.enabled:
+            CYCLE_SECONDS[method].observe(now() - start)
+            if path:
+                CYCLES_FOUND.inc()
 
     def get_transaction_volume(self, account_number, hours=24):
-        """Get total transaction volume for an account in the last 24 hours"""
+        """Get total transaction volume for an account in the last 24 hours, in major units of its currency"""
+        return from_minor(self.get_transaction_volume_minor(account_number, hours),
+                          self.currencies.get(account_number, DEFAULT_CURRENCY))
+
+    def get_transaction_volume_minor(self, account_number, hours=24):
+        """Exact total transaction volume in minor units for an account in the last hours"""
+        if hours * 3600 in self.windows:
+            # Served in amortized O(1) from the incremental aggregates
+            stats = self.get_window_stats(account_number, hours * 3600)
+            return stats['sum_in'] + stats['sum_out']
+
         total_volume = 0  # Initialize the total transaction volume
-        if account_number in self.adjacency_list:
-            current_time = datetime.now()  # Record the current time
-            # Iterate over all transactions for the account
-            for _, transaction in self.adjacency_list[account_number]:
-                # Check if the transaction is within the time threshold
-                if (current_time - transaction['timestamp']).total_seconds() / 3600 <= hours:
-                    total_volume += transaction['amount']  # Add the transaction amount
+        cutoff = time.time() - hours * 3600  # Oldest timestamp inside the window
+        with self.lock:
+            for edges in (self.out_edges.get(account_number, ()), self.in_edges.get(account_number, ())):
+                # Lists are in time order, so walk newest-first and stop at the first old edge
+                for edge in reversed(edges):
+                    if edge.transaction.timestamp < cutoff:
+                        break
+                    if not edge.compacted:
+                        total_volume += edge.transaction.amount_minor  # Add the transaction amount
         return total_volume  # Return the total volume
@@ -0,0 +1,236 @@
+# Import necessary modules
+from data_structures.transaction import epoch_seconds
+
+try:  # NumPy is required for CSR snapshots (the rest of the package works without it)
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_LOW_BITS = (1 << 32) - 1  # Low half of a packed (high << 32 | low) int64 key
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("NumPy is required for CSR graph snapshots")
+
+
+def _gather_ranges(starts, lengths):
+    """Positions covered by the ranges [start, start + length), concatenated"""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - ends + lengths, lengths) + np.arange(total, dtype=np.int64)
+
+
+def _segment_sums(values, indptr):
+    """Exact per-row sums of an int64 edge column"""
+    sums = np.zeros(len(indptr) - 1, dtype=np.int64)
+    nonempty = np.flatnonzero(np.diff(indptr))
+    if len(nonempty):
+        sums[nonempty] = np.add.reduceat(values, indptr[nonempty])
+    return sums
+
+
+# Frozen compressed-sparse-row snapshot of the transfer graph for batch analytics.
+# Accounts are numbered 0..n-1 (int32 node ids, in account-number order). The
+# edges leaving node i are positions indptr[i]:indptr[i + 1] of the edge columns:
+# indices (receiving node id), amounts (minor units) and timestamps (epoch
+# seconds). The transposed (incoming) layout is built on first use. Every
+# analytic below is a handful of whole-array NumPy operations, so full scans
+# run at memory speed instead of walking Python lists.
+class CSRGraph:
+    def __init__(self, accounts, indptr, indices, amounts, timestamps):
+        _require_numpy()
+        self.accounts = list(accounts)  # node id -> account number
+        self.node_ids = {account: node for node, account in enumerate(self.accounts)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.amounts = np.asarray(amounts, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self._transpose = None
+
+    @classmethod
+    def from_rows(cls, rows, start=None, end=None):
+        """Build from (account_number, [Edge]) rows of outgoing edges, keeping edges with
+        start <= timestamp < end. Accounts that only receive transfers may appear with
+        empty rows."""
+        _require_numpy()
+        rows = sorted(rows, key=lambda row: row[0])
+        accounts = sorted({account for account, _ in rows} | {edge.target for _, edges in rows for edge in edges})
+        node_ids = {account: node for node, account in enumerate(accounts)}
+        counts = np.fromiter((len(edges) for _, edges in rows), np.int64, len(rows))
+        sources = np.repeat(np.fromiter((node_ids[account] for account, _ in rows), np.int32, len(rows)), counts)
+        edge_count = int(counts.sum())
+        indices = np.fromiter((node_ids[edge.target] for _, edges in rows for edge in edges), np.int32, edge_count)
+        amounts = np.fromiter((edge.transaction.amount_minor for _, edges in rows for edge in edges),
+                              np.int64, edge_count)
+        timestamps = np.fromiter((edge.transaction.timestamp for _, edges in rows for edge in edges),
+                                 np.int64, edge_count)
+        if start is not None or end is not None:
+            keep = np.ones(edge_count, dtype=bool)
+            if start is not None:
+                keep &= timestamps >= epoch_seconds(start)
+            if end is not None:
+                keep &= timestamps < epoch_seconds(end)
+            sources, indices, amounts, timestamps = sources[keep], indices[keep], amounts[keep], timestamps[keep]
+        indptr = np.zeros(len(accounts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(accounts)), out=indptr[1:])
+        return cls(accounts, indptr, indices, amounts, timestamps)
+
+    def __len__(self):
+        return len(self.accounts)
+
+    @property
+    def edge_count(self):
+        return len(self.indices)
+
+    def node(self, account_number):
+        """Node id of an account (KeyError if it has no edges in the snapshot)"""
+        return self.node_ids[account_number]
+
+    def sources(self):
+        """Sending node id of every edge (the COO row column)"""
+        return np.repeat(np.arange(len(self.accounts), dtype=np.int32), np.diff(self.indptr))
+
+    def transpose(self):
+        """(indptr, sources, edge positions) of the incoming layout: the edges received
+        by node i are edge positions order[indptr[i]:indptr[i + 1]]"""
+        if self._transpose is None:
+            # Sorting (receiver, position) packed into one int64 is a stable sort by receiver
+            # and much faster than a stable argsort
+            keys = np.sort(self.indices.astype(np.int64) << 32 | np.arange(self.edge_count, dtype=np.int64))
+            order = keys & _LOW_BITS
+            indptr = np.zeros(len(self.accounts) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=len(self.accounts)), out=indptr[1:])
+            self._transpose = (indptr, self.sources()[order], order)
+        return self._transpose
+
+    # Degree and flow
+    def out_degree(self):
+        """Transfers sent per node"""
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        """Transfers received per node"""
+        return np.bincount(self.indices, minlength=len(self.accounts))
+
+    def distinct_pairs(self):
+        """Sorted (sender << 32 | receiver) keys of every account pair with at least one transfer"""
+        keys = np.sort(self.sources().astype(np.int64) << 32 | self.indices)
+        first = np.ones(len(keys), dtype=bool)
+        np.not_equal(keys[1:], keys[:-1], out=first[1:])
+        return keys[first]
+
+    def fan_out(self):
+        """Distinct receiving counterparties per node"""
+        return np.bincount(self.distinct_pairs() >> 32, minlength=len(self.accounts))
+
+    def fan_in(self):
+        """Distinct sending counterparties per node"""
+        return np.bincount(self.distinct_pairs() & _LOW_BITS, minlength=len(self.accounts))
+
+    def out_flow(self):
+        """Exact total sent per node, in minor units"""
+        return _segment_sums(self.amounts, self.indptr)
+
+    def in_flow(self):
+        """Exact total received per node, in minor units"""
+        indptr, _, order = self.transpose()
+        return _segment_sums(self.amounts[order], indptr)
+
+    def net_flow(self):
+        """Received minus sent per node, in minor units"""
+        return self.in_flow() - self.out_flow()
+
+    # Traversal
+    def k_hop_reachable(self, account_numbers, k=2, direction='out'):
+        """{account_number: hops} of every account within k transfers of the given accounts
+        (following transfers forwards with direction='out', backwards with 'in')"""
+        if direction == 'out':
+            indptr, neighbours = self.indptr, self.indices
+        elif direction == 'in':
+            indptr, neighbours, _ = self.transpose()
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+        distance = np.full(len(self.accounts), -1, dtype=np.int32)
+        distance[[self.node_ids[account] for account in account_numbers if account in self.node_ids]] = 0
+        frontier = np.flatnonzero(distance == 0)
+        for hop in range(1, k + 1):
+            if not len(frontier):
+                break
+            reached = neighbours[_gather_ranges(indptr[frontier], indptr[frontier + 1] - indptr[frontier])]
+            distance[reached[distance[reached] < 0]] = hop
+            frontier = np.flatnonzero(distance == hop)
+        nodes = np.flatnonzero(distance >= 0)
+        return {self.accounts[node]: int(distance[node]) for node in nodes}
+
+    def pagerank(self, damping=0.85, iterations=50, tolerance=1e-10, weighted=True):
+        """PageRank over transfers (weighted by amount by default); returns a float array by node id"""
+        count = len(self.accounts)
+        if count == 0:
+            return np.empty(0)
+        sources = self.sources()
+        weights = self.amounts.astype(np.float64) if weighted else np.ones(self.edge_count)
+        out_weight = np.bincount(sources, weights=weights, minlength=count)
+        # Nodes whose transfers total zero (e.g. only 0.00 transfers) are treated as dangling
+        edge_weight = out_weight[sources]
+        edge_share = np.divide(weights, edge_weight, out=np.zeros_like(weights), where=edge_weight > 0)
+        dangling = out_weight == 0
+        rank = np.full(count, 1.0 / count)
+        for _ in range(iterations):
+            incoming = np.bincount(self.indices, weights=rank[sources] * edge_share, minlength=count)
+            updated = (1 - damping) / count + damping * (incoming + rank[dangling].sum() / count)
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        return rank
+
+    # Ranking
+    def top(self, values, n=10):
+        """[(account_number, value)] of the n largest values of a per-node array"""
+        n = min(n, len(values))
+        if n == 0:
+            return []
+        candidates = np.argpartition(values, len(values) - n)[len(values) - n:]
+        ranked = candidates[np.argsort(values[candidates], kind='stable')[::-1]]
+        return [(self.accounts[node], values[node].item()) for node in ranked]
+
+    def top_counterparties(self, account_number, n=10, direction='out'):
+        """[(counterparty, total minor units, transfer count)] of the n counterparties an
+        account sent the most to (direction='out') or received the most from ('in')"""
+        node = self.node_ids.get(account_number)
+        if node is None:
+            return []
+        if direction == 'out':
+            positions = np.arange(self.indptr[node], self.indptr[node + 1])
+            counterparties = self.indices[positions]
+        elif direction == 'in':
+            indptr, sources, order = self.transpose()
+            positions = order[indptr[node]:indptr[node + 1]]
+            counterparties = sources[indptr[node]:indptr[node + 1]]
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+        # Group the account's transfers by counterparty, then sum each group exactly
+        grouping = np.argsort(counterparties, kind='stable')
+        counterparties = counterparties[grouping]
+        starts = np.flatnonzero(np.r_[True, counterparties[1:] != counterparties[:-1]]) if len(grouping) else grouping
+        totals = np.add.reduceat(self.amounts[positions][grouping], starts) if len(starts) else starts
+        counts = np.diff(np.r_[starts, len(grouping)])
+        ranked = np.lexsort((-counts, -totals))[:n]
+        return [(self.accounts[counterparties[starts[i]]], int(totals[i]), int(counts[i])) for i in ranked]
+
+    # Persistence
+    def save(self, path):
+        """Write the snapshot to a .npz file"""
+        np.savez(path, accounts=np.array(self.accounts, dtype=str), indptr=self.indptr, indices=self.indices,
+                 amounts=self.amounts, timestamps=self.timestamps)
+
+    @classmethod
+    def load(cls, path):
+        _require_numpy()
+        with np.load(path) as data:
+            return cls(data['accounts'].tolist(), data['indptr'], data['indices'], data['amounts'],
+                       data['timestamps'])
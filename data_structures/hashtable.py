@@ -1,16 +1,41 @@
+from array import array  # Compact typed arrays for the open-addressing layout
+
 # Define a HashTable class for user authentication
 class HashTable:
     # Constructor to initialize the hash table with a given size (default is 100)
-    def __init__(self, size=100):
+    # The table doubles in size whenever entries / buckets exceeds load_factor
+    def __init__(self, size=100, load_factor=0.75):
+        if load_factor <= 0:
+            raise ValueError("load_factor must be positive")
         self.size = size  # Set the size of the hash table
+        self.load_factor = load_factor  # Maximum average chain length before resizing
+        self.count = 0  # Number of key-value pairs stored
         # Create a list of empty lists to serve as buckets for storing key-value pairs
         self.table = [[] for _ in range(size)]
-    
+
     # Private method to compute the hash value of a given key
     def _hash(self, key):
         # Use Python's built-in hash function and take modulo to fit within table size
         return hash(key) % self.size
-    
+
+    # Private method to rebuild the table with a new number of buckets
+    def _resize(self, new_size):
+        old_table = self.table
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+        # Re-bucket every existing pair under the new modulus
+        for bucket in old_table:
+            for key, value in bucket:
+                self.table[self._hash(key)].append((key, value))
+
+    # Private method to grow the table until it can hold the given number of entries
+    def _ensure_capacity(self, count):
+        new_size = self.size
+        while count > new_size * self.load_factor:
+            new_size *= 2
+        if new_size != self.size:
+            self._resize(new_size)
+
     # Method to insert or update a key-value pair in the hash table
     def insert(self, key, value):
         # Calculate the hash key (index) for the given key
@@ -23,7 +48,17 @@ class HashTable:
                 return
         # If the key does not exist, append the new key-value pair to the bucket
         self.table[hash_key].append((key, value))
-    
+        self.count += 1
+        # Grow the table once the load factor is exceeded
+        self._ensure_capacity(self.count)
+
+    # Method to insert many key-value pairs, resizing at most once up front
+    def insert_many(self, pairs):
+        pairs = list(pairs)
+        self._ensure_capacity(self.count + len(pairs))
+        for key, value in pairs:
+            self.insert(key, value)
+
     # Method to retrieve the value associated with a given key
     def get(self, key):
         # Calculate the hash key (index) for the given key
@@ -35,8 +70,174 @@ class HashTable:
                 return v
         # Return None if the key is not found
         return None
-    
+
+    # Method to remove a key and return its value (None if the key is not found)
+    def delete(self, key):
+        bucket = self.table[self._hash(key)]
+        for i, (k, v) in enumerate(bucket):
+            if k == key:
+                del bucket[i]
+                self.count -= 1
+                return v
+        return None
+
     # Method to check if a key exists in the hash table
     def exists(self, key):
         # Check if the value retrieved for the key is not None
         return self.get(key) is not None
+
+    # Number of key-value pairs stored
+    def __len__(self):
+        return self.count
+
+    # Iterate over all keys
+    def __iter__(self):
+        for bucket in self.table:
+            for key, _ in bucket:
+                yield key
+
+    # Iterate over all key-value pairs
+    def items(self):
+        for bucket in self.table:
+            yield from bucket
+
+
+# Marker values stored in the index array of OpenAddressingHashTable
+_EMPTY = -1  # Slot has never been used
+_DUMMY = -2  # Slot held an entry that was deleted (tombstone)
+# Placeholder stored in the key list for deleted entries
+_DELETED = object()
+
+# Open-addressing hash table with the same interface as HashTable.
+# Like CPython's compact dict it keeps a sparse array('q') of slot -> entry
+# indices plus dense, insertion-ordered entry columns (hashes in an array('q'),
+# keys and values in plain lists), avoiding a list and a tuple per entry.
+class OpenAddressingHashTable:
+    def __init__(self, size=8, load_factor=0.66):
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1")
+        self.load_factor = load_factor  # Maximum fraction of occupied slots (including tombstones)
+        self.count = 0  # Number of live key-value pairs
+        self._allocate(self._capacity_for(size))
+        self._hashes = array('q')  # Hash of each entry
+        self._keys = []  # Key of each entry (_DELETED once removed)
+        self._values = []  # Value of each entry
+
+    # Smallest power-of-two slot count that can hold the given number of entries
+    def _capacity_for(self, count):
+        capacity = 8
+        while count >= capacity * self.load_factor:
+            capacity *= 2
+        return capacity
+
+    # Create an empty index array with the given number of slots
+    def _allocate(self, capacity):
+        self.size = capacity
+        self._mask = capacity - 1
+        self._indices = array('q', [_EMPTY]) * capacity
+        self._filled = 0  # Slots that are live or tombstones
+
+    # Probe for a key; returns (slot, entry_index) where entry_index is -1 if absent
+    # and slot is the first reusable slot on the probe sequence
+    def _lookup(self, key, key_hash):
+        indices = self._indices
+        mask = self._mask
+        slot = key_hash & mask
+        free_slot = -1
+        while True:
+            index = indices[slot]
+            if index == _EMPTY:
+                return (slot if free_slot < 0 else free_slot), -1
+            if index == _DUMMY:
+                if free_slot < 0:
+                    free_slot = slot
+            elif self._hashes[index] == key_hash:
+                stored_key = self._keys[index]
+                if stored_key is key or stored_key == key:
+                    return slot, index
+            slot = (slot + 1) & mask  # Linear probing
+
+    # Rebuild the index for the given number of slots, compacting deleted entries
+    def _resize(self, capacity):
+        hashes, keys, values = self._hashes, self._keys, self._values
+        self._hashes, self._keys, self._values = array('q'), [], []
+        self._allocate(capacity)
+        indices = self._indices
+        mask = self._mask
+        for key_hash, key, value in zip(hashes, keys, values):
+            if key is _DELETED:
+                continue
+            slot = key_hash & mask
+            while indices[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            indices[slot] = len(self._keys)
+            self._hashes.append(key_hash)
+            self._keys.append(key)
+            self._values.append(value)
+            self._filled += 1
+
+    # Method to insert or update a key-value pair in the hash table
+    def insert(self, key, value):
+        key_hash = hash(key)
+        slot, index = self._lookup(key, key_hash)
+        if index >= 0:
+            self._values[index] = value  # Key already present: update in place
+            return
+        if self._indices[slot] == _EMPTY:
+            self._filled += 1  # Reusing a tombstone does not consume a new slot
+        self._indices[slot] = len(self._keys)
+        self._hashes.append(key_hash)
+        self._keys.append(key)
+        self._values.append(value)
+        self.count += 1
+        if self._filled >= self.size * self.load_factor:
+            self._resize(self._capacity_for(self.count))
+
+    # Method to insert many key-value pairs, resizing at most once up front
+    def insert_many(self, pairs):
+        pairs = list(pairs)
+        capacity = self._capacity_for(self.count + len(pairs))
+        if capacity > self.size:
+            self._resize(capacity)
+        for key, value in pairs:
+            self.insert(key, value)
+
+    # Method to retrieve the value associated with a given key
+    def get(self, key):
+        _, index = self._lookup(key, hash(key))
+        return self._values[index] if index >= 0 else None
+
+    # Method to remove a key and return its value (None if the key is not found)
+    def delete(self, key):
+        slot, index = self._lookup(key, hash(key))
+        if index < 0:
+            return None
+        value = self._values[index]
+        self._indices[slot] = _DUMMY
+        self._keys[index] = _DELETED
+        self._values[index] = None
+        self.count -= 1
+        # Compact once deleted entries make up most of the entry columns
+        if len(self._keys) > 8 and self.count * 2 < len(self._keys):
+            self._resize(self._capacity_for(self.count))
+        return value
+
+    # Method to check if a key exists in the hash table
+    def exists(self, key):
+        return self.get(key) is not None
+
+    # Number of key-value pairs stored
+    def __len__(self):
+        return self.count
+
+    # Iterate over all keys in insertion order
+    def __iter__(self):
+        for key in self._keys:
+            if key is not _DELETED:
+                yield key
+
+    # Iterate over all key-value pairs in insertion order
+    def items(self):
+        for key, value in zip(self._keys, self._values):
+            if key is not _DELETED:
+                yield key, value
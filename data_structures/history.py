@@ -0,0 +1,188 @@
+# Import necessary modules
+from array import array  # Typed, contiguous column storage
+from bisect import bisect_left, bisect_right  # Binary search over the timestamp column
+import threading  # Protects the shared description pool
+
+from data_structures.money import DEFAULT_CURRENCY
+from data_structures.transaction import Transaction, TransactionType, TransactionStatus, epoch_seconds
+
+try:  # NumPy is optional; it only speeds up the range queries and aggregates
+    import numpy as np
+except ImportError:
+    np = None
+
+# Interned description strings shared by every history: {description: id} plus the reverse list
+class StringPool:
+    def __init__(self):
+        self.ids = {}  # {string: id}
+        self.strings = []  # id -> string
+        self.lock = threading.Lock()
+
+    def intern(self, value):
+        """Return the id of a string, adding it to the pool if needed"""
+        string_id = self.ids.get(value)
+        if string_id is None:
+            with self.lock:
+                string_id = self.ids.get(value)
+                if string_id is None:
+                    string_id = len(self.strings)
+                    self.strings.append(value)
+                    self.ids[value] = string_id
+        return string_id
+
+    def lookup(self, string_id):
+        return self.strings[string_id]
+
+
+DESCRIPTIONS = StringPool()  # Default pool shared by all account histories
+
+# Columnar transaction history for one account.
+# Each field lives in its own typed array (amounts as int64 minor units of the
+# history's currency, timestamps as int64 epoch seconds, type/status/priority as int8 codes and descriptions as
+# ids into a shared StringPool), so an entry costs a few dozen bytes instead
+# of a Python object. Records are rebuilt as Transaction objects only when read.
+class TransactionHistory:
+    def __init__(self, pool=DESCRIPTIONS, currency=DEFAULT_CURRENCY):
+        self.pool = pool
+        self.currency = currency
+        self.amounts = array('q')
+        self.timestamps = array('q')
+        self.types = array('b')
+        self.statuses = array('b')
+        self.priorities = array('b')
+        self.description_ids = array('i')
+        self.time_ordered = True  # False once an entry is appended out of timestamp order
+
+    def __len__(self):
+        return len(self.description_ids)  # Written last, so an entry being appended is not counted yet
+
+    def append(self, transaction):
+        """Append a Transaction record (O(1) amortized)"""
+        self.append_record(
+            transaction.type, transaction.amount_minor, transaction.description,
+            transaction.timestamp, transaction.status, transaction.priority
+        )
+
+    def append_record(self, transaction_type, amount_minor, description, timestamp=None,
+                      status=TransactionStatus.COMPLETED, priority=3):
+        """Append one entry from its individual fields (amount in minor units)"""
+        timestamp = epoch_seconds(timestamp)
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self.time_ordered = False  # Range queries fall back to a linear scan
+        self.amounts.append(amount_minor)
+        self.timestamps.append(timestamp)
+        self.types.append(TransactionType.parse(transaction_type))
+        self.statuses.append(TransactionStatus.parse(status))
+        self.priorities.append(priority)
+        self.description_ids.append(self.pool.intern(description or ''))
+
+    def record(self, index):
+        """Rebuild the Transaction at a position"""
+        return Transaction(
+            type=TransactionType(self.types[index]),
+            amount_minor=self.amounts[index],
+            currency=self.currency,
+            description=self.pool.lookup(self.description_ids[index]),
+            timestamp=self.timestamps[index],
+            status=TransactionStatus(self.statuses[index]),
+            priority=self.priorities[index]
+        )
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self.record(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self.record(index)
+
+    def page(self, page_number, page_size=20, newest_first=True):
+        """Return one page of records; cost depends only on page_size"""
+        total = len(self)
+        start = page_number * page_size
+        if newest_first:
+            # Page 0 holds the newest entries
+            indices = range(total - 1 - start, max(total - start - page_size, 0) - 1, -1)
+        else:
+            indices = range(start, min(start + page_size, total))
+        return [self.record(index) for index in indices]
+
+    def page_count(self, page_size=20):
+        return (len(self) + page_size - 1) // page_size
+
+    def latest_cursor(self):
+        """Cursor of the newest entry, for cursor_page(); entries are append-only, so a
+        (cursor, page_size) pair always identifies the same records"""
+        return len(self)
+
+    def cursor_page(self, cursor=None, page_size=20):
+        """Newest-first page of entries older than cursor (None = from the newest).
+        Returns (records, next_cursor); next_cursor is None after the oldest page."""
+        end = len(self) if cursor is None else min(cursor, len(self))
+        start = max(end - page_size, 0)
+        records = [self.record(index) for index in range(end - 1, start - 1, -1)]
+        return records, (start if start > 0 else None)
+
+    def _time_slice(self, start=None, end=None):
+        """Return the (low, high) positions covering start <= timestamp <= end"""
+        low = 0 if start is None else bisect_left(self.timestamps, epoch_seconds(start))
+        high = len(self) if end is None else min(bisect_right(self.timestamps, epoch_seconds(end)), len(self))
+        return min(low, high), high
+
+    def query(self, transaction_type=None, start=None, end=None):
+        """Return the positions of entries matching a type and time range"""
+        if self.time_ordered:
+            low, high = self._time_slice(start, end)
+        else:
+            low, high = 0, len(self)
+        start = None if start is None else epoch_seconds(start)
+        end = None if end is None else epoch_seconds(end)
+        code = None if transaction_type is None else TransactionType.parse(transaction_type)
+
+        if np is not None:
+            # Vectorized filter over copies of the column slices: a view of a live array
+            # would make a concurrent append fail with BufferError while it exists
+            timestamps = np.frombuffer(self.timestamps[low:high], dtype=np.int64)
+            mask = np.ones(len(timestamps), dtype=bool)
+            if code is not None:
+                mask &= np.frombuffer(self.types[low:high], dtype=np.int8) == code
+            if start is not None:
+                mask &= timestamps >= start
+            if end is not None:
+                mask &= timestamps <= end
+            return (np.flatnonzero(mask) + low).tolist()
+
+        return [
+            index for index in range(low, high)
+            if (code is None or self.types[index] == code)
+            and (start is None or self.timestamps[index] >= start)
+            and (end is None or self.timestamps[index] <= end)
+        ]
+
+    def records(self, transaction_type=None, start=None, end=None):
+        """Return the Transaction records matching a type and time range"""
+        return [self.record(index) for index in self.query(transaction_type, start, end)]
+
+    def sum_by_type(self, start=None, end=None):
+        """Return {TransactionType: exact total in minor units} over an optional time range"""
+        indices = self.query(start=start, end=end)
+        totals = {transaction_type: 0 for transaction_type in TransactionType}
+        if np is not None and indices:
+            # Copy the covered slice of each column (never view the live arrays)
+            low, high = indices[0], indices[-1] + 1
+            positions = np.array(indices) - low
+            amounts = np.frombuffer(self.amounts[low:high], dtype=np.int64)[positions]
+            types = np.frombuffer(self.types[low:high], dtype=np.int8)[positions]
+            for transaction_type in TransactionType:
+                totals[transaction_type] = int(amounts[types == transaction_type].sum())
+            return totals
+        for index in indices:
+            totals[TransactionType(self.types[index])] += self.amounts[index]
+        return totals
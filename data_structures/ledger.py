@@ -0,0 +1,457 @@
+# Import necessary modules
+from collections import OrderedDict  # LRU cache of materialized accounts
+from datetime import datetime  # Account creation dates
+import hashlib  # Stable 64-bit hashes for the on-disk index
+import mmap  # Memory-mapped record files
+import os  # File creation and resizing
+import struct  # Fixed-size record layouts
+import threading  # Serializes writers
+
+from data_structures.bst import BankAccount
+from data_structures.money import DEFAULT_CURRENCY
+from data_structures.transaction import Transaction, TransactionType, TransactionStatus, epoch_seconds
+
+_HEADER = struct.Struct('<8sQ')  # Magic, record count
+_HEADER_SIZE = 64  # Header area reserved at the start of every record file
+_NO_RECORD = -1  # Null pointer between records
+
+# Account record: number, owner, type code, currency code, balance (minor units),
+# creation time, newest transaction, transaction count, next account of the same owner
+ACCOUNT_RECORD = struct.Struct('<32s32sB3s4xqqqqq')
+# Transaction record: account slot, previous transaction of the same account,
+# amount (minor units), timestamp, type, status, priority, description (truncated to 40 bytes)
+TRANSACTION_RECORD = struct.Struct('<qqqqbbb5x40s')
+
+ACCOUNT_TYPES = ("Regular", "VIP")
+
+
+def _encode(value, size, field_name):
+    encoded = str(value).encode('utf-8')
+    if len(encoded) > size:
+        raise ValueError(f"{field_name} is longer than {size} bytes: {value!r}")
+    return encoded
+
+
+def _decode(raw):
+    return raw.rstrip(b'\0').decode('utf-8', errors='ignore')
+
+
+def _hash64(key):
+    return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+# File of fixed-size records accessed through mmap. Reads unpack straight from the
+# mapping without copying the file into Python objects; the file doubles in size
+# (and is re-mapped) when it fills up. Not thread-safe on its own: growing closes
+# the old mapping, so every read and write goes through the owner's lock.
+class RecordFile:
+    def __init__(self, path, record_struct, magic, initial_capacity=1024):
+        self.path = path
+        self.record = record_struct
+        self.magic = magic
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(_HEADER.pack(magic, 0).ljust(_HEADER_SIZE, b'\0'))
+                f.truncate(_HEADER_SIZE + initial_capacity * record_struct.size)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        stored_magic, self.count = _HEADER.unpack_from(self.map, 0)
+        if stored_magic != magic:
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, index):
+        return _HEADER_SIZE + index * self.record.size
+
+    def _grow(self):
+        new_size = _HEADER_SIZE + 2 * (len(self.map) - _HEADER_SIZE)
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(new_size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def read(self, index):
+        return self.record.unpack_from(self.map, self._offset(index))
+
+    def write(self, index, values):
+        self.record.pack_into(self.map, self._offset(index), *values)
+
+    def append(self, values, sync=False):
+        """Append a record; with sync it is on disk before the header count that covers it"""
+        if self._offset(self.count + 1) > len(self.map):
+            self._grow()
+        index = self.count
+        self.write(index, values)
+        if sync:
+            self.map.flush()
+        self.count += 1
+        _HEADER.pack_into(self.map, 0, self.magic, self.count)
+        if sync:
+            self.map.flush()
+        return index
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+# On-disk open-addressing hash index mapping string keys to record numbers.
+# Only (hash, record) pairs are stored; keys are verified by reading them back
+# from the record through key_of, so the index stays fixed-size per entry.
+class DiskHashIndex:
+    _ENTRY = struct.Struct('<Qq')  # Key hash, record number (_NO_RECORD when empty)
+    _META = struct.Struct('<8sQQ')  # Magic, capacity, count
+
+    def __init__(self, path, key_of, initial_capacity=1024, load_factor=0.5):
+        self.path = path
+        self.key_of = key_of
+        self.load_factor = load_factor
+        if not os.path.exists(path):
+            self._create(path, initial_capacity)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        _, self.capacity, self.count = self._META.unpack_from(self.map, 0)
+
+    def _create(self, path, capacity):
+        with open(path, 'wb') as f:
+            f.write(self._META.pack(b'BANKIDX1', capacity, 0).ljust(_HEADER_SIZE, b'\0'))
+            f.write(self._ENTRY.pack(0, _NO_RECORD) * capacity)
+
+    def _entry_offset(self, slot):
+        return _HEADER_SIZE + slot * self._ENTRY.size
+
+    def _probe(self, key, key_hash):
+        """Return (slot, record) for the key, or (first empty slot, None)"""
+        mask = self.capacity - 1
+        slot = key_hash & mask
+        while True:
+            stored_hash, record = self._ENTRY.unpack_from(self.map, self._entry_offset(slot))
+            if record == _NO_RECORD:
+                return slot, None
+            if stored_hash == key_hash and self.key_of(record) == key:
+                return slot, record
+            slot = (slot + 1) & mask
+
+    def get(self, key):
+        return self._probe(key, _hash64(key))[1]
+
+    def put(self, key, record):
+        key_hash = _hash64(key)
+        slot, existing = self._probe(key, key_hash)
+        self._ENTRY.pack_into(self.map, self._entry_offset(slot), key_hash, record)
+        if existing is None:
+            self.count += 1
+            self._META.pack_into(self.map, 0, b'BANKIDX1', self.capacity, self.count)
+            if self.count > self.capacity * self.load_factor:
+                self._rebuild(self.capacity * 2)
+
+    def _rebuild(self, capacity):
+        """Rehash every entry into a larger index file"""
+        entries = [
+            self._ENTRY.unpack_from(self.map, self._entry_offset(slot))
+            for slot in range(self.capacity)
+        ]
+        self.close()
+        temporary_path = self.path + '.tmp'
+        self._create(temporary_path, capacity)
+        with open(temporary_path, 'r+b') as f:
+            new_map = mmap.mmap(f.fileno(), 0)
+            mask = capacity - 1
+            for key_hash, record in entries:
+                if record == _NO_RECORD:
+                    continue
+                slot = key_hash & mask
+                while self._ENTRY.unpack_from(new_map, _HEADER_SIZE + slot * self._ENTRY.size)[1] != _NO_RECORD:
+                    slot = (slot + 1) & mask
+                self._ENTRY.pack_into(new_map, _HEADER_SIZE + slot * self._ENTRY.size, key_hash, record)
+            self._META.pack_into(new_map, 0, b'BANKIDX1', capacity, self.count)
+            new_map.flush()
+            new_map.close()
+        os.replace(temporary_path, self.path)
+        self.file = open(self.path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.capacity = capacity
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+# Ledger of fixed-size account and transaction records stored in a directory.
+# Each account's transactions form a newest-first chain through the
+# transaction file, and each owner's accounts form a chain through the
+# account file, so neither lookup needs in-memory structures. Every read and
+# write takes `lock`, since a growing file re-maps its memory.
+#
+# Durability: by default writes reach disk when the OS flushes the mappings or on
+# flush()/close(). With durable=True every write is msync'ed in dependency order
+# (a record before the header count, transaction or account record before the
+# account or index entry pointing at it), so a crash never leaves a pointer to a
+# torn record. A balance change and its history entry are still separate writes;
+# changes that must be atomic across records need the StorageEngine's WAL.
+class LedgerFile:
+    def __init__(self, directory, durable=False):
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.RLock()
+        self.durable = durable  # msync each write in dependency order
+        self.accounts = RecordFile(os.path.join(directory, 'accounts.dat'), ACCOUNT_RECORD, b'BANKACC2')
+        self.transactions = RecordFile(os.path.join(directory, 'transactions.dat'), TRANSACTION_RECORD, b'BANKTXN2')
+        self.account_index = DiskHashIndex(os.path.join(directory, 'accounts.idx'),
+                                           lambda slot: self.read_account(slot)[0])
+        self.owner_index = DiskHashIndex(os.path.join(directory, 'owners.idx'),
+                                         lambda slot: self.read_account(slot)[1])
+
+    def read_account(self, slot):
+        """Return (account_number, owner, account_type, balance_minor, created, last_tx, tx_count,
+        next_owner_slot, currency)"""
+        with self.lock:
+            number, owner, type_code, currency, balance, created, last_tx, tx_count, next_owner = \
+                self.accounts.read(slot)
+        return (_decode(number), _decode(owner), ACCOUNT_TYPES[type_code], balance, created, last_tx, tx_count,
+                next_owner, _decode(currency))
+
+    def _write_account(self, slot, **changes):
+        number, owner, type_code, currency, balance, created, last_tx, tx_count, next_owner = self.accounts.read(slot)
+        values = dict(number=number, owner=owner, type_code=type_code, currency=currency, balance=balance,
+                      created=created, last_tx=last_tx, tx_count=tx_count, next_owner=next_owner)
+        values.update(changes)
+        self.accounts.write(slot, values.values())
+        if self.durable:
+            self.accounts.flush()
+
+    def find_slot(self, account_number):
+        with self.lock:
+            return self.account_index.get(account_number)
+
+    def add_account(self, account_number, owner_username, account_type="Regular", balance_minor=0, created=None,
+                    currency=DEFAULT_CURRENCY):
+        """Append an account record and index it; returns its slot"""
+        number = _encode(account_number, 32, "account number")
+        owner = _encode(owner_username, 32, "owner username")
+        currency_code = _encode(currency, 3, "currency code")
+        with self.lock:
+            if self.account_index.get(account_number) is not None:
+                raise ValueError(f"Account {account_number} already exists")
+            next_owner = self.owner_index.get(owner_username)
+            slot = self.accounts.append((
+                number, owner, ACCOUNT_TYPES.index(account_type), currency_code, balance_minor, epoch_seconds(created),
+                _NO_RECORD, 0, _NO_RECORD if next_owner is None else next_owner
+            ), self.durable)
+            self.account_index.put(account_number, slot)
+            self.owner_index.put(owner_username, slot)  # New account becomes the head of the owner chain
+            if self.durable:
+                self.account_index.flush()
+                self.owner_index.flush()
+            return slot
+
+    def set_balance(self, slot, balance_minor):
+        with self.lock:
+            self._write_account(slot, balance=balance_minor)
+
+    def set_account_type(self, slot, account_type):
+        with self.lock:
+            self._write_account(slot, type_code=ACCOUNT_TYPES.index(account_type))
+
+    def owner_slots(self, owner_username):
+        """Yield the slots of every account owned by a user"""
+        with self.lock:
+            slot = self.owner_index.get(owner_username)
+        while slot is not None and slot != _NO_RECORD:
+            yield slot
+            slot = self.read_account(slot)[7]
+
+    def append_transaction(self, slot, transaction_type, amount_minor, description, timestamp=None,
+                           status=TransactionStatus.COMPLETED, priority=3):
+        description = (description or '').encode('utf-8')[:40]
+        with self.lock:
+            last_tx, tx_count = self.read_account(slot)[5:7]
+            index = self.transactions.append((
+                slot, last_tx, amount_minor, epoch_seconds(timestamp), TransactionType.parse(transaction_type),
+                TransactionStatus.parse(status), priority, description
+            ), self.durable)
+            self._write_account(slot, last_tx=index, tx_count=tx_count + 1)
+            return index
+
+    def read_transaction(self, index, currency=DEFAULT_CURRENCY):
+        """Return (Transaction, previous index of the same account)"""
+        with self.lock:
+            _, previous, amount, timestamp, type_code, status, priority, description = self.transactions.read(index)
+        transaction = Transaction(
+            type=TransactionType(type_code), amount_minor=amount, currency=currency, description=_decode(description),
+            timestamp=timestamp, status=TransactionStatus(status), priority=priority
+        )
+        return transaction, previous
+
+    def flush(self):
+        with self.lock:
+            for store in (self.accounts, self.transactions, self.account_index, self.owner_index):
+                store.flush()
+
+    def close(self):
+        with self.lock:
+            for store in (self.accounts, self.transactions, self.account_index, self.owner_index):
+                store.close()
+
+
+# Read-through view of one account's history in the ledger, newest entries first
+class LedgerHistory:
+    def __init__(self, ledger, slot):
+        self.ledger = ledger
+        self.slot = slot
+
+    def __len__(self):
+        return self.ledger.read_account(self.slot)[6]
+
+    def __reversed__(self):
+        record = self.ledger.read_account(self.slot)
+        index, currency = record[5], record[8]
+        while index != _NO_RECORD:
+            transaction, index = self.ledger.read_transaction(index, currency)
+            yield transaction
+
+    def __iter__(self):
+        return iter(list(reversed(self))[::-1])
+
+    def append_record(self, transaction_type, amount_minor, description, timestamp=None,
+                      status=TransactionStatus.COMPLETED, priority=3):
+        self.ledger.append_transaction(self.slot, transaction_type, amount_minor, description,
+                                       timestamp, status, priority)
+
+    def page(self, page_number, page_size=20, newest_first=True):
+        """Return one page of records (walks the chain up to the end of the page)"""
+        if not newest_first:
+            records = list(self)
+            return records[page_number * page_size:(page_number + 1) * page_size]
+        start = page_number * page_size
+        records = []
+        for position, transaction in enumerate(reversed(self)):
+            if position >= start + page_size:
+                break
+            if position >= start:
+                records.append(transaction)
+        return records
+
+    def page_count(self, page_size=20):
+        return (len(self) + page_size - 1) // page_size
+
+    def latest_cursor(self):
+        """Record index of the newest entry (the head of the chain)"""
+        return self.ledger.read_account(self.slot)[5]
+
+    def cursor_page(self, cursor=None, page_size=20):
+        """Newest-first page starting at a record index (None = the newest entry).
+        Returns (records, next_cursor); next_cursor is None after the oldest page."""
+        record = self.ledger.read_account(self.slot)
+        index = record[5] if cursor is None else cursor
+        records = []
+        while index != _NO_RECORD and len(records) < page_size:
+            transaction, index = self.ledger.read_transaction(index, record[8])
+            records.append(transaction)
+        return records, (index if index != _NO_RECORD else None)
+
+
+# BankAccount whose balance, type and history live in the ledger file.
+# Every change is written through, so evicting it from the cache loses nothing.
+class LedgerAccount(BankAccount):
+    def __init__(self, ledger, slot):
+        self.ledger = ledger
+        self.slot = slot
+        number, owner, _, _, created, _, _, _, currency = ledger.read_account(slot)
+        self.account_number = number
+        self.owner_username = owner
+        self.creation_date = datetime.fromtimestamp(created)
+        self.currency = currency  # Fixed at creation, so it is safe to keep on the object
+        self.transaction_history = LedgerHistory(ledger, slot)
+        self.pending_transactions = []
+
+    @property
+    def balance_minor(self):
+        return self.ledger.read_account(self.slot)[3]
+
+    @balance_minor.setter
+    def balance_minor(self, value):
+        self.ledger.set_balance(self.slot, value)
+
+    @property
+    def account_type(self):
+        return self.ledger.read_account(self.slot)[2]
+
+    @account_type.setter
+    def account_type(self, value):
+        self.ledger.set_account_type(self.slot, value)
+
+
+# Account index serving accounts from a LedgerFile, with the lookup interface of
+# BankAccountBST (insert, find_account, get_user_accounts, iteration). Only the
+# most recently used accounts are kept as Python objects, so resident memory is
+# bounded by cache_size no matter how large the ledger grows.
+# insert() stores a ledger-backed copy and returns it; callers must use the
+# returned object, since changes to the one passed in never reach the ledger.
+# Pass it as BankEngine(account_index=...) to run an engine on the ledger.
+# Not supported: bulk_load, remove, range and prefix scans, and use as the
+# index of a StorageEngine (its snapshots need the columnar history that
+# LedgerHistory does not provide), so a BankEngine with a data directory
+# cannot run on top of it.
+class LedgerAccountIndex:
+    def __init__(self, ledger, cache_size=10000):
+        self.ledger = ledger
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # {account_number: LedgerAccount} in least- to most-recently-used order
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ledger.accounts)
+
+    def __iter__(self):
+        """Iterate over all accounts in ledger order without filling the cache"""
+        for slot in range(len(self.ledger.accounts)):
+            yield LedgerAccount(self.ledger, slot)
+
+    def _materialize(self, account_number, slot):
+        with self.lock:
+            account = self.cache.get(account_number)
+            if account is None:
+                account = LedgerAccount(self.ledger, slot)
+                self.cache[account_number] = account
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)  # Evict the least recently used account
+            else:
+                self.cache.move_to_end(account_number)
+            return account
+
+    def insert(self, account):
+        """Write a new account to the ledger and return its ledger-backed object
+        (use the returned object: the one passed in is not tracked)"""
+        slot = self.ledger.add_account(account.account_number, account.owner_username,
+                                       account.account_type, account.balance_minor, account.creation_date,
+                                       account.currency)
+        return self._materialize(account.account_number, slot)
+
+    def find_account(self, account_number):
+        """Find and return an account by account number"""
+        with self.lock:
+            account = self.cache.get(account_number)
+            if account is not None:
+                self.cache.move_to_end(account_number)
+                return account
+        slot = self.ledger.find_slot(account_number)
+        return None if slot is None else self._materialize(account_number, slot)
+
+    def get_user_accounts(self, username):
+        """Get all accounts owned by a specific user, sorted by account number"""
+        accounts = [
+            self._materialize(self.ledger.read_account(slot)[0], slot)
+            for slot in self.ledger.owner_slots(username)
+        ]
+        accounts.sort(key=lambda account: account.account_number)
+        return accounts
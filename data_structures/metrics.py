@@ -0,0 +1,153 @@
+# Import necessary modules
+from bisect import bisect_left  # Histogram bucket lookup
+import threading  # Serializes metric updates across worker threads
+import time  # Timing helpers
+
+# Default latency buckets in seconds: 1µs to 10s, roughly 2.5x apart
+LATENCY_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Monotonically increasing count (e.g. transactions enqueued)
+class Counter:
+    def __init__(self, labels=None):
+        self.labels = labels or {}
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name):
+        yield f"{name}_total{_format_labels(self.labels)} {_format_value(self.value)}"
+
+
+# Distribution of observed values (e.g. latencies) in fixed cumulative buckets
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS, labels=None):
+        self.labels = labels or {}
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot counts values above every bound
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        slot = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[slot] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Approximate quantile (upper bound of the bucket containing it); None if empty"""
+        with self.lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.bounds + (float('inf'),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def samples(self, name):
+        with self.lock:
+            counts, total, value_sum = list(self.counts), self.count, self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels(self.labels, {'le': repr(bound)})} {cumulative}"
+        yield f"{name}_bucket{_format_labels(self.labels, {'le': '+Inf'})} {total}"
+        yield f"{name}_sum{_format_labels(self.labels)} {_format_value(value_sum)}"
+        yield f"{name}_count{_format_labels(self.labels)} {total}"
+
+
+# Collection of named metric families. Instrumented code checks `enabled`
+# before taking any timestamps, so a disabled registry costs one attribute
+# read per instrumentation point.
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.families = {}  # {name: (kind, help, {label tuple: metric})}
+        self.lock = threading.Lock()
+
+    def _metric(self, kind, factory, name, help_text, labels):
+        key = tuple(sorted((labels or {}).items()))
+        with self.lock:
+            family = self.families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family[0]}")
+            series = family[2]
+            if key not in series:
+                series[key] = factory()
+            return series[key]
+
+    def counter(self, name, help_text, labels=None):
+        """Get or create a counter (exported as <name>_total)"""
+        return self._metric('counter', lambda: Counter(labels), name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=None, buckets=LATENCY_BUCKETS):
+        """Get or create a histogram"""
+        return self._metric('histogram', lambda: Histogram(buckets, labels), name, help_text, labels)
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            families = [(name, kind, help_text, list(series.values()))
+                        for name, (kind, help_text, series) in sorted(self.families.items())]
+        for name, kind, help_text, series in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in series:
+                lines.extend(metric.samples(name))
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One row per series for display: counters report their value, histograms their
+        count, mean and approximate p50/p99"""
+        rows = []
+        with self.lock:
+            families = [(name, kind, list(series.values())) for name, (kind, _, series) in sorted(self.families.items())]
+        for name, kind, series in families:
+            for metric in series:
+                label = _format_labels(metric.labels)
+                if kind == 'counter':
+                    rows.append({'metric': name + label, 'count': metric.value})
+                else:
+                    rows.append({
+                        'metric': name + label,
+                        'count': metric.count,
+                        'mean_ms': metric.sum / metric.count * 1000 if metric.count else None,
+                        'p50_ms': _milliseconds(metric.quantile(0.5)),
+                        'p99_ms': _milliseconds(metric.quantile(0.99)),
+                    })
+        return rows
+
+
+def _milliseconds(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+# Process-wide registry used by the data structures (disabled until enabled by the application)
+METRICS = MetricsRegistry()
+
+# Shared clock for instrumentation points
+now = time.perf_counter
@@ -0,0 +1,73 @@
+# Import necessary modules
+from dataclasses import dataclass  # Immutable currency metadata
+from decimal import Decimal, ROUND_HALF_EVEN  # Exact decimal conversion with banker's rounding
+
+
+# Metadata of a currency: ISO code, number of minor-unit digits and display symbol
+@dataclass(frozen=True, slots=True)
+class Currency:
+    code: str
+    minor_digits: int = 2
+    symbol: str = ''
+
+    @property
+    def scale(self):
+        """Minor units per major unit (100 for cents)"""
+        return 10 ** self.minor_digits
+
+
+# Known currencies by code; extend with register_currency()
+CURRENCIES = {
+    'USD': Currency('USD', 2, '$'),
+    'EUR': Currency('EUR', 2, '€'),
+    'GBP': Currency('GBP', 2, '£'),
+    'JPY': Currency('JPY', 0, '¥'),
+    'KWD': Currency('KWD', 3, 'KD '),
+}
+DEFAULT_CURRENCY = 'USD'
+
+
+def register_currency(code, minor_digits=2, symbol=''):
+    CURRENCIES[code] = Currency(code, minor_digits, symbol)
+    return CURRENCIES[code]
+
+
+def get_currency(code=DEFAULT_CURRENCY):
+    """Look up a currency by code (a Currency is returned unchanged)"""
+    if isinstance(code, Currency):
+        return code
+    try:
+        return CURRENCIES[code]
+    except KeyError:
+        raise ValueError(f"Unknown currency: {code}") from None
+
+
+# Money is held everywhere as an int count of minor units (cents for USD), so
+# balances and sums are exact and can be reduced as int64 columns. Conversion
+# from user-facing amounts happens only at the edges and rounds half to even.
+def to_minor(amount, currency=DEFAULT_CURRENCY):
+    """Convert a major-unit amount (int, float, str or Decimal) to int minor units,
+    rounding half to even. Floats are converted via their shortest repr, i.e. the
+    decimal the user typed, so 0.1 becomes exactly 10 cents."""
+    digits = get_currency(currency).minor_digits
+    if isinstance(amount, int) and not isinstance(amount, bool):
+        return amount * 10 ** digits
+    value = Decimal(repr(amount)) if isinstance(amount, float) else Decimal(amount)
+    return int(value.scaleb(digits).to_integral_value(ROUND_HALF_EVEN))
+
+
+def to_decimal(units, currency=DEFAULT_CURRENCY):
+    """Exact major-unit Decimal of a minor-unit amount"""
+    return Decimal(units).scaleb(-get_currency(currency).minor_digits)
+
+
+def from_minor(units, currency=DEFAULT_CURRENCY):
+    """Major-unit float of a minor-unit amount, for display and legacy float APIs"""
+    return units / get_currency(currency).scale
+
+
+def format_money(units, currency=DEFAULT_CURRENCY):
+    """Format a minor-unit amount for display, e.g. 123456 -> '$1,234.56'"""
+    currency = get_currency(currency)
+    sign = '-' if units < 0 else ''
+    return f"{sign}{currency.symbol}{abs(to_decimal(units, currency)):,.{currency.minor_digits}f}"
@@ -0,0 +1,126 @@
+# Import necessary modules
+from collections import OrderedDict  # Bounded LRU of recently verified credentials
+import base64  # Text encoding of salts and digests
+import hashlib  # scrypt / PBKDF2 / legacy SHA-256
+import hmac  # Constant-time comparison and cache keys
+import os  # Random salts
+import threading  # Protects the verification cache
+import time  # Cache expiry
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+# Salted, cost-configurable password hashing.
+# Hashes are self-describing strings ("scrypt$n$r$p$salt$digest" or
+# "pbkdf2_sha256$iterations$salt$digest"), so the cost parameters can be
+# raised at any time: verify_and_update() reports a fresh hash whenever a
+# stored one uses different parameters (including legacy unsalted SHA-256
+# hex digests), letting logins rehash transparently.
+#
+# The KDF runs inline on the calling thread: hashlib's scrypt and PBKDF2
+# release the GIL while they work, so concurrent logins already hash in
+# parallel without a pool. Successful verifications are remembered for
+# cache_ttl seconds in a bounded cache keyed by an HMAC (never the password
+# itself), so repeated checks within a session are cheap.
+class PasswordHasher:
+    def __init__(self, algorithm="scrypt", scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1,
+                 pbkdf2_iterations=600000, salt_size=16, cache_ttl=300, cache_size=10000):
+        if algorithm not in ("scrypt", "pbkdf2_sha256"):
+            raise ValueError(f"Unsupported password hashing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.salt_size = salt_size
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # {hmac key: expiry time}
+        self.cache_secret = os.urandom(32)  # Per-process key so cache entries reveal nothing
+        self.cache_lock = threading.Lock()
+
+    def _derive(self, password, algorithm, params, salt):
+        """Run the KDF; params are the algorithm's cost parameters"""
+        password = password.encode('utf-8')
+        if algorithm == "scrypt":
+            n, r, p = params
+            return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=256 * r * n + (1 << 20))
+        (iterations,) = params
+        return hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+
+    def _current_params(self):
+        if self.algorithm == "scrypt":
+            return (self.scrypt_n, self.scrypt_r, self.scrypt_p)
+        return (self.pbkdf2_iterations,)
+
+    def hash(self, password):
+        """Hash a password with the current algorithm and parameters"""
+        salt = os.urandom(self.salt_size)
+        params = self._current_params()
+        digest = self._derive(password, self.algorithm, params, salt)
+        return "$".join([self.algorithm, *map(str, params), _b64encode(salt), _b64encode(digest)])
+
+    def needs_rehash(self, encoded):
+        """True if a stored hash does not use the current algorithm and parameters"""
+        parts = encoded.split("$")
+        if parts[0] != self.algorithm:
+            return True
+        return tuple(int(value) for value in parts[1:-2]) != self._current_params()
+
+    def _verify(self, password, encoded):
+        parts = encoded.split("$")
+        if len(parts) == 1:
+            # Legacy unsalted SHA-256 hex digest
+            candidate = hashlib.sha256(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(candidate, encoded)
+        algorithm, params, salt, digest = parts[0], parts[1:-2], parts[-2], parts[-1]
+        if algorithm not in ("scrypt", "pbkdf2_sha256"):
+            return False
+        candidate = self._derive(password, algorithm, tuple(int(value) for value in params), _b64decode(salt))
+        return hmac.compare_digest(candidate, _b64decode(digest))
+
+    def _cache_key(self, password, encoded):
+        return hmac.new(self.cache_secret, f"{encoded}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+
+    def _cached(self, key):
+        with self.cache_lock:
+            expiry = self.cache.get(key)
+            if expiry is None:
+                return False
+            if expiry < time.monotonic():
+                del self.cache[key]
+                return False
+            self.cache.move_to_end(key)
+            return True
+
+    def _remember(self, key):
+        with self.cache_lock:
+            self.cache[key] = time.monotonic() + self.cache_ttl
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)  # Drop the least recently used entry
+
+    def verify(self, password, encoded):
+        """Check a password against a stored hash (cached on success)"""
+        key = self._cache_key(password, encoded)
+        if self._cached(key):
+            return True
+        if self._verify(password, encoded):
+            self._remember(key)
+            return True
+        return False
+
+    def verify_and_update(self, password, encoded):
+        """Verify a password; returns (ok, new_hash) where new_hash is a rehash under the
+        current parameters if the stored one is outdated, else None"""
+        if not encoded or not self.verify(password, encoded):
+            return False, None
+        if self.needs_rehash(encoded):
+            return True, self.hash(password)
+        return True, None
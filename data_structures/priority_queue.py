@@ -1,12 +1,36 @@
 # Import necessary modules
-from queue import PriorityQueue  # Priority-based queue to handle transactions
 from dataclasses import dataclass, field  # Simplify creation of data structures
 from typing import Any  # Allows using generic types
 
 # For generating unique transaction IDs and simulating delays
 import uuid  
 import time  
+import heapq  # Partial ordering for pending-queue pages and batch heapify
+import math  # Choosing between per-item sift-ups and a full heapify
+import itertools  # FIFO sequence numbers for tie-breaking within a priority
 import threading  # For concurrent transaction processing
+import logging  # Reports unexpected processing errors
+from contextlib import nullcontext  # No-op locks when no storage or graph is attached
+from collections import deque  # Bounded buffer of recent batch statistics
+
+from data_structures.graph import EDGES_ADDED, GRAPH_LOCK_SECONDS
+from data_structures.metrics import METRICS, now
+from data_structures.scoring import PriorityRules
+from data_structures.transaction import Transaction, TransactionType, TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+# Pipeline metrics (recorded only while METRICS.enabled is set)
+ENQUEUED = METRICS.counter("bank_transactions_enqueued", "Transactions added to the processing queue")
+APPLIED = METRICS.counter("bank_transactions_applied", "Transactions applied to their account")
+REJECTED = METRICS.counter("bank_transactions_rejected", "Withdrawals rejected for insufficient balance")
+ERRORS = METRICS.counter("bank_transaction_errors", "Transactions that raised an error while being processed")
+ENQUEUE_SECONDS = METRICS.histogram("bank_enqueue_seconds", "Time to add a transaction to the queue")
+QUEUE_WAIT_SECONDS = METRICS.histogram("bank_queue_wait_seconds", "Time a transaction spent queued before being applied")
+APPLY_SECONDS = METRICS.histogram("bank_apply_seconds", "Time to apply (and log) one transaction")
+PROCESSOR_LOCK_SECONDS = METRICS.histogram(
+    "bank_lock_hold_seconds", "Time a lock was held per acquisition", labels={'lock': 'processor'}
+)
 
 # Define a data class for prioritized transactions
 @dataclass(order=True)
@@ -17,51 +41,273 @@ class PrioritizedTransaction:
     transaction: Any = field(compare=False)
     # Unique identifier for each transaction
     id: str = field(default_factory=lambda: str(uuid.uuid4()), compare=False)
+    # Arrival order, breaks ties so equal priorities are served first-in first-out
+    sequence: int = 0
+    # Optional callback(transaction_id, applied) invoked once the transaction is applied, rejected or cancelled
+    on_complete: Any = field(default=None, compare=False)
+    # perf_counter() reading when queued (only set while metrics are enabled)
+    enqueued_at: float = field(default=0.0, compare=False)
+
+# Binary min-heap keyed by (priority, sequence) with a position index by id,
+# so any queued transaction can be removed or re-prioritized in O(log n), and
+# an index of the queued transactions of each account
+class IndexedPriorityQueue:
+    def __init__(self):
+        self.heap = []  # Heap-ordered list of PrioritizedTransaction
+        self.positions = {}  # {transaction id: index in heap}
+        self.by_account = {}  # {account_number: {transaction id: PrioritizedTransaction}}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, transaction_id):
+        return transaction_id in self.positions
+
+    def empty(self):
+        return not self.heap
+
+    @staticmethod
+    def _key(item):
+        return (item.priority, item.sequence)
+
+    def _index_account(self, item):
+        account_number = item.transaction.account.account_number
+        items = self.by_account.get(account_number)
+        if items is None:
+            items = self.by_account[account_number] = {}
+        items[item.id] = item
+
+    def _unindex_account(self, item):
+        account_number = item.transaction.account.account_number
+        items = self.by_account[account_number]
+        del items[item.id]
+        if not items:
+            del self.by_account[account_number]
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.positions[heap[i].id] = i
+        self.positions[heap[j].id] = j
+
+    def _sift_up(self, index):
+        while index > 0:
+            parent = (index - 1) // 2
+            if self._key(self.heap[index]) >= self._key(self.heap[parent]):
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        size = len(self.heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and self._key(self.heap[child]) < self._key(self.heap[smallest]):
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+    def push(self, item):
+        """Add an item to the queue"""
+        if item.id in self.positions:
+            raise KeyError(f"Transaction {item.id} is already queued")
+        self.heap.append(item)
+        self.positions[item.id] = len(self.heap) - 1
+        self._index_account(item)
+        self._sift_up(len(self.heap) - 1)
+
+    def peek(self):
+        """Return the highest-priority item without removing it (None if empty)"""
+        return self.heap[0] if self.heap else None
+
+    def get(self, transaction_id):
+        """Return the queued item with the given id (None if not queued)"""
+        index = self.positions.get(transaction_id)
+        return self.heap[index] if index is not None else None
+
+    def pop(self):
+        """Remove and return the highest-priority item (None if empty)"""
+        if not self.heap:
+            return None
+        return self.remove(self.heap[0].id)
+
+    def remove(self, transaction_id):
+        """Remove and return the item with the given id (None if not queued)"""
+        index = self.positions.pop(transaction_id, None)
+        if index is None:
+            return None
+        item = self.heap[index]
+        self._unindex_account(item)
+        last = self.heap.pop()
+        if index < len(self.heap):
+            # Move the last item into the hole and restore the heap property
+            self.heap[index] = last
+            self.positions[last.id] = index
+            self._sift_up(index)
+            self._sift_down(self.positions[last.id])
+        return item
+
+    def ordered_after(self, after=None, limit=20, predicate=None):
+        """Up to limit items in processing order whose (priority, sequence) key follows
+        the cursor `after` (None = from the front), optionally filtered by predicate.
+        Costs O(n log limit) instead of sorting the whole queue."""
+        items = self.heap
+        if after is not None:
+            items = (item for item in items if self._key(item) > after)
+        if predicate is not None:
+            items = filter(predicate, items)
+        return heapq.nsmallest(limit, items, key=self._key)
+
+    def push_many(self, items):
+        """Add a batch of items. Large batches are appended and the heap is rebuilt
+        with one heapify (O(n + k)) instead of k sift-ups (O(k log n))."""
+        heap = self.heap
+        for item in items:
+            if item.id in self.positions:
+                raise KeyError(f"Transaction {item.id} is already queued")
+        if len(items) * math.log2(len(heap) + len(items) + 1) < len(heap) + len(items):
+            for item in items:
+                self.push(item)
+            return
+        heap.extend(items)
+        heapq.heapify(heap)  # PrioritizedTransaction orders by (priority, sequence)
+        self.positions = {item.id: index for index, item in enumerate(heap)}
+        for item in items:
+            self._index_account(item)
+
+    def update_priority(self, transaction_id, priority):
+        """Change the priority of a queued item; returns False if it is not queued"""
+        index = self.positions.get(transaction_id)
+        if index is None:
+            return False
+        self.heap[index].priority = priority
+        self._sift_up(index)
+        self._sift_down(self.positions[transaction_id])
+        return True
+
+    def pending_for(self, account_numbers):
+        """Queued items on any of the given accounts, in processing order"""
+        items = [item for account_number in account_numbers
+                 for item in self.by_account.get(account_number, {}).values()]
+        items.sort(key=self._key)
+        return items
+
+    def ordered(self):
+        """Return all queued items in processing order without modifying the queue"""
+        return sorted(self.heap, key=self._key)
 
 # Class to handle transaction processing
 class TransactionProcessor:
-    def __init__(self):
-        # Priority queue to hold transactions based on their priority
-        self.transaction_queue = PriorityQueue()
-        # List to track pending transactions (not yet processed)
-        self.pending_transactions = []
+    def __init__(self, priority_rules=None):
+        # Indexed priority queue holding all pending (not yet processed) transactions
+        self.transaction_queue = IndexedPriorityQueue()
+        # Monotonic counter giving each transaction its FIFO sequence number
+        self.sequence = itertools.count()
         # Lock to ensure thread-safe operations
         self.lock = threading.Lock()
+        # Condition variable (sharing the lock) signalled whenever a transaction is queued
+        self.condition = threading.Condition(self.lock)
+        self.is_processing = False  # Whether the background worker is running
+        self.wal = None  # Optional StorageEngine that logs every applied transaction
+        self.priority_rules = priority_rules or PriorityRules()  # Threshold tables used to score transactions
+        self.transaction_graph = None  # Optional TransactionGraph supplying velocity features to the rules
+        # Statistics for the most recent batches applied in drain mode:
+        # [{'size': transactions in batch, 'latency': seconds to apply, 'timestamp': epoch seconds}]
+        self.batch_stats = deque(maxlen=1000)
 
     # Method to calculate the priority of a transaction
+    # (lower number = higher priority; see PriorityRules for the default tables)
     def calculate_priority(self, transaction):
-        # Priority levels (lower number = higher priority):
-        # 1: VIP accounts or high-value transactions (>$10000)
-        # 2: Medium-value transactions ($1000-$10000)
-        # 3: Regular transactions (<$1000)
-        
-        amount = transaction['amount']
-        account_type = transaction['account_type']
-        
-        if account_type == 'VIP' or amount > 10000:
-            return 1
-        elif 1000 <= amount <= 10000:
-            return 2
-        else:
-            return 3
+        return self.priority_rules.priority(transaction, self.transaction_graph)
 
-    # Method to add a transaction to the queue
-    def add_transaction(self, transaction):
-        print(f"Adding transaction: {transaction}")
+    # Method to add a transaction to the queue, returning its id
+    # (accepts a Transaction record or a legacy transaction dictionary)
+    def add_transaction(self, transaction, on_complete=None):
+        transaction = Transaction.coerce(transaction)
+        enabled = METRICS.enabled
+        if enabled:
+            start = now()
+        # Calculate the transaction's priority before taking the lock
+        priority = self.calculate_priority(transaction)
         with self.lock:  # Ensure thread-safe access
-            # Calculate the transaction's priority
-            priority = self.calculate_priority(transaction)
+            acquired = now() if enabled else 0.0
+            transaction.priority = priority
             # Wrap the transaction in a PrioritizedTransaction object
             prioritized_transaction = PrioritizedTransaction(
                 priority=priority,
-                transaction=transaction
+                transaction=transaction,
+                sequence=next(self.sequence),
+                on_complete=on_complete,
+                enqueued_at=acquired
             )
             # Add the transaction to the priority queue
-            self.transaction_queue.put(prioritized_transaction)
-            # Track it in the pending transactions list
-            self.pending_transactions.append(prioritized_transaction)
-        
-        print(f"Transaction added: {transaction}")  # Debugging message
+            self.transaction_queue.push(prioritized_transaction)
+            # Wake up a drain-mode worker waiting for work
+            self.condition.notify()
+
+        if enabled:
+            released = now()
+            PROCESSOR_LOCK_SECONDS.observe(released - acquired)
+            ENQUEUE_SECONDS.observe(released - start)
+            ENQUEUED.inc()
+        return prioritized_transaction.id
+
+    # Queue a batch of transactions, returning their ids in order.
+    # The whole batch is scored in one vectorized pass outside the lock and
+    # merged into the queue with a single heapify, so ingesting a large file
+    # costs one lock acquisition instead of one per transaction.
+    def add_transactions(self, transactions, on_complete=None):
+        items = self.prioritize([Transaction.coerce(transaction) for transaction in transactions], on_complete)
+        self._enqueue_items(items)
+        return [item.id for item in items]
+
+    # Score a batch under this processor's rules and wrap it in queue entries (in arrival order)
+    def prioritize(self, transactions, on_complete=None):
+        items = []
+        for transaction, priority in zip(transactions, self.priority_rules.score(transactions, self.transaction_graph)):
+            transaction.priority = priority
+            items.append(PrioritizedTransaction(
+                priority=priority,
+                transaction=transaction,
+                sequence=next(self.sequence),
+                on_complete=on_complete
+            ))
+        return items
+
+    # Merge prioritized entries into the queue under one lock acquisition
+    def _enqueue_items(self, items):
+        with self.lock:
+            acquired = now() if METRICS.enabled else 0.0
+            for item in items:
+                item.enqueued_at = acquired
+            self.transaction_queue.push_many(items)
+            self.condition.notify_all()
+        if acquired:
+            PROCESSOR_LOCK_SECONDS.observe(now() - acquired)
+            ENQUEUED.inc(len(items))
+
+    # Apply both legs of a transfer (withdrawal from the sender, deposit to the receiver)
+    # atomically; returns False, applying neither, if the sender has insufficient funds
+    def add_transfer(self, withdraw_transaction, deposit_transaction):
+        return self.apply_transfers([(withdraw_transaction, deposit_transaction)])
+
+    # Apply many transfers all-or-nothing under a single acquisition of each lock.
+    # transfers is a list of (withdraw_transaction, deposit_transaction) pairs;
+    # returns False (applying nothing) if any leg would overdraw its account.
+    # Transactions already queued on the sending accounts are applied first.
+    def apply_transfers(self, transfers, transaction_graph=None):
+        transfers = [(Transaction.coerce(withdraw), Transaction.coerce(deposit)) for withdraw, deposit in transfers]
+        _score_transfers(self, transfers)
+        with self.lock:
+            acquired = now() if METRICS.enabled else 0.0
+            try:
+                return _apply_transfer_batch(self, transfers, transaction_graph, [self])
+            finally:
+                if acquired:
+                    PROCESSOR_LOCK_SECONDS.observe(now() - acquired)
 
     # Start the processing thread for transactions
     def start_processing(self):
@@ -70,75 +316,265 @@ class TransactionProcessor:
         self.processing_thread.daemon = True  # Allows the thread to exit with the main program
         self.processing_thread.start()  # Start the background thread
 
+    # Start a drain-mode worker that applies transactions in batches
+    def start_batch_processing(self, max_batch_size=500, max_linger=0.005):
+        self.is_processing = True
+        self.processing_thread = threading.Thread(
+            target=self.process_batches, args=(max_batch_size, max_linger)
+        )
+        self.processing_thread.daemon = True
+        self.processing_thread.start()
+
+    # Stop the background worker (either mode) and wake it if it is waiting
+    def stop_processing(self):
+        with self.condition:
+            self.is_processing = False
+            self.condition.notify_all()
+
+    # Drain mode: block until work arrives, then apply up to max_batch_size
+    # transactions per wakeup. Once the first transaction is available the worker
+    # lingers up to max_linger seconds for the batch to fill before applying it.
+    def process_batches(self, max_batch_size=500, max_linger=0.005):
+        while self.is_processing:
+            with self.condition:
+                # Sleep until a producer signals new work (re-check periodically for shutdown)
+                while self.is_processing and self.transaction_queue.empty():
+                    self.condition.wait(timeout=1.0)
+                if not self.is_processing:
+                    break
+
+                deadline = time.monotonic() + max_linger
+                while len(self.transaction_queue) < max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.condition.wait(timeout=remaining):
+                        break
+
+                batch = []
+                while len(batch) < max_batch_size and not self.transaction_queue.empty():
+                    batch.append(self.transaction_queue.pop())
+
+                start = time.perf_counter()
+                self._process_batch(batch)
+                latency = time.perf_counter() - start
+                self.batch_stats.append({
+                    'size': len(batch),
+                    'latency': latency,
+                    'timestamp': time.time()
+                })
+                if METRICS.enabled:
+                    PROCESSOR_LOCK_SECONDS.observe(latency)  # The lock is held while the batch is applied
+
+    # Apply a batch of prioritized transactions in order; a failing transaction does not abort the rest
+    def _process_batch(self, batch):
+        for prioritized_transaction in batch:
+            try:
+                self._process_prioritized(prioritized_transaction)
+            except Exception:
+                ERRORS.inc()
+                logger.exception("Error processing transaction %s", prioritized_transaction.id)
+
     # Process transactions from the queue
     def process_transactions(self):
-        print("Processing transactions...")
         while self.is_processing:  # Keep processing while the flag is true
             try:
                 with self.lock:  # Ensure thread-safe access
-                    if not self.transaction_queue.empty():  # Check if there are transactions in the queue
-                        # Get the highest-priority transaction
-                        prioritized_transaction = self.transaction_queue.get_nowait()
+                    # Remove the highest-priority transaction (None if the queue is empty)
+                    prioritized_transaction = self.transaction_queue.pop()
+                    if prioritized_transaction is not None:
                         # Process the transaction
-                        self._process_single_transaction(prioritized_transaction.transaction)
-                        self.transaction_queue.task_done()  # Mark the task as done
+                        self._process_prioritized(prioritized_transaction)
 
                 time.sleep(0.1)  # Prevent CPU overuse
-            except Exception as e:  # Catch and log errors
-                print(f"Error processing transaction: {e}")
+            except Exception:  # Catch and log errors
+                ERRORS.inc()
+                logger.exception("Error processing transaction")
                 time.sleep(0.1)  # Add delay to handle errors gracefully
 
-    # Process a specific transaction from the pending list by its ID
+    # Process a specific pending transaction by its ID
     def process_pending_transaction(self, transaction_id):
         with self.lock:  # Ensure thread-safe access
-            # Iterate over the pending transactions
-            for i, pt in enumerate(self.pending_transactions):
-                if pt.id == transaction_id:  # Match transaction by its unique ID
-                    transaction = pt.transaction
-                    # Process the transaction
-                    self._process_single_transaction(transaction)
-                    # Remove it from the pending list
-                    del self.pending_transactions[i]
-                    print(f"Processed transaction: {transaction}")
-                    break
+            # Remove it from the queue so the background worker cannot apply it again
+            prioritized_transaction = self.transaction_queue.remove(transaction_id)
+            if prioritized_transaction is None:
+                return False
+            self._process_prioritized(prioritized_transaction)
+            return True
 
-    # Retrieve all pending transactions without disrupting the queue order
+    # Cancel a pending transaction, returning its data (None if it is not pending)
+    def cancel_transaction(self, transaction_id):
+        with self.lock:
+            prioritized_transaction = self.transaction_queue.remove(transaction_id)
+        if prioritized_transaction is None:
+            return None
+        prioritized_transaction.transaction.status = TransactionStatus.CANCELLED
+        self._notify(prioritized_transaction, False)
+        return prioritized_transaction.transaction
+
+    # Change the priority of a pending transaction
+    def reprioritize_transaction(self, transaction_id, priority):
+        with self.lock:
+            return self.transaction_queue.update_priority(transaction_id, priority)
+
+    # Return the next transaction to be processed without removing it
+    def peek_transaction(self):
+        with self.lock:
+            return self.transaction_queue.peek()
+
+    # Retrieve all pending transactions in processing order without disrupting the queue
+    @property
     def pending_transactions(self):
-        pending = []  # List to hold pending transactions
-        temp_queue = PriorityQueue()  # Temporary queue to restore order
-        
-        # Transfer transactions from the queue to the temporary list
-        while not self.transaction_queue.empty():
-            transaction = self.transaction_queue.get()
-            pending.append(transaction)
-            temp_queue.put(transaction)
-            
-        # Restore transactions to the main queue
-        while not temp_queue.empty():
-            self.transaction_queue.put(temp_queue.get())
-            
-        return pending
+        with self.lock:
+            return self.transaction_queue.ordered()
+
+    # Number of transactions waiting to be processed
+    def pending_count(self):
+        return len(self.transaction_queue)
+
+    # One page of pending transactions in processing order, starting after a
+    # (priority, sequence) cursor; returns (items, next_cursor or None)
+    def pending_page(self, after=None, limit=20, predicate=None):
+        with self.lock:
+            items = self.transaction_queue.ordered_after(after, limit + 1, predicate)
+        return _page_with_cursor(items, limit)
+
+    # Apply a dequeued transaction and notify its completion callback
+    def _process_prioritized(self, prioritized_transaction):
+        if METRICS.enabled and prioritized_transaction.enqueued_at:
+            QUEUE_WAIT_SECONDS.observe(now() - prioritized_transaction.enqueued_at)
+        applied = False
+        try:
+            applied = self._process_single_transaction(prioritized_transaction.transaction)
+        finally:
+            self._notify(prioritized_transaction, applied)
+        return applied
+
+    # Invoke a transaction's completion callback, if it has one
+    def _notify(self, prioritized_transaction, applied):
+        if prioritized_transaction.on_complete is not None:
+            try:
+                prioritized_transaction.on_complete(prioritized_transaction.id, applied)
+            except Exception:
+                logger.exception("Error in completion callback for transaction %s", prioritized_transaction.id)
 
     # Internal method to process a single transaction
     def _process_single_transaction(self, transaction):
-        account = transaction['account']  # Get the account associated with the transaction
+        enabled = METRICS.enabled
+        if enabled:
+            start = now()
+        if self.wal is None:
+            applied = self._apply_transaction(transaction)
+        else:
+            # Apply and log together so a snapshot never sees one without the other
+            with self.wal.lock:
+                applied = self._apply_transaction(transaction)
+                if applied:
+                    self.wal.log_transaction(transaction)
+        if enabled:
+            APPLY_SECONDS.observe(now() - start)
+            (APPLIED if applied else REJECTED).inc()
+        return applied
+
+    # Apply a transaction to its account; returns False if it was rejected
+    def _apply_transaction(self, transaction):
+        account = transaction.account  # Get the account associated with the transaction
+        if transaction.currency != account.currency:
+            transaction.status = TransactionStatus.FAILED
+            return False  # Amounts are never converted between currencies
 
         # Handle deposit transactions
-        if transaction['type'] == 'deposit':
-            account.update_balance(transaction['amount'], 'deposit')
+        if transaction.type == TransactionType.DEPOSIT:
+            account.adjust_balance(transaction.amount_minor, TransactionType.DEPOSIT)
         # Handle withdrawal transactions
-        elif transaction['type'] == 'withdraw':
-            if account.balance >= transaction['amount']:  # Check for sufficient balance
-                account.update_balance(transaction['amount'], 'withdraw')
+        elif transaction.type == TransactionType.WITHDRAW:
+            if account.balance_minor >= transaction.amount_minor:  # Check for sufficient balance
+                account.adjust_balance(transaction.amount_minor, TransactionType.WITHDRAW)
             else:
-                print(f"Insufficient balance for transaction: {transaction}")
-                return  # Exit if funds are insufficient
-        
+                transaction.status = TransactionStatus.FAILED
+                return False  # Exit if funds are insufficient
+
         # Log the transaction in the account's history
-        account.add_transaction(
-            transaction['type'],
-            transaction['amount'],
-            transaction['description']
+        account.record_transaction(
+            transaction.type,
+            transaction.amount_minor,
+            transaction.description
         )
+        transaction.status = TransactionStatus.COMPLETED
+        return True
+
+
+def _page_with_cursor(items, limit):
+    """Trim a limit + 1 lookahead to a page plus the cursor of its last item"""
+    if len(items) > limit:
+        items = items[:limit]
+        return items, (items[-1].priority, items[-1].sequence)
+    return items, None
+
+
+def _reserve_funds(transfers):
+    """Walk the legs in order against projected balances; True if none overdraws its account"""
+    projected = {}  # {account_number: balance in minor units after the legs seen so far}
+    for withdraw_transaction, deposit_transaction in transfers:
+        source, target = withdraw_transaction.account, deposit_transaction.account
+        amount = withdraw_transaction.amount_minor
+        balance = projected.get(source.account_number, source.balance_minor)
+        if (amount <= 0 or deposit_transaction.amount_minor != amount or balance < amount
+                or not source.currency == target.currency == withdraw_transaction.currency
+                == deposit_transaction.currency):
+            return False
+        projected[source.account_number] = balance - amount
+        projected[target.account_number] = projected.get(target.account_number, target.balance_minor) + amount
+    return True
+
+
+def _score_transfers(processor, transfers):
+    """Set the priority of every leg. Called before any lock is taken: velocity
+    rules read the transaction graph, whose lock is not reentrant."""
+    legs = [transaction for pair in transfers for transaction in pair]
+    for transaction, priority in zip(legs, processor.priority_rules.score(legs, processor.transaction_graph)):
+        transaction.priority = priority
+
+
+def _drain_pending(processors, account_numbers):
+    """Apply the transactions already queued on these (sending) accounts, in processing
+    order, so a transfer applied immediately never overtakes them (caller holds every processor's lock)"""
+    for processor in processors:
+        for item in processor.transaction_queue.pending_for(account_numbers):
+            processor.transaction_queue.remove(item.id)
+            processor._process_prioritized(item)
+
 
-        print(f"Processed transaction: {transaction}")  # Debugging message
+def _apply_transfer_batch(processor, transfers, transaction_graph, processors):
+    """Apply what is queued on the sending accounts, then reserve and apply every (already
+    scored) transfer with its WAL records in one batch and its graph edge in the same pass.
+    processors are the (shard) processors owning those accounts; the caller holds their
+    locks. Lock order: processor -> storage -> graph."""
+    # Only the senders' queues: receivers' pending transactions wait for their owners' approval
+    _drain_pending(processors, {withdraw.account.account_number for withdraw, _ in transfers})
+    if not _reserve_funds(transfers):
+        return False
+    wal = processor.wal
+    with (wal.batch() if wal is not None else nullcontext()), \
+            (transaction_graph.lock if transaction_graph is not None else nullcontext()):
+        graph_acquired = now() if METRICS.enabled and transaction_graph is not None else 0.0
+        if transaction_graph is not None:
+            # Every edge must be valid before the first leg is applied
+            transaction_graph._check_currencies([
+                (withdraw.account.account_number, deposit.account.account_number, withdraw.currency)
+                for withdraw, deposit in transfers
+            ])
+        for withdraw_transaction, deposit_transaction in transfers:
+            for transaction in (withdraw_transaction, deposit_transaction):
+                processor._apply_transaction(transaction)
+                if wal is not None:
+                    wal.log_transaction(transaction)
+            if transaction_graph is not None:
+                transaction_graph._add_edge(
+                    withdraw_transaction.account.account_number, deposit_transaction.account.account_number,
+                    withdraw_transaction.amount_minor, "transfer", None, wal, withdraw_transaction.currency
+                )
+        if METRICS.enabled:
+            APPLIED.inc(2 * len(transfers))
+            if graph_acquired:
+                GRAPH_LOCK_SECONDS.observe(now() - graph_acquired)
+                EDGES_ADDED.inc(len(transfers))
+    return True
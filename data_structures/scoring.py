@@ -0,0 +1,132 @@
+# Import necessary modules
+from dataclasses import dataclass  # Immutable rows of the rule tables
+
+from data_structures.money import to_minor
+
+try:  # NumPy is optional; without it batches are scored one transaction at a time
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Amount rule: transactions of at least `threshold` major units of their
+# currency (strictly more than it if not inclusive) get `priority`
+@dataclass(frozen=True, slots=True)
+class AmountTier:
+    threshold: float
+    priority: int
+    inclusive: bool = True
+
+    def bound(self, currency):
+        """Smallest qualifying amount in minor units of a currency"""
+        return to_minor(self.threshold, currency) + (0 if self.inclusive else 1)
+
+
+# Velocity rule: transactions on accounts that made at least `min_count`
+# transfers, or sent at least `min_amount_out` major units, in the last
+# `window_seconds` get `priority`. The window must be one the transaction
+# graph tracks (see TransactionGraph.windows).
+@dataclass(frozen=True, slots=True)
+class VelocityTier:
+    window_seconds: int
+    priority: int
+    min_count: int = None
+    min_amount_out: float = None
+
+    def matches(self, count, sum_out_minor, currency):
+        if self.min_count is not None and count >= self.min_count:
+            return True
+        return self.min_amount_out is not None and sum_out_minor >= to_minor(self.min_amount_out, currency)
+
+
+# Default rules (lower number = higher priority):
+# 1: VIP accounts or high-value transactions (>10000)
+# 2: Medium-value transactions (1000-10000)
+# 3: Everything else
+DEFAULT_AMOUNT_TIERS = (AmountTier(10000, 1, inclusive=False), AmountTier(1000, 2))
+DEFAULT_ACCOUNT_TYPE_PRIORITIES = {'VIP': 1}
+DEFAULT_PRIORITY = 3
+
+
+# Table-driven transaction priority rules.
+# A transaction gets the most urgent (lowest) priority of every rule it
+# matches: its account type's entry, each amount tier it reaches and each
+# velocity tier its account trips, falling back to default_priority.
+# priority() scores one transaction; score() scores a whole batch, with NumPy
+# when it is available, looking up each account's velocity features once.
+class PriorityRules:
+    def __init__(self, amount_tiers=DEFAULT_AMOUNT_TIERS, account_type_priorities=None, velocity_tiers=(),
+                 default_priority=DEFAULT_PRIORITY):
+        self.amount_tiers = tuple(amount_tiers)
+        self.account_type_priorities = dict(
+            DEFAULT_ACCOUNT_TYPE_PRIORITIES if account_type_priorities is None else account_type_priorities
+        )
+        self.velocity_tiers = tuple(velocity_tiers)
+        self.default_priority = default_priority
+        self.bounds = {}  # {currency: [(bound in minor units, priority)]}, filled on first use
+
+    def _amount_bounds(self, currency):
+        bounds = self.bounds.get(currency)
+        if bounds is None:
+            bounds = self.bounds[currency] = [(tier.bound(currency), tier.priority) for tier in self.amount_tiers]
+        return bounds
+
+    def priority(self, transaction, transaction_graph=None):
+        """Priority of one transaction"""
+        priority = self.account_type_priorities.get(transaction.account_type, self.default_priority)
+        for bound, tier_priority in self._amount_bounds(transaction.currency):
+            if transaction.amount_minor >= bound and tier_priority < priority:
+                priority = tier_priority
+        if self.velocity_tiers and transaction_graph is not None and transaction.account is not None:
+            for tier in self.velocity_tiers:
+                if tier.priority < priority:
+                    stats = transaction_graph.get_window_stats(transaction.account.account_number,
+                                                               tier.window_seconds)
+                    if tier.matches(stats['count'], stats['sum_out'], transaction.currency):
+                        priority = tier.priority
+        return priority
+
+    def score(self, transactions, transaction_graph=None):
+        """Priorities of a batch of transactions, in order"""
+        if np is None or not transactions:
+            return [self.priority(transaction, transaction_graph) for transaction in transactions]
+        count = len(transactions)
+        amounts = np.fromiter((transaction.amount_minor for transaction in transactions), np.int64, count)
+
+        # Account type and currency as small integer codes, so each rule is one array comparison
+        type_codes, type_index = _codes(transaction.account_type for transaction in transactions)
+        type_priorities = np.array(
+            [self.account_type_priorities.get(account_type, self.default_priority) for account_type in type_codes],
+            dtype=np.int64
+        )
+        priorities = type_priorities[type_index]
+
+        currency_codes, currency_index = _codes(transaction.currency for transaction in transactions)
+        for position, tier in enumerate(self.amount_tiers):
+            bounds = np.array([self._amount_bounds(currency)[position][0] for currency in currency_codes],
+                              dtype=np.int64)
+            hit = amounts >= bounds[currency_index]
+            priorities = np.where(hit, np.minimum(priorities, tier.priority), priorities)
+
+        if self.velocity_tiers and transaction_graph is not None:
+            account_numbers, account_index = _codes(transaction.account.account_number for transaction in transactions)
+            for tier in self.velocity_tiers:
+                stats = transaction_graph.window_stats_many(account_numbers, tier.window_seconds)
+                hit = np.zeros(count, dtype=bool)
+                if tier.min_count is not None:
+                    counts = np.fromiter((row['count'] for row in stats), np.int64, len(stats))
+                    hit |= counts[account_index] >= tier.min_count
+                if tier.min_amount_out is not None:
+                    sums = np.fromiter((row['sum_out'] for row in stats), np.int64, len(stats))
+                    bounds = np.array([to_minor(tier.min_amount_out, currency) for currency in currency_codes],
+                                      dtype=np.int64)
+                    hit |= sums[account_index] >= bounds[currency_index]
+                priorities = np.where(hit, np.minimum(priorities, tier.priority), priorities)
+        return priorities.tolist()
+
+
+def _codes(values):
+    """Distinct values in first-seen order plus an array mapping each value to its position"""
+    positions = {}
+    index = np.fromiter((positions.setdefault(value, len(positions)) for value in values), np.int64)
+    return list(positions), index
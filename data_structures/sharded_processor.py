@@ -0,0 +1,153 @@
+# Import necessary modules
+import heapq  # Merge the per-shard pending queues into one ordered view
+import itertools  # Shared FIFO sequence numbers across shards
+import zlib  # Stable hash for routing account numbers to shards
+
+from data_structures.metrics import METRICS, now
+from data_structures.priority_queue import (
+    PROCESSOR_LOCK_SECONDS, TransactionProcessor, _apply_transfer_batch, _page_with_cursor, _score_transfers
+)
+from data_structures.transaction import Transaction
+
+# Transaction processor that spreads work over several independent shards.
+# Each shard is a TransactionProcessor with its own lock, queue and drain-mode
+# worker thread. Transactions are routed by account number, so every account
+# is only ever touched by one shard: per-account ordering is preserved while
+# unrelated accounts are processed in parallel.
+class ShardedTransactionProcessor:
+    def __init__(self, num_shards=4, priority_rules=None):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.shards = [TransactionProcessor(priority_rules) for _ in range(num_shards)]
+        # One sequence counter for all shards keeps FIFO order comparable between them
+        self.sequence = itertools.count()
+        for shard in self.shards:
+            shard.sequence = self.sequence
+        self.is_processing = False
+
+    # Optional StorageEngine shared by every shard
+    @property
+    def wal(self):
+        return self.shards[0].wal
+
+    @wal.setter
+    def wal(self, storage):
+        for shard in self.shards:
+            shard.wal = storage
+
+    # Optional TransactionGraph supplying velocity features, shared by every shard
+    @property
+    def transaction_graph(self):
+        return self.shards[0].transaction_graph
+
+    @transaction_graph.setter
+    def transaction_graph(self, transaction_graph):
+        for shard in self.shards:
+            shard.transaction_graph = transaction_graph
+
+    # Return the index of the shard that owns an account number
+    def shard_index(self, account_number):
+        return zlib.crc32(str(account_number).encode()) % len(self.shards)
+
+    # Return the shard that owns an account number
+    def shard_for(self, account_number):
+        return self.shards[self.shard_index(account_number)]
+
+    # Method to calculate the priority of a transaction (same rules as TransactionProcessor)
+    def calculate_priority(self, transaction):
+        return self.shards[0].calculate_priority(transaction)
+
+    # Route a transaction to the shard owning its account, returning its id
+    def add_transaction(self, transaction, on_complete=None):
+        transaction = Transaction.coerce(transaction)
+        return self.shard_for(transaction.account.account_number).add_transaction(transaction, on_complete)
+
+    # Score a batch once, then queue each shard's share with a single heapify; returns ids in order
+    def add_transactions(self, transactions, on_complete=None):
+        transactions = [Transaction.coerce(transaction) for transaction in transactions]
+        items = self.shards[0].prioritize(transactions, on_complete)  # Sequence numbers follow arrival order
+        routed = [[] for _ in self.shards]
+        for item in items:
+            routed[self.shard_index(item.transaction.account.account_number)].append(item)
+        for shard, shard_items in zip(self.shards, routed):
+            if shard_items:
+                shard._enqueue_items(shard_items)
+        return [item.id for item in items]
+
+    # Apply both legs of a transfer atomically, even when the accounts live on different shards
+    # (see apply_transfers). Returns False (and applies nothing) if the sender has insufficient funds.
+    def add_transfer(self, withdraw_transaction, deposit_transaction):
+        return self.apply_transfers([(withdraw_transaction, deposit_transaction)])
+
+    # Apply many transfers all-or-nothing: every involved shard lock is taken once,
+    # in shard order (so concurrent transfers cannot deadlock), and the batch is
+    # applied in a single critical section. Transactions already queued on the
+    # sending accounts are applied first, preserving their order.
+    def apply_transfers(self, transfers, transaction_graph=None):
+        transfers = [(Transaction.coerce(withdraw), Transaction.coerce(deposit)) for withdraw, deposit in transfers]
+        _score_transfers(self.shards[0], transfers)
+        involved = sorted({
+            self.shard_index(transaction.account.account_number)
+            for pair in transfers for transaction in pair
+        })
+        locks = [self.shards[i].lock for i in involved]
+        for lock in locks:
+            lock.acquire()
+        acquired = now() if METRICS.enabled else 0.0
+        try:
+            return _apply_transfer_batch(self.shards[0], transfers, transaction_graph,
+                                         [self.shards[i] for i in involved])
+        finally:
+            if acquired:
+                PROCESSOR_LOCK_SECONDS.observe(now() - acquired)
+            for lock in reversed(locks):
+                lock.release()
+
+    # Start one drain-mode worker thread per shard
+    def start_processing(self, max_batch_size=500, max_linger=0.005):
+        self.is_processing = True
+        for shard in self.shards:
+            shard.start_batch_processing(max_batch_size, max_linger)
+
+    # Stop every shard's worker
+    def stop_processing(self):
+        self.is_processing = False
+        for shard in self.shards:
+            shard.stop_processing()
+
+    # Process a specific pending transaction by its ID
+    def process_pending_transaction(self, transaction_id):
+        return any(shard.process_pending_transaction(transaction_id) for shard in self.shards)
+
+    # Cancel a pending transaction, returning its data (None if it is not pending)
+    def cancel_transaction(self, transaction_id):
+        for shard in self.shards:
+            transaction = shard.cancel_transaction(transaction_id)
+            if transaction is not None:
+                return transaction
+        return None
+
+    # Change the priority of a pending transaction
+    def reprioritize_transaction(self, transaction_id, priority):
+        return any(shard.reprioritize_transaction(transaction_id, priority) for shard in self.shards)
+
+    # Number of transactions waiting across all shards
+    def pending_count(self):
+        return sum(len(shard.transaction_queue) for shard in self.shards)
+
+    # One page of pending transactions across shards, starting after a (priority, sequence) cursor
+    def pending_page(self, after=None, limit=20, predicate=None):
+        items = []
+        for shard in self.shards:
+            with shard.lock:
+                items.extend(shard.transaction_queue.ordered_after(after, limit + 1, predicate))
+        items.sort(key=lambda pt: (pt.priority, pt.sequence))
+        return _page_with_cursor(items, limit)
+
+    # Retrieve all pending transactions across shards in processing order
+    @property
+    def pending_transactions(self):
+        return list(heapq.merge(
+            *(shard.pending_transactions for shard in self.shards),
+            key=lambda pt: (pt.priority, pt.sequence)
+        ))
@@ -0,0 +1,484 @@
+# Import necessary modules
+from array import array  # Raw column dumps of account histories
+from contextlib import contextmanager  # Grouping records into one atomic batch
+from datetime import datetime  # Restoring account creation dates
+import logging  # Reports background sync failures
+import os  # File handling and fsync
+import struct  # Fixed-width binary encoding
+import threading  # Background fsync thread and state lock
+import time  # Interval between batched fsyncs
+import zlib  # CRC32 checksums for WAL records
+
+from data_structures.bst import BankAccount, BankAccountBST
+from data_structures.graph import TransactionGraph
+from data_structures.hashtable import OpenAddressingHashTable
+from data_structures.history import DESCRIPTIONS
+from data_structures.transaction import TransactionType, epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+# WAL record kinds
+RECORD_USER = 1  # A user registered (or changed password)
+RECORD_ACCOUNT_UPDATE = 3  # An account's owner or type changed
+RECORD_BATCH = 6  # Several records that must be replayed all-or-nothing
+RECORD_ACCOUNT = 7  # An account was opened
+RECORD_TRANSACTION = 8  # A deposit or withdrawal was applied to an account
+RECORD_EDGE = 10  # A transfer was added to the transaction graph
+
+SNAPSHOT_MAGIC = b'BANKSNP3'  # Snapshot format version; any other is rejected
+_RECORD_HEADER = struct.Struct('<II')  # Payload length, CRC32 of payload
+_U32 = struct.Struct('<I')
+_ACCOUNT_FIXED = struct.Struct('<qqB')  # balance (minor units), creation epoch seconds, history is time ordered
+_TRANSACTION_FIXED = struct.Struct('<bqqb')  # type, amount (minor units), timestamp, priority
+_EDGE_FIXED = struct.Struct('<qbq')  # amount (minor units), type, timestamp
+_PAIR_SUMMARY_FIXED = struct.Struct('<qqqq')  # count, total (minor units), first seen, last seen
+
+
+# Append-only binary encoder for record payloads and snapshots
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def u32(self, value):
+        self.buffer += _U32.pack(value)
+
+    def string(self, value):
+        encoded = str(value).encode('utf-8')
+        self.buffer += _U32.pack(len(encoded))
+        self.buffer += encoded
+
+    def pack(self, fmt, *values):
+        self.buffer += fmt.pack(*values)
+
+    def raw(self, data):
+        self.buffer += data
+
+
+# Sequential decoder over a bytes-like object
+class _Reader:
+    def __init__(self, data, offset=0):
+        self.data = memoryview(data)
+        self.offset = offset
+
+    def u32(self):
+        (value,) = _U32.unpack_from(self.data, self.offset)
+        self.offset += 4
+        return value
+
+    def string(self):
+        length = self.u32()
+        value = bytes(self.data[self.offset:self.offset + length]).decode('utf-8')
+        self.offset += length
+        return value
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def raw(self, length):
+        value = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return value
+
+
+# Durable storage for all banking state.
+# Every mutation is appended to a write-ahead log (WAL) of CRC-checked binary
+# records; a background thread fsyncs the log in batches every sync_interval
+# seconds. Periodically the full state is written as a compact binary snapshot
+# and the log is rotated, so recovery only loads the latest snapshot and replays
+# the WAL written after it. A snapshot copies the state under `lock` and is
+# encoded, written and fsynced after releasing it, so logging is only paused
+# for the copy.
+#
+# Mutations and their WAL records must happen together under `lock` so that a
+# snapshot never captures an effect whose record lands in the next log. Lock
+# order is always processor lock -> storage lock -> graph lock.
+class StorageEngine:
+    def __init__(self, directory, sync_interval=0.05, snapshot_every=100000):
+        self.directory = directory
+        self.sync_interval = sync_interval  # Seconds between batched fsyncs
+        self.snapshot_every = snapshot_every  # WAL records between automatic snapshots
+        self.lock = threading.RLock()
+        self.snapshot_lock = threading.Lock()  # One snapshot is written at a time (taken inside `lock`)
+        self.generation = 0  # Generation of the active WAL / latest snapshot
+        self.log_file = None  # Open WAL file
+        self.dirty = False  # Records written since the last fsync
+        self.records_since_snapshot = 0
+        self.pending_batch = None  # Records buffered by an open batch()
+        self.user_db = None  # State attached by recover()
+        self.account_bst = None
+        self.transaction_graph = None
+        self.is_running = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind, generation):
+        extension = 'bin' if kind == 'snapshot' else 'log'
+        return os.path.join(self.directory, f"{kind}-{generation:08d}.{extension}")
+
+    def _generations(self, kind):
+        generations = []
+        for name in os.listdir(self.directory):
+            prefix, _, rest = name.partition('-')
+            number = rest.split('.')[0]
+            if prefix == kind and number.isdigit() and not name.endswith('.tmp'):  # Skip unfinished snapshots
+                generations.append(int(number))
+        return sorted(generations)
+
+    def _fsync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _append(self, kind, writer):
+        """Append one record to the WAL (caller holds the lock)"""
+        payload = bytes([kind]) + writer.buffer
+        if self.pending_batch is not None:
+            self.pending_batch.append(payload)
+            return
+        self.log_file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self.log_file.write(payload)
+        self.dirty = True
+        self.records_since_snapshot += 1
+
+    @contextmanager
+    def batch(self):
+        """Hold the lock and group every record logged inside the block into one
+        WAL record, so recovery replays all of them or none (nested blocks join the outer one)"""
+        with self.lock:
+            if self.pending_batch is not None:
+                yield
+                return
+            self.pending_batch = []
+            try:
+                yield
+            finally:
+                records, self.pending_batch = self.pending_batch, None
+                if records:
+                    writer = _Writer()
+                    writer.u32(len(records))
+                    for payload in records:
+                        writer.u32(len(payload))
+                        writer.raw(payload)
+                    self._append(RECORD_BATCH, writer)
+
+    def log_user(self, username, password_hash):
+        writer = _Writer()
+        writer.string(username)
+        writer.string(password_hash)
+        with self.lock:
+            self._append(RECORD_USER, writer)
+
+    def log_account(self, account):
+        writer = _Writer()
+        writer.string(account.account_number)
+        writer.string(account.owner_username)
+        writer.string(account.account_type)
+        writer.string(account.currency)
+        writer.pack(_ACCOUNT_FIXED, account.balance_minor, epoch_seconds(account.creation_date), 1)
+        with self.lock:
+            self._append(RECORD_ACCOUNT, writer)
+
+    def log_account_update(self, account):
+        writer = _Writer()
+        writer.string(account.account_number)
+        writer.string(account.owner_username)
+        writer.string(account.account_type)
+        with self.lock:
+            self._append(RECORD_ACCOUNT_UPDATE, writer)
+
+    def log_transaction(self, transaction):
+        """Log a deposit or withdrawal that has just been applied to its account"""
+        history = transaction.account.transaction_history  # Entry just appended by the apply
+        writer = _Writer()
+        writer.string(transaction.account.account_number)
+        writer.pack(_TRANSACTION_FIXED, transaction.type, transaction.amount_minor,
+                    history.timestamps[-1], history.priorities[-1])
+        writer.string(transaction.description or '')
+        with self.lock:
+            self._append(RECORD_TRANSACTION, writer)
+
+    def log_edge(self, from_account_number, to_account_number, transaction_detail):
+        writer = _Writer()
+        writer.string(from_account_number)
+        writer.string(to_account_number)
+        writer.string(transaction_detail.currency)
+        writer.pack(_EDGE_FIXED, transaction_detail.amount_minor, transaction_detail.type,
+                    transaction_detail.timestamp)
+        with self.lock:
+            self._append(RECORD_EDGE, writer)
+
+    def sync(self):
+        """Flush and fsync the WAL now"""
+        with self.lock:
+            if self.log_file is not None and self.dirty:
+                self.log_file.flush()
+                os.fsync(self.log_file.fileno())
+                self.dirty = False
+
+    def _sync_loop(self):
+        """Background group commit: fsync batched records and take periodic snapshots"""
+        while self.is_running:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+                if self.records_since_snapshot >= self.snapshot_every:
+                    self.snapshot()
+            except Exception:
+                logger.exception("Storage sync error")
+
+    def _apply_record(self, kind, reader):
+        """Apply one WAL record to the attached state"""
+        if kind == RECORD_USER:
+            username = reader.string()
+            self.user_db.insert(username, reader.string())
+        elif kind == RECORD_ACCOUNT:
+            number, owner, account_type, currency = reader.string(), reader.string(), reader.string(), reader.string()
+            balance, created, _ = reader.unpack(_ACCOUNT_FIXED)
+            account = BankAccount(number, owner, account_type, currency=currency)
+            account.balance_minor = balance
+            account.creation_date = datetime.fromtimestamp(created)
+            self.account_bst.insert(account)
+        elif kind == RECORD_ACCOUNT_UPDATE:
+            number, owner, account_type = reader.string(), reader.string(), reader.string()
+            account = self.account_bst.find_account(number)
+            if account is not None:
+                if account.owner_username != owner:
+                    self.account_bst.change_owner(number, owner)
+                account.account_type = account_type
+        elif kind == RECORD_TRANSACTION:
+            number = reader.string()
+            type_code, amount, timestamp, priority = reader.unpack(_TRANSACTION_FIXED)
+            description = reader.string()
+            account = self.account_bst.find_account(number)
+            if account is not None:
+                transaction_type = TransactionType(type_code)
+                account.adjust_balance(amount, transaction_type)
+                account.transaction_history.append_record(
+                    transaction_type, amount, description, timestamp, priority=priority
+                )
+        elif kind == RECORD_EDGE:
+            from_number, to_number, currency = reader.string(), reader.string(), reader.string()
+            amount, type_code, timestamp = reader.unpack(_EDGE_FIXED)
+            self.transaction_graph.add_transactions(
+                [(from_number, to_number, amount, TransactionType(type_code), timestamp, currency)], minor_units=True
+            )
+        elif kind == RECORD_BATCH:
+            for _ in range(reader.u32()):
+                payload = reader.raw(reader.u32())
+                self._apply_record(payload[0], _Reader(payload, 1))
+        else:
+            raise ValueError(f"Unknown WAL record kind {kind}")
+
+    def _replay(self, path, truncate_torn_tail):
+        """Replay a WAL file; stops at the first incomplete or corrupt record"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break  # Torn write from a crash: everything after this is discarded
+            self._apply_record(payload[0], _Reader(payload, 1))
+            offset = start + length
+            self.records_since_snapshot += 1
+        if offset < len(data) and truncate_torn_tail:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _capture_state(self):
+        """Copy everything a snapshot needs (caller holds the lock). History columns are
+        copied as raw bytes; live edges are copied by reference (their records never change)."""
+        users = list(self.user_db.items())
+        accounts = []
+        for account in self.account_bst:
+            history = account.transaction_history
+            accounts.append((
+                account.account_number, account.owner_username, account.account_type, account.currency,
+                account.balance_minor, epoch_seconds(account.creation_date), int(history.time_ordered), len(history),
+                [column.tobytes() for column in (history.amounts, history.timestamps, history.types,
+                                                 history.statuses, history.priorities, history.description_ids)]
+            ))
+        with self.transaction_graph.lock:
+            edges = [
+                edge for outgoing in self.transaction_graph.out_edges.values() for edge in outgoing
+                if not edge.compacted
+            ]
+            summaries = [(key, summary.snapshot()) for key, summary in self.transaction_graph.pair_summaries.items()]
+        # Copied last, so every description id referenced by the histories is included
+        descriptions = list(DESCRIPTIONS.strings)
+        return descriptions, users, accounts, edges, summaries
+
+    def _write_snapshot(self, f, state):
+        descriptions, users, accounts, edges, summaries = state
+        writer = _Writer()
+        writer.raw(SNAPSHOT_MAGIC)
+
+        # Interned description strings referenced by the history columns
+        writer.u32(len(descriptions))
+        for description in descriptions:
+            writer.string(description)
+
+        writer.u32(len(users))
+        for username, password_hash in users:
+            writer.string(username)
+            writer.string(password_hash)
+        f.write(writer.buffer)
+
+        writer = _Writer()
+        writer.u32(len(accounts))
+        for number, owner, account_type, currency, balance, created, time_ordered, length, columns in accounts:
+            writer.string(number)
+            writer.string(owner)
+            writer.string(account_type)
+            writer.string(currency)
+            writer.pack(_ACCOUNT_FIXED, balance, created, time_ordered)
+            writer.u32(length)
+            # History columns are dumped as raw array bytes for fast loading
+            for column in columns:
+                writer.raw(column)
+            if len(writer.buffer) > 1 << 20:
+                f.write(writer.buffer)
+                writer = _Writer()
+
+        # Graph edges in timestamp order so the window aggregates rebuild correctly
+        edges.sort(key=lambda edge: edge.transaction.timestamp)
+        writer.u32(len(edges))
+        for edge in edges:
+            transaction = edge.transaction
+            writer.string(edge.source)
+            writer.string(edge.target)
+            writer.string(transaction.currency)
+            writer.pack(_EDGE_FIXED, transaction.amount_minor, transaction.type, transaction.timestamp)
+
+        # Totals of compacted edges
+        writer.u32(len(summaries))
+        for (from_number, to_number), summary in summaries:
+            writer.string(from_number)
+            writer.string(to_number)
+            writer.pack(_PAIR_SUMMARY_FIXED, summary['count'], summary['total'],
+                        summary['first_seen'], summary['last_seen'])
+        f.write(writer.buffer)
+
+    def _load_snapshot(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"{path} is not a bank snapshot of a supported version")
+        reader = _Reader(data, len(SNAPSHOT_MAGIC))
+
+        # Map the snapshot's description ids onto the live string pool
+        description_ids = [DESCRIPTIONS.intern(reader.string()) for _ in range(reader.u32())]
+        identity = all(new_id == old_id for old_id, new_id in enumerate(description_ids))
+
+        self.user_db.insert_many((reader.string(), reader.string()) for _ in range(reader.u32()))
+
+        for _ in range(reader.u32()):
+            number, owner, account_type, currency = reader.string(), reader.string(), reader.string(), reader.string()
+            balance, created, time_ordered = reader.unpack(_ACCOUNT_FIXED)
+            account = BankAccount(number, owner, account_type, currency=currency)
+            account.balance_minor = balance
+            account.creation_date = datetime.fromtimestamp(created)
+            history = account.transaction_history
+            length = reader.u32()
+            for column in (history.amounts, history.timestamps, history.types,
+                           history.statuses, history.priorities, history.description_ids):
+                column.frombytes(reader.raw(length * column.itemsize))
+            if not identity:
+                history.description_ids = array('i', (description_ids[i] for i in history.description_ids))
+            history.time_ordered = bool(time_ordered)
+            self.account_bst.insert(account)
+
+        def edges():
+            for _ in range(reader.u32()):
+                from_number, to_number, currency = reader.string(), reader.string(), reader.string()
+                amount, type_code, timestamp = reader.unpack(_EDGE_FIXED)
+                yield from_number, to_number, amount, TransactionType(type_code), timestamp, currency
+        self.transaction_graph.add_transactions(edges(), minor_units=True)
+
+        for _ in range(reader.u32()):
+            from_number, to_number = reader.string(), reader.string()
+            self.transaction_graph.merge_pair_summary(from_number, to_number, *reader.unpack(_PAIR_SUMMARY_FIXED))
+
+    def snapshot(self):
+        """Write a snapshot of the attached state and rotate the WAL"""
+        with self.lock:
+            if self.log_file is None:
+                return  # Closed (the background thread can race close())
+            # Taken inside `lock` (bulk loads snapshot while holding it) and kept after
+            # `lock` is released, until this snapshot is durable
+            self.snapshot_lock.acquire()
+            try:
+                self.sync()
+                generation = self.generation + 1
+                # New mutations go to the next WAL generation from here on; until the
+                # snapshot is durable, recovery replays the previous snapshot and both logs
+                self.log_file.close()
+                self.log_file = open(self._path('wal', generation), 'ab')
+                self.generation = generation
+                self.records_since_snapshot = 0
+                state = self._capture_state()
+            except BaseException:
+                self.snapshot_lock.release()
+                raise
+
+        try:
+            temporary_path = self._path('snapshot', generation) + '.tmp'
+            with open(temporary_path, 'wb') as f:
+                self._write_snapshot(f, state)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self._path('snapshot', generation))
+            self._fsync_directory()
+
+            # The new snapshot supersedes every older snapshot and log
+            for kind in ('snapshot', 'wal'):
+                for old in self._generations(kind):
+                    if old < generation:
+                        os.remove(self._path(kind, old))
+        finally:
+            self.snapshot_lock.release()
+
+    def recover(self, user_db=None, account_bst=None, transaction_graph=None):
+        """Rebuild state from the latest snapshot plus the WAL tail, attach it and
+        start logging. Returns (user_db, account_bst, transaction_graph)."""
+        with self.lock:
+            self.user_db = user_db if user_db is not None else OpenAddressingHashTable()
+            self.account_bst = account_bst if account_bst is not None else BankAccountBST()
+            self.transaction_graph = transaction_graph if transaction_graph is not None else TransactionGraph()
+            self.transaction_graph.wal = None  # Replayed edges must not be logged again
+
+            snapshots = self._generations('snapshot')
+            self.generation = snapshots[-1] if snapshots else 0
+            if snapshots:
+                self._load_snapshot(self._path('snapshot', self.generation))
+
+            self.records_since_snapshot = 0
+            logs = [g for g in self._generations('wal') if g >= self.generation]
+            for i, generation in enumerate(logs):
+                self._replay(self._path('wal', generation), truncate_torn_tail=(i == len(logs) - 1))
+
+            active = logs[-1] if logs else self.generation
+            self.log_file = open(self._path('wal', active), 'ab')
+            self.generation = max(self.generation, active)
+            self.transaction_graph.wal = self
+
+        self.is_running = True
+        self.sync_thread = threading.Thread(target=self._sync_loop)
+        self.sync_thread.daemon = True
+        self.sync_thread.start()
+        return self.user_db, self.account_bst, self.transaction_graph
+
+    def close(self):
+        """Stop the background thread and flush the WAL to disk"""
+        self.is_running = False
+        with self.lock:
+            if self.log_file is not None:
+                self.sync()
+                self.log_file.close()
+                self.log_file = None
@@ -0,0 +1,127 @@
+# Import necessary modules
+from dataclasses import InitVar, dataclass, field, fields  # Compact slotted record definition
+from datetime import datetime  # Converting epoch timestamps for display
+from enum import IntEnum  # Small integer codes for transaction type and status
+from typing import Any  # Allows using generic types
+import time  # Integer epoch timestamps
+
+from data_structures.money import DEFAULT_CURRENCY, from_minor, to_minor
+
+
+# Kind of money movement a transaction represents
+class TransactionType(IntEnum):
+    DEPOSIT = 0
+    WITHDRAW = 1
+    TRANSFER = 2
+
+    @classmethod
+    def parse(cls, value):
+        """Convert a name such as 'deposit' (or an existing code) to a TransactionType"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(value)
+
+
+# Lifecycle state of a transaction
+class TransactionStatus(IntEnum):
+    PENDING = 0
+    COMPLETED = 1
+    FAILED = 2
+    CANCELLED = 3
+
+    @classmethod
+    def parse(cls, value):
+        """Convert a name such as 'completed' (or an existing code) to a TransactionStatus"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(value)
+
+
+def epoch_seconds(timestamp=None):
+    """Convert a datetime, number or None (meaning now) to integer epoch seconds"""
+    if timestamp is None:
+        return int(time.time())
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    return int(timestamp)
+
+
+# Compact transaction record used for queued transactions, account history and graph edges.
+# Type and status are stored as small enum codes and the timestamp as integer epoch
+# seconds, so each record costs one slotted object instead of a dict plus a datetime.
+# Dict-style reads (transaction['type'], transaction.get('priority', 3)) keep working
+# and return the old representations: lowercase names and datetime timestamps.
+# The amount is stored once, as amount_minor (integer minor units of `currency`);
+# `amount` is accepted by the constructor and read back as a derived major-unit float.
+@dataclass(slots=True)
+class Transaction:
+    type: TransactionType  # Deposit, withdrawal or transfer
+    amount: InitVar[float] = None  # Amount in major units (converted to amount_minor with banker's rounding)
+    description: str = ''  # Free-text description
+    account: Any = None  # BankAccount the transaction applies to (None for history/graph records)
+    account_type: str = 'Regular'  # Account type at the time the transaction was created
+    timestamp: int = field(default_factory=epoch_seconds)  # Integer epoch seconds
+    status: TransactionStatus = TransactionStatus.PENDING
+    priority: int = 3  # Processing priority (lower value = higher priority)
+    amount_minor: int = None  # Exact amount in minor units (derived from amount when not given)
+    currency: str = DEFAULT_CURRENCY  # ISO code of the amount's currency
+
+    def __post_init__(self, amount):
+        if self.amount_minor is None:
+            self.amount_minor = to_minor(amount, self.currency)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Transaction from a legacy transaction dictionary"""
+        account = data.get('account')
+        return cls(
+            type=TransactionType.parse(data['type']),
+            amount=data.get('amount'),
+            amount_minor=data.get('amount_minor'),
+            currency=data.get('currency', account.currency if account else DEFAULT_CURRENCY),
+            description=data.get('description', ''),
+            account=account,
+            account_type=data.get('account_type', account.account_type if account else 'Regular'),
+            timestamp=epoch_seconds(data.get('timestamp')),
+            status=TransactionStatus.parse(data.get('status', TransactionStatus.PENDING)),
+            priority=data.get('priority', 3)
+        )
+
+    @classmethod
+    def coerce(cls, transaction):
+        """Return the transaction itself, converting legacy dictionaries"""
+        return transaction if isinstance(transaction, cls) else cls.from_dict(transaction)
+
+    # Compatibility accessors for code written against the old dictionary records
+    def __getitem__(self, key):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if key in ('type', 'status'):
+            return value.name.lower()
+        if key == 'timestamp':
+            return datetime.fromtimestamp(value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in _FIELD_NAMES
+
+    def keys(self):
+        return list(_FIELD_NAMES)
+
+
+# Major-unit float of amount_minor, for display and legacy float APIs. Set after the class
+# body so the dataclass still sees `amount` as a constructor-only argument.
+Transaction.amount = property(lambda self: from_minor(self.amount_minor, self.currency))
+
+_FIELD_NAMES = ('type', 'amount') + tuple(f.name for f in fields(Transaction) if f.name != 'type')
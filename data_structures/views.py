@@ -0,0 +1,100 @@
+# Import necessary modules
+from collections import OrderedDict  # LRU cache of formatted pages and rows
+from datetime import datetime  # Formatting epoch timestamps
+import threading  # Views are shared by every session
+
+from data_structures.money import format_money
+
+PRIORITY_LABELS = {1: "🔴 High", 2: "🟡 Medium", 3: "🟢 Low"}
+
+
+def priority_label(priority):
+    return PRIORITY_LABELS.get(priority, PRIORITY_LABELS[3])
+
+
+# Small thread-safe LRU mapping
+class _LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+
+# Paged, display-ready view of account histories.
+# Pages are addressed by history cursors; because histories are append-only a
+# cursor always names the same records, so formatted pages are cached and a
+# rerun that shows an unchanged page does no formatting at all.
+class HistoryView:
+    def __init__(self, page_size=50, cache_size=512):
+        self.page_size = page_size
+        self.pages = _LRUCache(cache_size)  # {(account, created, cursor): (rows, next_cursor)}
+
+    def page(self, account, cursor=None):
+        """Formatted rows of one newest-first page plus the cursor of the next (older) page"""
+        history = account.transaction_history
+        if cursor is None:
+            cursor = history.latest_cursor()
+        key = (account.account_number, account.creation_date, cursor, self.page_size)
+        page = self.pages.get(key)
+        if page is None:
+            records, next_cursor = history.cursor_page(cursor, self.page_size)
+            page = ([self.format_row(transaction) for transaction in records], next_cursor)
+            self.pages.put(key, page)
+        return page
+
+    @staticmethod
+    def format_row(transaction):
+        return {
+            'Type': transaction['type'].title(),
+            'Amount': format_money(transaction.amount_minor, transaction.currency),
+            'Description': transaction.description,
+            'Date': datetime.fromtimestamp(transaction.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            'Priority': priority_label(transaction.priority),
+        }
+
+
+# Paged, display-ready view of a user's pending transactions.
+# The queue changes constantly, so pages are fetched fresh on every call, but
+# each formatted row is cached by transaction id (and priority, which can change).
+class PendingView:
+    def __init__(self, page_size=50, cache_size=10000):
+        self.page_size = page_size
+        self.rows = _LRUCache(cache_size)  # {(id, priority): row}
+
+    def page(self, engine, username, cursor=None):
+        """Returns (prioritized transactions, formatted rows, next cursor or None)"""
+        items, next_cursor = engine.get_pending_page(username, cursor, self.page_size)
+        rows = []
+        for prioritized_transaction in items:
+            key = (prioritized_transaction.id, prioritized_transaction.priority)
+            row = self.rows.get(key)
+            if row is None:
+                row = self.format_row(prioritized_transaction)
+                self.rows.put(key, row)
+            rows.append(row)
+        return items, rows, next_cursor
+
+    @staticmethod
+    def format_row(prioritized_transaction):
+        transaction = prioritized_transaction.transaction
+        return {
+            'Type': transaction['type'].title(),
+            'Amount': format_money(transaction.amount_minor, transaction.currency),
+            'Account': transaction.account.account_number,
+            'Description': transaction.description,
+            'Priority': priority_label(prioritized_transaction.priority),
+        }
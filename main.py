@@ -1,50 +1,52 @@
 import streamlit as st
-import hashlib
+import os
 import time
 
-from data_structures.hashtable import HashTable
-from data_structures.bst import BankAccount, BankAccountBST
-from data_structures.priority_queue import TransactionProcessor
+from data_structures.engine import BankEngine
 from data_structures.graph import TransactionGraph
-from datetime import datetime
+from data_structures.metrics import METRICS
+from data_structures.views import HistoryView, PendingView
+from data_structures.money import format_money
+from data_structures.passwords import PasswordHasher
 
-# Initialize session state
-if 'user_db' not in st.session_state:
-    st.session_state.user_db = HashTable()
+@st.cache_resource
+def get_engine():
+    """Create the process-wide bank engine shared by every session"""
+    METRICS.enabled = os.environ.get("BANK_METRICS", "1") != "0"  # Set BANK_METRICS=0 to disable instrumentation
+    password_hasher = PasswordHasher(algorithm=os.environ.get("BANK_PASSWORD_ALGORITHM", "scrypt"))
+    # Graph retention: transfer edges older than BANK_GRAPH_RETENTION_DAYS, or beyond the newest
+    # BANK_GRAPH_MAX_EDGES per account, are compacted into pair summaries (0 disables either policy)
+    retention_days = float(os.environ.get("BANK_GRAPH_RETENTION_DAYS", "30"))
+    max_edges = int(os.environ.get("BANK_GRAPH_MAX_EDGES", "10000"))
+    transaction_graph = TransactionGraph(max_edge_age=retention_days * 86400 if retention_days > 0 else None,
+                                         max_edges_per_account=max_edges if max_edges > 0 else None)
+    return BankEngine(os.environ.get("BANK_DATA_DIR", "bank_data"), password_hasher=password_hasher,
+                      transaction_graph=transaction_graph)
 
-if 'account_bst' not in st.session_state:
-    st.session_state.account_bst = BankAccountBST()
+@st.cache_resource
+def get_views():
+    """Paged history/pending views whose formatted-row caches are shared by every session"""
+    return HistoryView(), PendingView()
 
+engine = get_engine()
+history_view, pending_view = get_views()
+
+# Initialize session state (only the login state is per session)
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 
 if 'current_user' not in st.session_state:
     st.session_state.current_user = None
 
-if 'transaction_processor' not in st.session_state:
-    st.session_state.transaction_processor = TransactionProcessor()
-    st.session_state.transaction_processor.is_processing = False
-
-if 'transaction_graph' not in st.session_state:
-    st.session_state.transaction_graph = TransactionGraph()
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def login_user(username, password):
-    stored_password = st.session_state.user_db.get(username)
-    if stored_password and stored_password == hash_password(password):
+    if engine.authenticate(username, password):
         st.session_state.logged_in = True
         st.session_state.current_user = username
         return True
     return False
 
 def register_user(username, password):
-    if st.session_state.user_db.exists(username):
-        return False
-    hashed_password = hash_password(password)
-    st.session_state.user_db.insert(username, hashed_password)
-    return True
+    return engine.create_user(username, password)
 
 def create_login_page():
     st.title("Banking Management Login")
@@ -89,49 +91,26 @@ def handle_transfer(from_account, user_accounts):
         )
         transfer_amount = st.number_input("Amount", min_value=0.0)
         transfer_desc = st.text_input("Description")
+        st.caption("Pending transactions on this account are processed before the transfer.")
         
         if st.form_submit_button("Transfer"):
             if transfer_amount <= from_account.balance:
-                to_account = st.session_state.account_bst.find_account(to_account_number)
+                to_account = engine.find_account(to_account_number)
                 if to_account:
-                    # Add to transaction graph
-                    st.session_state.transaction_graph.add_transaction(
-                        from_account.account_number,
-                        to_account_number,
-                        transfer_amount,
-                        "transfer"
-                    )
-                    
-                    # Process withdrawal from source account
-                    withdraw_transaction = {
-                        'type': 'withdraw',
-                        'amount': transfer_amount,
-                        'description': f"Transfer to {to_account_number}: {transfer_desc}",
-                        'account': from_account,
-                        'account_type': from_account.account_type
-                    }
-                    
-                    # Process deposit to destination account
-                    deposit_transaction = {
-                        'type': 'deposit',
-                        'amount': transfer_amount,
-                        'description': f"Transfer from {from_account.account_number}: {transfer_desc}",
-                        'account': to_account,
-                        'account_type': to_account.account_type
-                    }
-                    
-                    st.session_state.transaction_processor.add_transaction(withdraw_transaction)
-                    st.session_state.transaction_processor.add_transaction(deposit_transaction)
+                    # Applies the withdrawal, the deposit and the graph edge atomically
+                    engine.transfer(from_account, to_account, transfer_amount, transfer_desc)
                     
                     st.success(f"Transfer of ${transfer_amount:.2f} initiated")
                     
                     # Check for suspicious patterns
-                    if st.session_state.transaction_graph.detect_circular_transactions(from_account.account_number):
+                    if engine.detect_cycle_for_edge(
+                        from_account.account_number, to_account_number
+                    ):
                         st.warning("Circular transaction pattern detected!")
             else:
                 st.error("Insufficient funds!")
 
-def handle_banking_operations(account, transaction_processor):
+def handle_banking_operations(account):
     col1, col2 = st.columns(2)
     
     with col1:
@@ -140,16 +119,7 @@ def handle_banking_operations(account, transaction_processor):
             deposit_desc = st.text_input("Description", key=f"deposit_desc_{account.account_number}")
             if st.form_submit_button("Deposit"):
                 if deposit_amount > 0:
-                    transaction = {
-                        'type': 'deposit',
-                        'amount': deposit_amount,
-                        'description': deposit_desc,
-                        'account': account,
-                        'account_type': account.account_type,
-                        'timestamp': datetime.now()
-                    }
-
-                    transaction_processor.add_transaction(transaction)
+                    engine.deposit(account, deposit_amount, deposit_desc)
                     st.success(f"Deposit of ${deposit_amount:.2f} queued for processing")
     
     with col2:
@@ -158,36 +128,42 @@ def handle_banking_operations(account, transaction_processor):
             withdraw_desc = st.text_input("Description", key=f"withdraw_desc_{account.account_number}")
             if st.form_submit_button("Withdraw"):
                 if withdraw_amount <= account.balance:
-                    transaction = {
-                        'type': 'withdraw',
-                        'amount': withdraw_amount,
-                        'description': withdraw_desc,
-                        'account': account,
-                        'account_type': account.account_type,
-                        'timestamp': datetime.now()
-                    }
-
-                    transaction_processor.add_transaction(transaction)
+                    engine.withdraw(account, withdraw_amount, withdraw_desc)
                     st.success(f"Withdrawal of ${withdraw_amount:.2f} queued for processing")
                 else:
                     st.error("Insufficient funds!")
 
+def paging_controls(key, next_cursor, back_label="◀ Newer", next_label="Older ▶"):
+    """Newer/Older buttons over a stack of page cursors kept in session state;
+    returns the cursor of the page to show"""
+    cursors = st.session_state.setdefault(key, [None])
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button(back_label, key=f"{key}_back", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button(next_label, key=f"{key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+    with col3:
+        st.caption(f"Page {len(cursors)}")
+
 def create_dashboard():
     st.title(f"Welcome {st.session_state.current_user}!")
     
     with st.sidebar:
         st.title("Navigation")
-        page = st.radio("Go to", ["Accounts", "Transaction History", "Pending Transactions"])
+        page = st.radio("Go to", ["Accounts", "Transaction History", "Pending Transactions", "Metrics"])
         
         if st.button("Logout"):
             st.session_state.logged_in = False
             st.session_state.current_user = None
-            st.session_state.transaction_processor = TransactionProcessor()
     
     if page == "Accounts":
         st.header("Your Bank Accounts")
 
-        user_accounts = st.session_state.account_bst.get_user_accounts(
+        user_accounts = engine.get_user_accounts(
             st.session_state.current_user
         )
         
@@ -200,25 +176,13 @@ def create_dashboard():
                 submit = st.form_submit_button("Create Account")
                 
                 if submit:
-                    if not st.session_state.account_bst.find_account(account_number):
-                        new_account = BankAccount(
-                            account_number=account_number,
-                            owner_username=st.session_state.current_user,
-                            account_type=account_type,
-                            balance=0  # Initialize with 0 balance
-                        )
-                        st.session_state.account_bst.insert(new_account)
-                        if initial_deposit > 0:
-                            transaction = {
-                                'type': 'deposit',
-                                'amount': initial_deposit,
-                                'description': "Initial deposit",
-                                'account': new_account,
-                                'account_type': account_type,
-                                'timestamp': datetime.now()
-                            }
-                            st.session_state.transaction_processor.is_processing = False
-                            st.session_state.transaction_processor.add_transaction(transaction)
+                    new_account = engine.open_account(
+                        account_number,
+                        st.session_state.current_user,
+                        account_type,
+                        initial_deposit
+                    )
+                    if new_account:
                         st.success("Account created successfully!")
                     else:
                         st.error("Account number already exists!")
@@ -227,7 +191,7 @@ def create_dashboard():
             for from_account in user_accounts:
                 with st.expander(f"Account: {from_account.account_number}"):
                     # Display account details
-                    st.write(f"Balance: ${from_account.balance:.2f}")
+                    st.write(f"Balance: {format_money(from_account.balance_minor, from_account.currency)}")
                     st.write(f"Type: {from_account.account_type}")
                     st.write(f"Created: {from_account.creation_date.strftime('%Y-%m-%d')}")
 
@@ -245,11 +209,9 @@ def create_dashboard():
                     )
 
                     if st.button(f"Transfer", key=f"transfer_btn_{from_account.account_number}"):
-                        to_account = st.session_state.account_bst.find_account(to_account_number)
+                        to_account = engine.find_account(to_account_number)
                         if to_account:
-                            success = st.session_state.transaction_graph.transfer_between_accounts(
-                                from_account, to_account, transfer_amount, st.session_state.transaction_processor
-                            )
+                            success = engine.transfer(from_account, to_account, transfer_amount)
                             if success:
                                 st.success(f"Successfully transferred ${transfer_amount:.2f} to {to_account_number}.")
                             else:
@@ -260,7 +222,7 @@ def create_dashboard():
             st.info("No accounts found. Create one to get started!")
             
         # Display user's accounts
-        user_accounts = st.session_state.account_bst.get_user_accounts(
+        user_accounts = engine.get_user_accounts(
             st.session_state.current_user
         )
         
@@ -271,39 +233,35 @@ def create_dashboard():
                     col1, col2, col3 = st.columns(3)
                     with col1:
                         st.subheader(f"Account: {account.account_number}")
-                        st.write(f"Balance: ${account.balance:.2f}")
+                        st.write(f"Balance: {format_money(account.balance_minor, account.currency)}")
                     with col2:
                         st.write(f"Type: {account.account_type}")
                         st.write(f"Created: {account.creation_date.strftime('%Y-%m-%d')}")
                     with col3:
                         if account.account_type == "Regular":
                             if st.button(f"Upgrade to VIP", key=f"upgrade_{account.account_number}"):
-                                account.account_type = "VIP"
+                                engine.upgrade_account(account)
                                 st.success("Account upgraded to VIP!")
                     
-                    handle_banking_operations(account, st.session_state.transaction_processor)
+                    handle_banking_operations(account)
         else:
             st.info("You don't have any accounts yet. Create one to get started!")
     
     elif page == "Transaction History":
         st.header("Transaction History")
-        user_accounts = st.session_state.account_bst.get_user_accounts(
+        user_accounts = engine.get_user_accounts(
             st.session_state.current_user
         )
         
         if user_accounts:
             for account in user_accounts:
                 with st.expander(f"Account {account.account_number} ({account.account_type})"):
-                    if account.transaction_history:
-                        for transaction in reversed(account.transaction_history):
-                            priority_label = "🔴 High" if transaction.get('priority', 3) == 1 else "🟡 Medium" if transaction.get('priority', 3) == 2 else "🟢 Low"
-                            st.write(
-                                f"**{transaction['type'].title()}** - "
-                                f"${transaction['amount']:.2f} - "
-                                f"{transaction['description']} - "
-                                f"{transaction['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} - "
-                                f"Priority: {priority_label}"
-                            )
+                    if len(account.transaction_history):
+                        key = f"history_cursors_{account.account_number}"
+                        cursors = st.session_state.setdefault(key, [None])
+                        rows, next_cursor = history_view.page(account, cursors[-1])
+                        st.dataframe(rows, hide_index=True, use_container_width=True)
+                        paging_controls(key, next_cursor)
                     else:
                         st.info("No transactions yet.")
         else:
@@ -313,25 +271,40 @@ def create_dashboard():
         st.header("Pending Transactions")
         st.write("Transactions are processed manually by pressing the 'Process' button below.")
 
-        #Display each pending transaction
-        for pt in st.session_state.transaction_processor.pending_transactions:
-            transaction = pt.transaction
-            priority_label = "🔴 High" if pt.priority == 1 else "🟡 Medium" if pt.priority == 2 else "🟢 Low"
-            
-            col1, col2 = st.columns([3,1])
-            with col1:
-                st.write(
-                    f"**{transaction['type'].title()}** - "
-                    f"${transaction['amount']:.2f} - "
-                    f"Account: {transaction['account'].account_number} - "
-                    f"Description: {transaction['description']} - "
-                    f"Priority: {priority_label}"
-                )
-            with col2:
-                if st.button("Process", key=f"process_{pt.id}"):
-                    st.session_state.transaction_processor.process_pending_transaction(pt.id)
-                    st.success(f"Transaction for ${transaction['amount']:.2f} processed successfully!")
-                    st.rerun()  # Refresh the page to update the list
+        # Display one page of pending transactions
+        key = "pending_cursors"
+        cursors = st.session_state.setdefault(key, [None])
+        items, rows, next_cursor = pending_view.page(engine, st.session_state.current_user, cursors[-1])
+        if not items and len(cursors) > 1:
+            st.session_state[key] = [None]  # The page emptied out; start again from the front
+            st.rerun()
+        if items:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+            paging_controls(key, next_cursor, "◀ Previous", "Next ▶")
+
+            labels = [f"{row['Type']} {row['Amount']} - {row['Account']} - {row['Description']}" for row in rows]
+            selected = st.selectbox("Transaction", range(len(items)), format_func=labels.__getitem__)
+            if st.button("Process"):
+                pt = items[selected]
+                if engine.process_pending_transaction(pt.id):
+                    st.success(f"Transaction for {format_money(pt.transaction.amount_minor, pt.transaction.currency)} processed successfully!")
+                else:
+                    st.error("The transaction could not be processed.")
+                st.rerun()  # Refresh the page to update the list
+        else:
+            st.info("No pending transactions.")
+
+    elif page == "Metrics":
+        st.header("Metrics")
+        if not METRICS.enabled:
+            st.info("Instrumentation is disabled (BANK_METRICS=0).")
+        else:
+            st.dataframe(METRICS.summary(), use_container_width=True)
+            prometheus_text = METRICS.render_prometheus()
+            st.download_button("Download Prometheus metrics", prometheus_text,
+                               file_name="metrics.prom", mime="text/plain")
+            with st.expander("Prometheus text format"):
+                st.code(prometheus_text)
 
 def main():
     if not st.session_state.logged_in:
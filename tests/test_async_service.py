@@ -0,0 +1,94 @@
+# Asyncio front end of the transaction processors
+import asyncio
+import threading
+
+from data_structures.async_service import AsyncTransactionService
+from data_structures.bst import BankAccount
+from data_structures.graph import TransactionGraph
+from data_structures.priority_queue import TransactionProcessor
+from data_structures.sharded_processor import ShardedTransactionProcessor
+from data_structures.transaction import Transaction, TransactionType
+
+
+def test_cancelled_transfers_apply_both_legs_or_neither():
+    for processor in (TransactionProcessor(), ShardedTransactionProcessor(4)):
+        graph = TransactionGraph()
+        service = AsyncTransactionService(processor, graph)
+        a, b = BankAccount("A", "alice", balance=50), BankAccount("B", "bob")
+
+        async def run():
+            await service.start()
+            for attempt in range(200):
+                try:
+                    # Timeouts from 0 up to a few ms cancel transfers at every stage
+                    await asyncio.wait_for(service.transfer(a, b, 0.1), timeout=(attempt % 5) / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            await asyncio.get_running_loop().shutdown_default_executor()  # Let started transfers finish
+            await service.stop()
+
+        asyncio.run(run())
+        assert a.balance_minor + b.balance_minor == 5000
+        assert b.balance_minor == 10 * len(graph.out_edges.get("A", ()))  # One edge per applied transfer
+        assert len(a.transaction_history) == len(b.transaction_history)
+
+
+def test_submit_does_not_block_the_event_loop_on_the_processor_lock():
+    processor = TransactionProcessor()
+    service = AsyncTransactionService(processor)
+    account = BankAccount("A", "alice")
+    locked, release = threading.Event(), threading.Event()
+    released_by_loop = []
+
+    def hold_lock():
+        with processor.lock:  # Stands in for a worker applying a long batch
+            locked.set()
+            released_by_loop.append(release.wait(2))  # False if the loop was stuck behind the lock
+
+    async def run():
+        await service.start()
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait(5)
+        submitted = asyncio.ensure_future(service.submit(
+            Transaction(type=TransactionType.DEPOSIT, amount=5, account=account)
+        ))
+        for _ in range(10):  # The loop keeps running while the submit waits for the lock
+            await asyncio.sleep(0.01)
+        release.set()
+        assert await submitted
+        holder.join()
+        await service.stop()
+
+    asyncio.run(run())
+    assert released_by_loop == [True]
+    assert account.balance_minor == 500
+
+
+def test_submit_resolves_each_future_and_bounds_in_flight_transactions():
+    processor = TransactionProcessor()
+    service = AsyncTransactionService(processor, max_pending=3)
+    account = BankAccount("A", "alice")
+    peak = []
+
+    async def watch():
+        while True:
+            peak.append(service.in_flight)
+            await asyncio.sleep(0)
+
+    async def run():
+        await service.start(max_batch_size=2, max_linger=0.001)
+        watcher = asyncio.ensure_future(watch())
+        deposits = [Transaction(type=TransactionType.DEPOSIT, amount=1, account=account) for _ in range(20)]
+        results = await service.submit_many(deposits)
+        overdraft = await service.submit(Transaction(type=TransactionType.WITHDRAW, amount=50, account=account))
+        watcher.cancel()
+        await service.stop()
+        return results, overdraft
+
+    results, overdraft = asyncio.run(run())
+    assert results == [True] * 20
+    assert overdraft is False
+    assert account.balance_minor == 2000
+    assert max(peak) == 3
+    assert service.in_flight == 0
@@ -0,0 +1,75 @@
+# AVL account index
+import math
+import random
+
+from data_structures.bst import BankAccount, BankAccountBST
+
+
+def assert_avl(node):
+    """Check heights and the AVL balance invariant below a node; return the subtree height"""
+    if node is None:
+        return 0
+    left, right = assert_avl(node.left), assert_avl(node.right)
+    assert abs(left - right) <= 1
+    assert node.height == 1 + max(left, right)
+    return node.height
+
+
+def account_numbers(accounts):
+    return [account.account_number for account in accounts]
+
+
+def test_sequential_inserts_stay_balanced():
+    bst = BankAccountBST()
+    for i in range(1000):
+        bst.insert(BankAccount(f"ACC{i:06d}", "alice"))
+    height = assert_avl(bst.root)
+    assert height <= 1.45 * math.log2(len(bst) + 2)
+    assert account_numbers(bst) == [f"ACC{i:06d}" for i in range(1000)]
+
+
+def test_deletes_keep_the_tree_balanced():
+    rng = random.Random(3)
+    bst = BankAccountBST()
+    numbers = [f"ACC{i:04d}" for i in range(500)]
+    for number in rng.sample(numbers, len(numbers)):
+        bst.insert(BankAccount(number, f"user{int(number[3:]) % 7}"))
+    removed = set(rng.sample(numbers, 300))
+    for number in removed:
+        assert bst.delete(number).account_number == number
+    assert bst.delete("ACC9999") is None
+    assert_avl(bst.root)
+    remaining = [number for number in numbers if number not in removed]
+    assert account_numbers(bst) == remaining
+    assert account_numbers(bst.get_user_accounts("user0")) == [
+        number for number in remaining if int(number[3:]) % 7 == 0]
+
+
+def test_bulk_load_matches_inserted_tree():
+    accounts = [BankAccount(f"ACC{i:04d}", "bob") for i in range(777)]
+    bst = BankAccountBST()
+    bst.bulk_load(accounts)
+    assert_avl(bst.root)
+    assert account_numbers(bst) == account_numbers(accounts)
+    assert bst.find_account("ACC0400") is accounts[400]
+
+
+def test_range_scan_bounds_are_inclusive():
+    bst = BankAccountBST()
+    for i in range(0, 100, 2):
+        bst.insert(BankAccount(f"ACC{i:03d}", "carol"))
+    assert account_numbers(bst.range_scan("ACC010", "ACC020")) == [
+        "ACC010", "ACC012", "ACC014", "ACC016", "ACC018", "ACC020"]
+    assert account_numbers(bst.range_scan("ACC011", "ACC015")) == ["ACC012", "ACC014"]
+    assert account_numbers(bst.range_scan(high="ACC004")) == ["ACC000", "ACC002", "ACC004"]
+    assert account_numbers(bst.range_scan(low="ACC095")) == ["ACC096", "ACC098"]
+    assert list(bst.range_scan("ACC050", "ACC040")) == []
+
+
+def test_prefix_scan_stops_at_the_end_of_the_prefix():
+    bst = BankAccountBST()
+    for number in ["AB1", "AB2", "ABC9", "AC0", "A", "B1", "AA9"]:
+        bst.insert(BankAccount(number, "dave"))
+    assert account_numbers(bst.prefix_scan("AB")) == ["AB1", "AB2", "ABC9"]
+    assert account_numbers(bst.prefix_scan("A")) == ["A", "AA9", "AB1", "AB2", "ABC9", "AC0"]
+    assert list(bst.prefix_scan("Z")) == []
@@ -0,0 +1,105 @@
+# Bulk import of accounts and transfers
+import threading
+import time
+
+from data_structures.bst import BankAccountBST
+from data_structures.bulk import BulkLoader
+from data_structures.engine import BankEngine
+from data_structures.graph import TransactionGraph
+from data_structures.hashtable import OpenAddressingHashTable
+
+
+def loader():
+    return BulkLoader(OpenAddressingHashTable(), BankAccountBST(), TransactionGraph())
+
+
+def write(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_out_of_order_transfers_keep_windows_and_cycles_correct(tmp_path):
+    bulk = loader()
+    now = int(time.time())
+    path = write(tmp_path / "transfers.csv", [
+        "from_account,to_account,amount,type,timestamp",
+        f"A,B,10,transfer,{now - 60}",
+        f"B,A,20,transfer,{now - 30}",
+        f"A,C,999,transfer,{now - 10 * 24 * 3600}",  # Ten days old, listed last
+    ])
+    assert bulk.load_transfers(path) == 3
+    graph = bulk.transaction_graph
+    for window in (3600, 24 * 3600):
+        stats = graph.get_window_stats("A", window)
+        assert (stats['count'], stats['sum_out'], stats['sum_in'], stats['max']) == (2, 1000, 2000, 2000)
+    assert graph.get_window_stats("A", 7 * 24 * 3600)['count'] == 2
+    assert graph.detect_circular_transactions("A") == ['A', 'B']
+    timestamps = [edge.transaction.timestamp for edge in graph.out_edges["A"]]
+    assert timestamps == sorted(timestamps)
+
+
+def test_late_edges_added_live_are_placed_in_time_order():
+    graph = TransactionGraph()
+    now = int(time.time())
+    graph.add_transactions([("A", "B", 5, "transfer", now - 10), ("A", "B", 7, "transfer", now - 20)])
+    assert [edge.transaction.timestamp for edge in graph.out_edges["A"]] == [now - 20, now - 10]
+    assert [edge.transaction.timestamp for edge in graph.in_edges["B"]] == [now - 20, now - 10]
+    assert graph.get_window_stats("B", 3600) == {'count': 2, 'sum_in': 1200, 'sum_out': 0, 'max': 700}
+
+
+def test_load_accounts_rejects_existing_account_numbers(tmp_path):
+    bulk = loader()
+    first = write(tmp_path / "accounts.csv", ["account_number,owner_username,balance", "A1,alice,500"])
+    assert bulk.load_accounts(first) == 1
+    account = bulk.account_bst.find_account("A1")
+    account.record_transaction("deposit", 50000, "Opening balance")
+
+    second = write(tmp_path / "more.csv", ["account_number,owner_username,balance", "A1,mallory,0", "A2,bob,5",
+                                          "A2,mallory,0"])
+    assert bulk.load_accounts(second) == 1
+    assert bulk.errors == [(1, "Account A1 already exists"), (3, "Account A2 already exists")]
+    assert bulk.account_bst.find_account("A1") is account
+    assert (account.owner_username, account.balance_minor, len(account.transaction_history)) == ("alice", 50000, 1)
+    assert bulk.account_bst.find_account("A2").owner_username == "bob"
+
+
+def test_load_users_never_replaces_existing_password_hashes(tmp_path):
+    bulk = loader()
+    bulk.user_db.insert("alice", "alice-hash")
+    path = write(tmp_path / "users.csv", ["username,password_hash", "alice,mallory-hash", "bob,bob-hash",
+                                          "bob,mallory-hash", "carol,carol-hash"])
+    assert bulk.load_users(path) == 2
+    assert bulk.errors == [(1, "User alice already exists"), (3, "User bob already exists")]
+    assert [bulk.user_db.get(name) for name in ("alice", "bob", "carol")] == ["alice-hash", "bob-hash", "carol-hash"]
+
+
+def test_rows_for_unknown_accounts_are_listed_in_errors(tmp_path):
+    engine = BankEngine()
+    engine.open_account("A1", "alice")
+    bulk = BulkLoader.from_engine(engine)
+    path = write(tmp_path / "transactions.csv", ["account_number,type,amount", "A1,deposit,5", "ZZ,deposit,5",
+                                                 "A1,withdraw,1"])
+    assert bulk.load_transactions(path) == 2
+    assert bulk.errors == [(2, "Unknown account ZZ")]
+    assert len(bulk.queue_transactions(path)) == 2
+    assert bulk.errors == [(2, "Unknown account ZZ")]
+    bulk.load_users(write(tmp_path / "users.csv", ["username,password_hash", "bob,hash"]))
+    assert bulk.errors == []  # Reset by every load
+
+
+def test_engine_loader_holds_the_engine_lock(tmp_path):
+    engine = BankEngine()
+    bulk = BulkLoader.from_engine(engine)
+    insert_many = engine.user_db.insert_many
+    lock_free_during_load = []
+
+    def checked_insert_many(pairs):
+        # A session on another thread must not get the engine lock mid-load
+        thread = threading.Thread(target=lambda: lock_free_during_load.append(engine.lock.acquire(timeout=0.1)))
+        thread.start()
+        thread.join()
+        insert_many(pairs)
+
+    engine.user_db.insert_many = checked_insert_many
+    bulk.load_users(write(tmp_path / "users.csv", ["username,password_hash", "bob,hash"]))
+    assert lock_free_during_load == [False]
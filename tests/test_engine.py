@@ -0,0 +1,75 @@
+# Shared bank engine
+import threading
+
+import pytest
+
+from data_structures.engine import BankEngine
+from data_structures.passwords import PasswordHasher
+
+SESSIONS = 8
+
+
+def run_sessions(target):
+    """Run target(session) on SESSIONS threads started together; re-raise the first error"""
+    barrier = threading.Barrier(SESSIONS)
+    errors = []
+
+    def session(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert not any(thread.is_alive() for thread in threads)
+    if errors:
+        raise errors[0]
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_concurrent_sessions_share_one_consistent_ledger(tmp_path, persistent):
+    data_directory = tmp_path if persistent else None
+    engine = BankEngine(data_directory, password_hasher=PasswordHasher(scrypt_n=2 ** 10))
+    created_shared = []
+    opened_shared = []
+
+    def sign_up(index):
+        assert engine.create_user(f"user{index}", f"password{index}")
+        created_shared.append(engine.create_user("shared", f"password{index}"))
+        engine.open_account(f"ACC{index}", f"user{index}", initial_deposit=1000)
+        opened_shared.append(engine.open_account("ACC-SHARED", f"user{index}"))
+        for pending in engine.get_pending_transactions(f"user{index}"):
+            assert engine.process_pending_transaction(pending.id)
+
+    run_sessions(sign_up)
+    assert created_shared.count(True) == 1
+    assert sum(account is not None for account in opened_shared) == 1
+
+    def trade(index):
+        assert engine.authenticate(f"user{index}", f"password{index}")
+        own = engine.find_account(f"ACC{index}")
+        neighbour = engine.find_account(f"ACC{(index + 1) % SESSIONS}")  # Opened by another session
+        for _ in range(50):
+            assert engine.transfer(own, neighbour, 10)
+
+    run_sessions(trade)
+    accounts = [engine.find_account(f"ACC{index}") for index in range(SESSIONS)]
+    balances = {account.account_number: account.balance_minor for account in accounts}
+    assert sum(balances.values()) == SESSIONS * 100000
+    assert all(balance == 100000 for balance in balances.values())  # Everyone sent and received 50 x 10
+    assert engine.pending_transactions == []
+    engine.close()
+
+    if persistent:
+        reopened = BankEngine(data_directory, password_hasher=PasswordHasher(scrypt_n=2 ** 10))
+        try:
+            assert {number: reopened.find_account(number).balance_minor for number in balances} == balances
+            assert reopened.find_account("ACC-SHARED") is not None
+            assert reopened.authenticate("user3", "password3")
+        finally:
+            reopened.close()
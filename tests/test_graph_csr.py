@@ -0,0 +1,20 @@
+# CSR snapshots of the transaction graph
+import time
+
+import pytest
+
+from data_structures.graph import TransactionGraph
+
+np = pytest.importorskip("numpy")
+
+
+def test_pagerank_treats_zero_amount_senders_as_dangling():
+    graph = TransactionGraph()
+    now = int(time.time())
+    graph.add_transactions([("A", "B", 0, "transfer", now), ("B", "C", 10, "transfer", now),
+                            ("C", "A", 5, "transfer", now)])
+    rank = graph.to_csr().pagerank()
+    assert np.isfinite(rank).all()
+    assert rank.sum() == pytest.approx(1.0)
+    unweighted = graph.to_csr().pagerank(weighted=False)
+    assert unweighted == pytest.approx(np.full(3, 1 / 3))
@@ -0,0 +1,57 @@
+# Transfer edges in currencies other than the default
+import time
+
+import pytest
+
+from data_structures.bulk import BulkLoader
+from data_structures.engine import BankEngine
+from data_structures.graph import TransactionGraph
+
+
+def fund(engine, account, amount):
+    engine.deposit(account, amount)
+    for pending in engine.pending_transactions:
+        engine.process_pending_transaction(pending.id)
+
+
+def test_edges_keep_their_currency_through_storage_and_bulk(tmp_path):
+    engine = BankEngine(data_directory=str(tmp_path / "data"))
+    yen_a = engine.open_account("Y1", "alice", currency="JPY")
+    yen_b = engine.open_account("Y2", "bob", currency="JPY")
+    dinar = engine.open_account("K1", "carol", currency="KWD")
+    engine.open_account("K2", "dave", currency="KWD")
+    fund(engine, yen_a, 5000)
+    fund(engine, dinar, 10)
+    assert engine.transfer(yen_a, yen_b, 1500)
+    engine.transaction_graph.add_transaction("K1", "K2", 1.25, "transfer", currency="KWD")
+
+    graph = engine.transaction_graph
+    assert graph.get_window_stats("Y1", 3600)['sum_out'] == 1500  # Yen have no minor digits
+    assert graph.get_window_stats("K1", 3600)['sum_out'] == 1250
+    assert graph.get_transaction_volume("Y1") == 1500
+    assert graph.get_transaction_volume("K1", hours=2) == 1.25  # Edge scan path
+    engine.storage.snapshot()
+    engine.transaction_graph.add_transaction("K1", "K2", 0.5, "transfer", currency="KWD")  # WAL tail
+    bulk = BulkLoader.from_engine(engine)
+    bulk.export_transfers(str(tmp_path / "transfers.csv"))
+    engine.close()
+
+    recovered = BankEngine(data_directory=str(tmp_path / "data"))
+    graph = recovered.transaction_graph
+    assert [edge.transaction.currency for edge in graph.out_edges["Y1"]] == ["JPY"]
+    assert [edge.transaction.amount_minor for edge in graph.out_edges["K1"]] == [1250, 500]
+    assert graph.get_transaction_volume("K1") == 1.75
+    recovered.close()
+
+    reloaded = TransactionGraph()
+    BulkLoader(None, None, reloaded).load_transfers(str(tmp_path / "transfers.csv"))
+    assert reloaded.get_window_stats("K1", 3600)['sum_out'] == 1750
+    assert reloaded.get_transaction_volume("Y2") == 1500
+
+
+def test_mixed_currencies_on_one_account_are_rejected():
+    graph = TransactionGraph()
+    graph.add_transaction("A", "B", 100, "transfer", currency="JPY")
+    with pytest.raises(ValueError):
+        graph.add_transactions([("B", "C", 1, "transfer", int(time.time()), "USD")])
+    assert graph.get_window_stats("B", 3600)['count'] == 1
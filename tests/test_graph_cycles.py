@@ -0,0 +1,52 @@
+# Circular-transfer detection
+import time
+
+from data_structures.graph import TransactionGraph
+
+
+def build_graph(edges, age=60):
+    graph = TransactionGraph()
+    timestamp = int(time.time()) - age
+    graph.add_transactions([(source, target, 100, "transfer", timestamp) for source, target in edges],
+                           minor_units=True)
+    return graph
+
+
+def test_cycle_components_are_the_strongly_connected_groups():
+    graph = build_graph([
+        ("A", "B"), ("B", "C"), ("C", "A"),  # Three-account ring
+        ("C", "D"), ("D", "E"),  # Tail leaving the ring, no way back
+        ("F", "G"), ("G", "F"),  # Two-account ring
+        ("H", "H"),  # Transfer to itself
+        ("I", "J"),
+    ])
+    components = sorted(sorted(component) for component in graph.find_cycle_components())
+    assert components == [["A", "B", "C"], ["F", "G"], ["H"]]
+
+
+def test_cycle_components_handle_long_chains_without_recursion():
+    accounts = [f"ACC{i}" for i in range(5000)]
+    graph = build_graph(list(zip(accounts, accounts[1:])) + [(accounts[-1], accounts[0])])
+    assert [sorted(component) for component in graph.find_cycle_components()] == [sorted(accounts)]
+
+
+def test_cycle_components_respect_the_time_threshold():
+    graph = build_graph([("A", "B"), ("B", "A")], age=3 * 3600)
+    assert graph.find_cycle_components() == [["A", "B"]]
+    assert graph.find_cycle_components(threshold_hours=1) == []
+
+
+def test_detect_circular_transactions_returns_the_cycle():
+    graph = build_graph([("A", "B"), ("B", "C"), ("C", "A"), ("C", "D")])
+    assert graph.detect_circular_transactions("A") == ["A", "B", "C"]
+    assert graph.detect_circular_transactions("D") is None
+    assert graph.detect_circular_transactions("A", max_length=2) is None
+
+
+def test_detect_cycle_for_edge_checks_the_closing_transfer():
+    graph = build_graph([("B", "C"), ("C", "A")])
+    assert graph.detect_cycle_for_edge("A", "B") == ["A", "B", "C"]
+    assert graph.detect_cycle_for_edge("B", "A") is None
+    assert graph.detect_cycle_for_edge("A", "A") == ["A"]
+    old = build_graph([("B", "C"), ("C", "A")], age=2 * 86400)
+    assert old.detect_cycle_for_edge("A", "B") is None
@@ -0,0 +1,53 @@
+import random
+import time
+
+from data_structures.graph import TransactionGraph
+
+
+def test_capped_compaction_keeps_totals_and_bounds_lists():
+    graph = TransactionGraph(max_edges_per_account=5)
+    rng = random.Random(7)
+    accounts = ["HUB"] + [f"A{i}" for i in range(20)]
+    start = int(time.time()) - 1000
+    sent = {}
+    for step in range(2000):
+        if rng.random() < 0.5:
+            source, target = "HUB", rng.choice(accounts[1:])
+        else:
+            source, target = rng.choice(accounts[1:]), "HUB"
+        amount = rng.randint(1, 500)
+        graph.add_transactions([(source, target, amount, "transfer", start + step)], minor_units=True)
+        count, total = sent.get((source, target), (0, 0))
+        sent[(source, target)] = (count + 1, total + amount)
+
+    # Lifetime totals combine the summaries with the live edges
+    for (source, target), (count, total) in sent.items():
+        summary = graph.get_pair_summary(source, target)
+        assert (summary['count'], summary['total']) == (count, total)
+
+    # Live counts respect the cap, fronts are live and tombstones stay bounded
+    for edges, live in ((graph.out_edges, graph.out_live), (graph.in_edges, graph.in_live)):
+        assert edges.keys() == live.keys()
+        for account, account_edges in edges.items():
+            live_edges = [edge for edge in account_edges if not edge.compacted]
+            assert len(live_edges) == live[account] <= 5
+            assert not account_edges[0].compacted
+            assert len(account_edges) <= 2 * live[account]
+    assert graph.edge_count == sum(graph.out_live.values()) == sum(graph.in_live.values())
+    assert len(graph.get_account_connections("HUB")) == graph.out_live.get("HUB", 0) + graph.in_live.get("HUB", 0)
+
+
+def test_age_compaction_skips_tombstones():
+    graph = TransactionGraph(max_edges_per_account=2)
+    now = int(time.time())
+    graph.add_transactions([
+        ("A", "B", 100, "transfer", now - 500),
+        ("C", "B", 200, "transfer", now - 400),
+        ("A", "B", 300, "transfer", now - 300),  # Caps B's in-list: the first edge is compacted
+        ("C", "D", 400, "transfer", now - 10),
+    ], minor_units=True)
+    assert graph.compact(max_age=350) == 1  # Only C -> B; A -> B at -500 is already compacted
+    assert graph.get_account_connections("B") == [("A", graph.out_edges["A"][0].transaction)]
+    assert graph.get_pair_summary("A", "B") == {'count': 2, 'total': 400, 'first_seen': now - 500,
+                                               'last_seen': now - 300}
+    assert graph.get_transaction_volume_minor("C", hours=2) == 400  # Edge scan skips the compacted C -> B
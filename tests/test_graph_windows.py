@@ -0,0 +1,68 @@
+# Sliding-window velocity aggregates
+import random
+import time
+
+import pytest
+
+from data_structures.graph import SlidingWindowAggregate, TransactionGraph
+
+
+def brute_force(events, now, window_seconds):
+    live = [(timestamp, amount, incoming) for timestamp, amount, incoming in events
+            if timestamp >= now - window_seconds]
+    return {
+        'count': len(live),
+        'sum_in': sum(amount for _, amount, incoming in live if incoming),
+        'sum_out': sum(amount for _, amount, incoming in live if not incoming),
+        'max': max((amount for _, amount, _ in live), default=0)
+    }
+
+
+def test_aggregate_matches_brute_force_with_expiry_and_late_events():
+    rng = random.Random(5)
+    aggregate = SlidingWindowAggregate(100)
+    events = []
+    now = 0
+    for _ in range(2000):
+        now += rng.randint(0, 10)
+        # Mostly in order, occasionally a late event from inside the window
+        timestamp = now - rng.randint(0, 50) if rng.random() < 0.1 else now
+        event = (timestamp, rng.randint(1, 1000), rng.random() < 0.5)
+        aggregate.expire(now)
+        aggregate.add(*event)
+        events.append(event)
+        assert aggregate.snapshot() == brute_force(events, now, 100)
+
+
+def test_maximum_expires_with_its_event():
+    aggregate = SlidingWindowAggregate(10)
+    aggregate.add(0, 500, False)
+    aggregate.add(5, 100, True)
+    aggregate.add(8, 300, False)
+    assert aggregate.snapshot() == {'count': 3, 'sum_in': 100, 'sum_out': 800, 'max': 500}
+    aggregate.expire(11)
+    assert aggregate.snapshot() == {'count': 2, 'sum_in': 100, 'sum_out': 300, 'max': 300}
+    aggregate.expire(16)
+    assert aggregate.snapshot() == {'count': 1, 'sum_in': 0, 'sum_out': 300, 'max': 300}
+    aggregate.expire(19)
+    assert aggregate.snapshot() == {'count': 0, 'sum_in': 0, 'sum_out': 0, 'max': 0}
+
+
+def test_graph_window_stats_per_configured_window():
+    graph = TransactionGraph(windows=(3600, 86400))
+    now = int(time.time())
+    graph.add_transactions([
+        ("A", "B", 700, "transfer", now - 7200),
+        ("A", "C", 200, "transfer", now - 60),
+        ("B", "A", 50, "transfer", now - 30),
+    ], minor_units=True)
+
+    assert graph.get_window_stats("A", 3600) == {'count': 2, 'sum_in': 50, 'sum_out': 200, 'max': 200}
+    assert graph.get_window_stats("A", 86400) == {'count': 3, 'sum_in': 50, 'sum_out': 900, 'max': 700}
+    assert graph.window_stats_many(["B", "missing", "C"], 3600) == [
+        {'count': 1, 'sum_in': 0, 'sum_out': 50, 'max': 50},
+        {'count': 0, 'sum_in': 0, 'sum_out': 0, 'max': 0},
+        {'count': 1, 'sum_in': 200, 'sum_out': 0, 'max': 200},
+    ]
+    with pytest.raises(ValueError):
+        graph.get_window_stats("A", 60)
@@ -0,0 +1,40 @@
+# Columnar transaction history
+import threading
+
+from data_structures.history import TransactionHistory
+from data_structures.transaction import TransactionType
+
+
+def test_queries_do_not_block_concurrent_appends():
+    history = TransactionHistory()
+    for i in range(20000):
+        history.append_record(TransactionType.DEPOSIT, 100, "seed", 1000 + i)
+    errors = []
+    done = threading.Event()
+
+    def append():
+        try:
+            for i in range(50000):
+                history.append_record(TransactionType.WITHDRAW, 1, "", 100000 + i)
+        except Exception as error:  # BufferError while a query holds a view of a column
+            errors.append(error)
+        finally:
+            done.set()
+
+    writer = threading.Thread(target=append)
+    writer.start()
+    while not done.is_set():
+        history.query(TransactionType.DEPOSIT, start=1000)
+        history.sum_by_type(start=1000)
+    writer.join()
+    assert errors == []
+    assert len(history) == 70000
+
+
+def test_sum_by_type_over_a_time_range():
+    history = TransactionHistory()
+    for timestamp, kind, amount in ((10, 'deposit', 500), (20, 'withdraw', 200), (30, 'deposit', 50)):
+        history.append_record(kind, amount, "", timestamp)
+    totals = history.sum_by_type(start=15)
+    assert totals[TransactionType.DEPOSIT] == 50 and totals[TransactionType.WITHDRAW] == 200
+    assert history.query('deposit') == [0, 2]
@@ -0,0 +1,62 @@
+# Ledger-backed account index
+import threading
+
+from data_structures.bst import BankAccount
+from data_structures.engine import BankEngine
+from data_structures.ledger import LedgerAccountIndex, LedgerFile
+
+
+def test_open_account_uses_the_ledger_backed_object(tmp_path):
+    ledger = LedgerFile(str(tmp_path / "ledger"))
+    engine = BankEngine(account_index=LedgerAccountIndex(ledger))
+    account = engine.open_account("A1", "alice", initial_deposit=25.5)
+    assert account is engine.find_account("A1")
+    (pending,) = engine.pending_transactions
+    assert engine.process_pending_transaction(pending.id)
+
+    slot = ledger.find_slot("A1")
+    assert ledger.read_account(slot)[3] == 2550  # Deposit written through to the ledger record
+    assert [transaction.amount_minor for transaction in account.transaction_history] == [2550]
+    ledger.close()
+
+
+def test_reads_are_safe_while_the_files_grow(tmp_path):
+    ledger = LedgerFile(str(tmp_path / "ledger"))
+    account = LedgerAccountIndex(ledger).insert(BankAccount("A1", "alice"))
+    errors = []
+    done = threading.Event()
+
+    def read_continuously():
+        try:
+            while not done.is_set():
+                account.balance_minor, len(account.transaction_history)
+                account.transaction_history.cursor_page(page_size=5)
+        except Exception as error:  # e.g. ValueError: mmap closed
+            errors.append(error)
+
+    readers = [threading.Thread(target=read_continuously) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for amount in range(1, 20001):  # Grows the transaction file several times
+        account.transaction_history.append_record("deposit", amount, "")
+    done.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
+    assert len(account.transaction_history) == 20000
+    ledger.close()
+
+
+def test_durable_ledger_reopens_with_every_write(tmp_path):
+    ledger = LedgerFile(str(tmp_path / "ledger"), durable=True)
+    account = LedgerAccountIndex(ledger).insert(BankAccount("A1", "alice"))
+    account.balance_minor = 700
+    account.transaction_history.append_record("deposit", 700, "Opening")
+    ledger.close()
+
+    reopened = LedgerAccountIndex(LedgerFile(str(tmp_path / "ledger")))
+    account = reopened.find_account("A1")
+    assert account.balance_minor == 700
+    assert [(t.amount_minor, t.description) for t in account.transaction_history] == [(700, "Opening")]
+    assert [a.account_number for a in reopened.get_user_accounts("alice")] == ["A1"]
+    reopened.ledger.close()
@@ -0,0 +1,15 @@
+import threading
+
+from data_structures.passwords import PasswordHasher
+
+
+def test_hash_verify_and_upgrade_inline():
+    hasher = PasswordHasher(scrypt_n=2 ** 10)
+    encoded = hasher.hash("secret")
+    assert hasher.verify_and_update("secret", encoded) == (True, None)
+    assert hasher.verify_and_update("wrong", encoded) == (False, None)
+    assert not any(thread.name.startswith("password-kdf") for thread in threading.enumerate())
+
+    stronger = PasswordHasher(scrypt_n=2 ** 11)
+    valid, new_hash = stronger.verify_and_update("secret", encoded)
+    assert valid and new_hash is not None and not stronger.needs_rehash(new_hash)
@@ -0,0 +1,113 @@
+# Indexed transaction priority queue
+import random
+import threading
+
+from data_structures.bst import BankAccount
+from data_structures.priority_queue import IndexedPriorityQueue, PrioritizedTransaction, TransactionProcessor
+from data_structures.transaction import Transaction, TransactionStatus, TransactionType
+
+
+def assert_heap(queue):
+    """Check the heap property and that positions index every item"""
+    heap = queue.heap
+    for index in range(1, len(heap)):
+        assert heap[(index - 1) // 2] <= heap[index]
+    assert queue.positions == {item.id: index for index, item in enumerate(heap)}
+
+
+def test_update_and_remove_keep_heap_and_index_consistent():
+    rng = random.Random(11)
+    queue = IndexedPriorityQueue()
+    accounts = [BankAccount(f"ACC{i}", "alice") for i in range(5)]
+    expected = {}  # {id: (priority, sequence, account number)}
+    for sequence in range(400):
+        account = rng.choice(accounts)
+        item = PrioritizedTransaction(
+            priority=rng.randint(1, 5),
+            transaction=Transaction(type=TransactionType.DEPOSIT, amount=1, account=account),
+            sequence=sequence
+        )
+        queue.push(item)
+        expected[item.id] = [item.priority, sequence, account.account_number]
+        if rng.random() < 0.3:
+            victim = rng.choice(list(expected))
+            assert queue.remove(victim).id == victim
+            del expected[victim]
+        if rng.random() < 0.3:
+            target = rng.choice(list(expected))
+            priority = rng.randint(1, 5)
+            assert queue.update_priority(target, priority)
+            expected[target][0] = priority
+        assert_heap(queue)
+
+    assert queue.remove("missing") is None
+    assert not queue.update_priority("missing", 1)
+    for account in accounts:
+        ids = [item.id for item in queue.pending_for([account.account_number])]
+        assert ids == sorted((i for i, row in expected.items() if row[2] == account.account_number),
+                             key=lambda i: expected[i][:2])
+    popped = []
+    while not queue.empty():
+        popped.append(queue.pop().id)
+    assert popped == sorted(expected, key=lambda i: expected[i][:2])
+    assert queue.by_account == {}
+
+
+def test_cancel_and_reprioritize_pending_transactions():
+    processor = TransactionProcessor()
+    account = BankAccount("ACC1", "bob", balance=100)
+    completed = []
+    ids = [
+        processor.add_transaction(Transaction(type=TransactionType.DEPOSIT, amount=amount, account=account),
+                                  on_complete=lambda transaction_id, applied: completed.append((transaction_id, applied)))
+        for amount in (1, 2, 3)
+    ]
+    assert [item.id for item in processor.pending_transactions] == ids
+
+    assert processor.reprioritize_transaction(ids[2], 1)
+    assert processor.peek_transaction().id == ids[2]
+
+    cancelled = processor.cancel_transaction(ids[0])
+    assert cancelled.status == TransactionStatus.CANCELLED
+    assert completed == [(ids[0], False)]
+    assert processor.cancel_transaction(ids[0]) is None
+    assert not processor.reprioritize_transaction(ids[0], 1)
+    assert [item.id for item in processor.pending_transactions] == [ids[2], ids[1]]
+
+    assert processor.process_pending_transaction(ids[1])
+    assert account.balance_minor == 10200
+    assert processor.pending_count() == 1
+
+
+def test_batch_drain_applies_in_priority_then_arrival_order():
+    processor = TransactionProcessor()
+    account = BankAccount("ACC1", "carol", balance=0)
+    applied_order = []
+    done = threading.Event()
+    amounts = [10, 20000, 5000, 11, 30000, 6000, 12, 5]  # Priorities 3, 1, 2, 3, 1, 2, 3, 3
+
+    def record(transaction_id, applied):
+        applied_order.append((transaction_id, applied))
+        if len(applied_order) == len(amounts) + 1:
+            done.set()
+
+    ids = [processor.add_transaction(Transaction(type=TransactionType.DEPOSIT, amount=amount, account=account),
+                                     on_complete=record)
+           for amount in amounts]
+    # High-value, so it runs right after the two large deposits and overdraws; must not abort the batch
+    overdraft = processor.add_transaction(
+        Transaction(type=TransactionType.WITHDRAW, amount=60000, account=account), on_complete=record)
+
+    processor.start_batch_processing(max_batch_size=3, max_linger=0.001)
+    try:
+        assert done.wait(5)
+    finally:
+        processor.stop_processing()
+        processor.processing_thread.join(5)
+
+    expected = [ids[1], ids[4], overdraft, ids[2], ids[5], ids[0], ids[3], ids[6], ids[7]]
+    assert [transaction_id for transaction_id, _ in applied_order] == expected
+    assert [applied for _, applied in applied_order] == [True, True, False] + [True] * 6
+    assert account.balance_minor == sum(amounts) * 100
+    assert all(stats['size'] <= 3 for stats in processor.batch_stats)
+    assert sum(stats['size'] for stats in processor.batch_stats) == len(expected)
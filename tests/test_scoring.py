@@ -0,0 +1,80 @@
+# Table-driven transaction priority rules
+import random
+import time
+
+import pytest
+
+from data_structures import scoring
+from data_structures.bst import BankAccount
+from data_structures.graph import TransactionGraph
+from data_structures.priority_queue import TransactionProcessor
+from data_structures.scoring import AmountTier, PriorityRules, VelocityTier
+from data_structures.transaction import Transaction, TransactionType
+
+
+def deposit(account, amount):
+    return Transaction(type=TransactionType.DEPOSIT, amount=amount, account=account,
+                       account_type=account.account_type, currency=account.currency)
+
+
+def test_default_rules_tiers_and_boundaries():
+    rules = PriorityRules()
+    regular, vip = BankAccount("R", "alice"), BankAccount("V", "bob", account_type="VIP")
+    yen = BankAccount("Y", "carol", currency="JPY")
+    cases = [
+        (regular, 999.99, 3), (regular, 1000, 2), (regular, 10000, 2), (regular, 10000.01, 1),
+        (vip, 1, 1),
+        (yen, 999, 3), (yen, 1000, 2), (yen, 10001, 1),  # Thresholds are in the account's own currency
+    ]
+    assert [rules.priority(deposit(account, amount)) for account, amount, _ in cases] == [
+        priority for _, _, priority in cases]
+
+
+def test_velocity_tier_promotes_busy_senders():
+    graph = TransactionGraph(windows=(3600,))
+    now = int(time.time())
+    graph.add_transactions([("BUSY", "X", 100, "transfer", now - 10)] * 5
+                           + [("BIG", "X", 500000, "transfer", now - 10)], minor_units=True)
+    rules = PriorityRules(velocity_tiers=(VelocityTier(3600, 2, min_count=5, min_amount_out=5000),))
+    busy, big, quiet = BankAccount("BUSY", "a"), BankAccount("BIG", "b"), BankAccount("QUIET", "c")
+    transactions = [deposit(busy, 1), deposit(big, 1), deposit(quiet, 1)]
+    assert [rules.priority(transaction, graph) for transaction in transactions] == [2, 2, 3]
+    assert rules.score(transactions, graph) == [2, 2, 3]
+    assert [rules.priority(transaction) for transaction in transactions] == [3, 3, 3]  # No graph, no velocity
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_batch_scores_match_single_scores(monkeypatch, vectorized):
+    if vectorized and scoring.np is None:
+        pytest.skip("NumPy is not installed")
+    if not vectorized:
+        monkeypatch.setattr(scoring, "np", None)
+    rng = random.Random(9)
+    rules = PriorityRules(
+        amount_tiers=(AmountTier(500, 2), AmountTier(5000, 1, inclusive=False)),
+        account_type_priorities={'VIP': 1, 'Business': 2},
+        default_priority=4
+    )
+    accounts = [BankAccount(f"ACC{i}", "dave", account_type=rng.choice(["Regular", "VIP", "Business"]),
+                            currency=rng.choice(["USD", "JPY", "KWD"])) for i in range(20)]
+    transactions = [deposit(rng.choice(accounts), rng.choice([1, 499.99, 500, 5000, 5000.5, 80000]))
+                    for _ in range(500)]
+    assert rules.score(transactions) == [rules.priority(transaction) for transaction in transactions]
+
+
+def test_bulk_enqueue_orders_like_single_enqueue():
+    rng = random.Random(4)
+    accounts = [BankAccount("R", "erin"), BankAccount("V", "erin", account_type="VIP")]
+    amounts = [(rng.choice(accounts), rng.choice([5, 1500, 20000])) for _ in range(200)]
+    single, bulk = TransactionProcessor(), TransactionProcessor()
+    for account, amount in amounts:
+        single.add_transaction(deposit(account, amount))
+    bulk.add_transactions([deposit(account, amount) for account, amount in amounts])
+
+    def order(processor):
+        return [(item.priority, item.transaction.account.account_number, item.transaction.amount)
+                for item in processor.pending_transactions]
+
+    assert order(bulk) == order(single)
+    priorities = [priority for priority, _, _ in order(bulk)]
+    assert priorities == sorted(priorities) and set(priorities) == {1, 2, 3}
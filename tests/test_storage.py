@@ -0,0 +1,53 @@
+# Write-ahead log and snapshot storage
+import threading
+
+import pytest
+
+from data_structures.engine import BankEngine
+
+
+def test_snapshot_is_written_without_holding_the_storage_lock(tmp_path):
+    engine = BankEngine(data_directory=str(tmp_path))
+    account = engine.open_account("A1", "alice")
+    engine.deposit(account, 12.34)
+    (pending,) = engine.pending_transactions
+    engine.process_pending_transaction(pending.id)
+    storage = engine.storage
+
+    write_snapshot = storage._write_snapshot
+    lock_free_while_writing = []
+
+    def checked_write(f, state):
+        # Another thread must be able to log a mutation while the snapshot is written
+        def try_lock():
+            acquired = storage.lock.acquire(timeout=1)
+            if acquired:
+                storage.lock.release()
+            lock_free_while_writing.append(acquired)
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        write_snapshot(f, state)
+
+    storage._write_snapshot = checked_write
+    storage.snapshot()
+    assert lock_free_while_writing == [True]
+    engine.open_account("A2", "bob")  # Logged to the new WAL generation
+    engine.close()
+
+    recovered = BankEngine(data_directory=str(tmp_path))
+    assert recovered.find_account("A1").balance_minor == 1234
+    assert recovered.find_account("A2") is not None
+    assert [t.amount_minor for t in recovered.find_account("A1").transaction_history] == [1234]
+    recovered.close()
+
+
+def test_snapshots_of_other_versions_are_rejected(tmp_path):
+    engine = BankEngine(data_directory=str(tmp_path))
+    engine.open_account("A1", "alice")
+    engine.storage.snapshot()
+    engine.close()
+    (snapshot,) = tmp_path.glob("snapshot-*.bin")
+    snapshot.write_bytes(b'BANKSNP2' + snapshot.read_bytes()[8:])
+    with pytest.raises(ValueError, match="supported version"):
+        BankEngine(data_directory=str(tmp_path))
@@ -0,0 +1,14 @@
+# Slotted Transaction records
+from data_structures.transaction import Transaction, TransactionType
+
+
+def test_amount_is_derived_from_minor_units():
+    transaction = Transaction(type=TransactionType.DEPOSIT, amount=0.1, currency="KWD")
+    assert transaction.amount_minor == 100 and transaction.amount == 0.1
+    transaction.amount_minor = 2500
+    assert transaction.amount == 2.5 and transaction['amount'] == 2.5  # Never out of step
+    assert 'amount' not in Transaction.__slots__ and not hasattr(transaction, '__dict__')
+    assert transaction.keys()[:2] == ['type', 'amount']
+
+    yen = Transaction.coerce({'type': 'withdraw', 'amount_minor': 300, 'currency': 'JPY'})
+    assert (yen.type, yen.amount) == (TransactionType.WITHDRAW, 300)
@@ -0,0 +1,106 @@
+# Transfer paths of the engine and the transaction processors
+import random
+import threading
+
+import pytest
+
+from data_structures.engine import BankEngine
+from data_structures.scoring import PriorityRules, VelocityTier
+from data_structures.sharded_processor import ShardedTransactionProcessor
+from data_structures.priority_queue import TransactionProcessor
+
+
+def run_with_timeout(function, timeout=5):
+    """Run function on a daemon thread; fails the test instead of hanging on a deadlock"""
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.setdefault('result', function()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "call did not return (deadlock?)"
+    return outcome['result']
+
+
+def funded_engine(processor, balances):
+    engine = BankEngine(transaction_processor=processor)
+    accounts = []
+    for number, balance in balances.items():
+        account = engine.open_account(number, "alice")
+        account.balance_minor = balance * 100
+        accounts.append(account)
+    return engine, accounts
+
+
+def velocity_rules():
+    return PriorityRules(velocity_tiers=[VelocityTier(3600, 1, min_count=5)])
+
+
+def test_transfer_batch_with_velocity_tier_does_not_deadlock():
+    for processor in (TransactionProcessor(velocity_rules()), ShardedTransactionProcessor(4, velocity_rules())):
+        engine, (a, b) = funded_engine(processor, {'A': 1000, 'B': 0})
+        for _ in range(6):  # Trip the velocity tier
+            assert run_with_timeout(lambda: engine.transfer_batch([(a, b, 10)]))
+        assert a.balance_minor == 94000 and b.balance_minor == 6000
+
+
+def test_rejected_transfer_applies_nothing():
+    for processor in (TransactionProcessor(), ShardedTransactionProcessor(4)):
+        engine, (a, b, c) = funded_engine(processor, {'A': 100, 'B': 0, 'C': 0})
+        results = [engine.transfer(a, b, 80), engine.transfer(a, c, 80)]
+        assert results == [True, False]
+        assert processor.pending_count() == 0  # Nothing left queued to apply later
+        assert (a.balance_minor, b.balance_minor, c.balance_minor) == (2000, 8000, 0)
+        assert a.balance_minor + b.balance_minor + c.balance_minor == 10000
+        assert len(engine.transaction_graph.out_edges['A']) == 1  # Only the applied transfer is an edge
+
+
+def test_concurrent_transfers_never_create_money():
+    for processor in (TransactionProcessor(), ShardedTransactionProcessor(4)):
+        engine, accounts = funded_engine(processor, {'A': 100, 'B': 100, 'C': 100, 'D': 100})
+        applied = []
+
+        def transfer_randomly(seed):
+            rng = random.Random(seed)
+            for _ in range(300):
+                source, target = rng.sample(accounts, 2)
+                amount = rng.randint(1, 60)
+                if rng.random() < 0.3:
+                    other = rng.choice([account for account in accounts if account is not source])
+                    if engine.transfer_batch([(source, target, amount), (source, other, amount)]):
+                        applied.extend([amount, amount])
+                elif engine.transfer(source, target, amount):
+                    applied.append(amount)
+
+        threads = [threading.Thread(target=transfer_randomly, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(account.balance_minor for account in accounts) == 40000
+        assert all(account.balance_minor >= 0 for account in accounts)
+        edges = [edge for edges in engine.transaction_graph.out_edges.values() for edge in edges]
+        assert sorted(edge.transaction.amount_minor for edge in edges) == sorted(amount * 100 for amount in applied)
+
+
+def test_transfer_does_not_overtake_queued_transactions_on_the_sender():
+    for processor in (TransactionProcessor(), ShardedTransactionProcessor(4)):
+        engine, (a, b) = funded_engine(processor, {'A': 100, 'B': 0})
+        engine.withdraw(a, 80, "Queued first")
+        engine.deposit(b, 5, "Awaiting the receiver's approval")
+        assert not engine.transfer(a, b, 50)  # The queued withdrawal is applied first
+        assert (a.balance_minor, b.balance_minor) == (2000, 0)
+        assert [t.description for t in a.transaction_history] == ["Queued first"]
+        # The receiver's own queue is left for its owner to process
+        assert [pt.transaction.description for pt in processor.pending_transactions] == [
+            "Awaiting the receiver's approval"
+        ]
+
+
+def test_graph_currency_conflict_applies_no_leg():
+    for processor in (TransactionProcessor(), ShardedTransactionProcessor(4)):
+        engine, (a, b, c) = funded_engine(processor, {'A': 100, 'B': 0, 'C': 0})
+        engine.transaction_graph.add_transaction('C', 'X', 5, "transfer", currency="JPY")  # C now has JPY edges
+        with pytest.raises(ValueError):
+            engine.transfer_batch([(a, b, 10), (a, c, 10)])
+        assert not engine.transfer(a, c, 10)
+        assert (a.balance_minor, b.balance_minor, c.balance_minor) == (10000, 0, 0)
+        assert len(a.transaction_history) == 0 and 'A' not in engine.transaction_graph.out_edges
@@ -0,0 +1,60 @@
+# Cursor-paged history and pending views
+from data_structures.bst import BankAccount
+from data_structures.engine import BankEngine
+from data_structures.views import HistoryView, PendingView
+
+
+def test_history_cursors_are_stable_after_appends():
+    account = BankAccount("A", "alice")
+    for i in range(25):
+        account.add_transaction('deposit', i + 1, f"seed {i}")
+    view = HistoryView(page_size=10)
+
+    rows, cursor = view.page(account)
+    assert [row['Description'] for row in rows] == [f"seed {i}" for i in range(24, 14, -1)]
+    seen = [row['Description'] for row in rows]
+    while cursor is not None:
+        account.add_transaction('withdraw', 1, "new")  # Newer entries must not shift older pages
+        rows, cursor = view.page(account, cursor)
+        seen += [row['Description'] for row in rows]
+    assert seen == [f"seed {i}" for i in range(24, -1, -1)]
+
+    # A cached page still matches the history it was read from; the newest page now starts with the appends
+    records, next_cursor = account.transaction_history.cursor_page(15, 10)
+    assert view.page(account, 15) == ([HistoryView.format_row(record) for record in records], next_cursor)
+    newest, _ = view.page(account)
+    assert [row['Description'] for row in newest[:2]] == ["new", "new"]
+
+
+def test_pending_pages_continue_after_new_transactions():
+    engine = BankEngine()
+    account = engine.open_account("A", "alice")
+    other = engine.open_account("B", "bob")
+    for amount in range(1, 8):
+        engine.deposit(account, amount)
+    engine.deposit(other, 1)
+    view = PendingView(page_size=3)
+
+    items, rows, cursor = view.page(engine, "alice")
+    assert [row['Amount'] for row in rows] == ["$1.00", "$2.00", "$3.00"]
+    engine.deposit(account, 20000)  # Higher priority: sorts before the cursor, so later pages skip it
+    engine.deposit(account, 8)  # Same priority, queued last: shows up at the end
+    amounts = []
+    while cursor is not None:
+        items, rows, cursor = view.page(engine, "alice", cursor)
+        assert all(item.transaction.account is account for item in items)
+        amounts += [item.transaction.amount for item in items]
+    assert amounts == [4, 5, 6, 7, 8]
+
+    first, rows, _ = view.page(engine, "alice")
+    assert first[0].transaction.amount == 20000 and rows[0]['Priority'] == "🔴 High"
+    # Demoted behind the small deposits queued before it; its cached row is not reused
+    assert engine.transaction_processor.reprioritize_transaction(first[0].id, 3)
+    rows, cursor = [], None
+    while True:
+        _, page_rows, cursor = view.page(engine, "alice", cursor)
+        rows += page_rows
+        if cursor is None:
+            break
+    assert [row['Amount'] for row in rows][-3:] == ["$7.00", "$20,000.00", "$8.00"]
+    assert rows[-2]['Priority'] == "🟢 Low"